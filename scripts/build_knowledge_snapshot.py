@@ -0,0 +1,28 @@
+import argparse
+import time
+
+from src.applicants.service.knowledge_matcher import build_knowledge_snapshot
+from src.configs import KNOWLEDGE_BASE_DIRECTORY, KNOWLEDGE_BASE_SNAPSHOT
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compile the knowledge base json files and their indexes into a snapshot"
+    )
+    parser.add_argument("--directory", type=str, help="Directory of the knowledge base json files",
+                        default=KNOWLEDGE_BASE_DIRECTORY)
+    parser.add_argument("--output", type=str, help="Path of the snapshot file",
+                        default=KNOWLEDGE_BASE_SNAPSHOT)
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    build_knowledge_snapshot(args.output, args.directory)
+    print(f"Built {args.output} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
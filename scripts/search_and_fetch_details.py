@@ -1,14 +1,16 @@
 import argparse
+from datetime import date
 from tkinter import E
 from typing import Dict, List, Text
-from tinydb import Query
 from tqdm import tqdm
 
-from src.applicants.service.extended.db import DetailedApplicantsDb
+from src.applicants.service.registry import DETAILED_APPLICANTS_DB, SEARCHED_APPLICANTS_DB, store_registry
 from src.applicants.schemas.arbeitsagentur.enums import WorkingTime
-from src.applicants.router.extended import fetch_applicant_details, search_applicants
-from src.applicants.schemas.extended.request import FetchApplicantsDetailsRequest
-from src.applicants.schemas.extended.response import FetchDetailedApplicantsResponse, SearchApplicantsResponse
+from src.applicants.router.extended import search_applicants
+from src.applicants.schemas.arbeitsagentur.schemas import BewerberDetail
+from src.applicants.schemas.extended.response import SearchApplicantsResponse
+from src.applicants.service.arbeitsagentur import ApplicantApi
+from src.applicants.service.http_cache import get_api_response_cache
 
 
 def parse_args():
@@ -20,11 +22,14 @@ def parse_args():
     parser.add_argument("--career_field", type=str, help="Career field", default=None)
     parser.add_argument("--working_time", type=str, help="Working time", default="UNDEFINED")
     parser.add_argument("--location_keyword", type=str, help="Location keyword", default=None)
+    parser.add_argument("--available_from", type=date.fromisoformat, help="Only applicants available at this date (YYYY-MM-DD)", default=None)
+    parser.add_argument("--updated_since", type=date.fromisoformat, help="Only applicants updated since this date (YYYY-MM-DD)", default=None)
 
     parser.add_argument("--pages_count", type=int, help="Number of pages to fetch", default=1)
     parser.add_argument("--page_size", type=int, help="Page size", default=100)
 
     parser.add_argument("--skip_existing", action="store_true", help="Skip existing applicants in the DB")
+    parser.add_argument("--batch_size", type=int, help="Number of fetched details written to the DB at once", default=100)
 
     return parser.parse_args()
 
@@ -37,12 +42,15 @@ def main():
     for page_idx in search_pbar:
         # search for applicants
         search_response_dict: Dict = search_applicants(
+            db=store_registry.get(SEARCHED_APPLICANTS_DB),
             keywords=args.keywords,
             maxGraduationYear=args.max_graduation_year,
             minWorkExperienceYears=args.min_work_experience_years,
             careerField=args.career_field,
             workingTime=WorkingTime[args.working_time],
             locationKeyword=args.location_keyword,
+            availableFrom=args.available_from,
+            updatedSince=args.updated_since,
             page=page_idx+1,
             size=args.page_size
         )
@@ -53,22 +61,30 @@ def main():
 
     applicant_refnrs: List[Text] = [applicant_refnr for response in all_search_responses for applicant_refnr in response.applicantRefnrs]
 
+    db = store_registry.get(DETAILED_APPLICANTS_DB)
     if args.skip_existing:
         # TODO: create an endpoint to get existing applicants from the local DB based on the refnr
-        db = DetailedApplicantsDb()
-        existing_applicant_refnrs: List[Text] = [applicant.refnr for applicant in db.get(Query().refnr.one_of(applicant_refnrs))]
+        existing_applicant_refnrs: List[Text] = [refnr for refnr in applicant_refnrs if db.contains(refnr)]
         applicant_refnrs = [refnr for refnr in applicant_refnrs if refnr not in existing_applicant_refnrs]
 
         print(f"Skipping {len(existing_applicant_refnrs)} existing applicants in the DB")
 
-    all_fetch_responses: List[FetchDetailedApplicantsResponse] = []
+    api = ApplicantApi(response_cache=get_api_response_cache())
+    api.init()
+    fetched_applicants: List[BewerberDetail] = []
+    fetched_count: int = 0
     fetch_pbar = tqdm(applicant_refnrs, desc="Fetching details", unit="applicant")
     fetch_pbar_postfix: Dict = {"refnr": "", "failed_count": 0}
     failed_refnrs: List[Text] = []
     errors: List[Exception] = []
     for applicant_refnr in fetch_pbar:
         try:
-            fetch_response_dict: Dict = fetch_applicant_details(FetchApplicantsDetailsRequest(applicantIds=[applicant_refnr]))
+            applicant_details_dict: Dict = api.get_applicant(applicant_refnr)
+            if "messages" in applicant_details_dict:
+                raise ValueError(applicant_details_dict["messages"])
+            elif "refnr" not in applicant_details_dict:
+                continue
+            fetched_applicants.append(BewerberDetail(**applicant_details_dict))
         except Exception as e:
             fetch_pbar_postfix["refnr"] = applicant_refnr
             fetch_pbar_postfix["failed_count"] += 1
@@ -76,10 +92,14 @@ def main():
             failed_refnrs.append(applicant_refnr)
             errors.append(e)
             continue
-        fetch_response = FetchDetailedApplicantsResponse(**fetch_response_dict)
-        all_fetch_responses.append(fetch_response)
-
-    print(f"Successfully fetched details for {len(all_fetch_responses)} applicants")
+        if len(fetched_applicants) >= args.batch_size:
+            db.upsert_many(fetched_applicants)
+            fetched_count += len(fetched_applicants)
+            fetched_applicants = []
+    db.upsert_many(fetched_applicants)
+    fetched_count += len(fetched_applicants)
+
+    print(f"Successfully fetched details for {fetched_count} applicants")
     if len(failed_refnrs) > 0:
         print(f"Failed to fetch details for {len(failed_refnrs)} applicants: {failed_refnrs}")
         print(f"Errors: \n{"\n\t".join([str(error) for error in errors])}")
@@ -0,0 +1,68 @@
+from typing import Dict, Text
+
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberDetail,
+    BewerberUebersicht,
+)
+from src.applicants.service.arbeitsagentur import AsyncApplicantApi
+from src.applicants.service.circuit_breaker import CircuitBreaker, api_circuit_breaker
+from src.applicants.service.extended.db import ApplicantsDb
+from src.applicants.service.extended.freshness import (
+    DetailFreshnessPolicy,
+    detail_freshness_policy,
+)
+from src.applicants.service.extended.sync import SyncStateDb
+from src.applicants.service.knowledge_base import KNOWLEDGE_BASES, KnowledgeBaseDb
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    KnowledgeMatcherPool,
+)
+from src.applicants.service.registry import (
+    APPLICANT_API,
+    DETAILED_APPLICANTS_DB,
+    KNOWLEDGE_MATCHER,
+    KNOWLEDGE_MATCHER_POOL,
+    SEARCHED_APPLICANTS_DB,
+    SYNC_STATE_DB,
+    knowledge_base_store_name,
+    store_registry,
+)
+
+
+def get_searched_applicants_db() -> ApplicantsDb[BewerberUebersicht]:
+    return store_registry.get(SEARCHED_APPLICANTS_DB)
+
+
+def get_detailed_applicants_db() -> ApplicantsDb[BewerberDetail]:
+    return store_registry.get(DETAILED_APPLICANTS_DB)
+
+
+def get_sync_state_db() -> SyncStateDb:
+    return store_registry.get(SYNC_STATE_DB)
+
+
+def get_knowledge_bases() -> Dict[Text, KnowledgeBaseDb]:
+    return {
+        category: store_registry.get(knowledge_base_store_name(category))
+        for category in KNOWLEDGE_BASES.keys()
+    }
+
+
+def get_knowledge_matcher() -> KnowledgeMatcher:
+    return store_registry.get(KNOWLEDGE_MATCHER)
+
+
+def get_knowledge_matcher_pool() -> KnowledgeMatcherPool:
+    return store_registry.get(KNOWLEDGE_MATCHER_POOL)
+
+
+def get_applicant_api() -> AsyncApplicantApi:
+    return store_registry.get(APPLICANT_API)
+
+
+def get_detail_freshness_policy() -> DetailFreshnessPolicy:
+    return detail_freshness_policy
+
+
+def get_api_circuit_breaker() -> CircuitBreaker:
+    return api_circuit_breaker
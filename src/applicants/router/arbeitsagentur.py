@@ -1,11 +1,26 @@
-from typing import Annotated, Dict, Text
-from fastapi import APIRouter, Depends
+from typing import Annotated, Dict, Optional, Text
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 import logging
 
+from src.applicants.dependencies import (
+    get_applicant_api,
+    get_detail_freshness_policy,
+    get_detailed_applicants_db,
+    get_searched_applicants_db,
+)
 from src.applicants.schemas.arbeitsagentur.response import ApplicantSearchResponse
-from src.applicants.schemas.arbeitsagentur.schemas import BewerberDetail
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberDetail,
+    BewerberUebersicht,
+)
 from src.applicants.schemas.arbeitsagentur.request import SearchParameters
-from src.applicants.service.arbeitsagentur import ApplicantApi
+from src.applicants.schemas.extended.response import RateLimiterStatistics
+from src.applicants.service.arbeitsagentur import AsyncApplicantApi
+from src.applicants.service.circuit_breaker import CircuitOpenError
+from src.applicants.service.extended.db import ApplicantsDb
+from src.applicants.service.extended.freshness import DetailFreshnessPolicy
 from src.configs import DEFAULT_LOGGING_CONFIG
 
 router = APIRouter()
@@ -13,19 +28,89 @@ router = APIRouter()
 logging.basicConfig(**DEFAULT_LOGGING_CONFIG)
 logger = logging.getLogger(__name__)
 
+# Response header telling whether the details came from the local store
+CACHE_HEADER: Text = "X-Cache"
+
 
 @router.get("/applicants/arbeitsagentur/search", response_model=ApplicantSearchResponse)
-def search_applicants(props: Annotated[Dict, Depends(SearchParameters)]):
+async def search_applicants(
+    props: Annotated[Dict, Depends(SearchParameters)],
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+    freshness_policy: Annotated[
+        DetailFreshnessPolicy, Depends(get_detail_freshness_policy)
+    ],
+):
     search_parameters = SearchParameters(**props.__dict__)
-    api = ApplicantApi()
-    api.init()
-    search_result_dict: Dict = api.search_applicants(search_parameters)
+    search_result_dict: Dict = await api.search_applicants(search_parameters)
+    if "bewerber" in search_result_dict:
+        try:
+            freshness_policy.see(
+                BewerberUebersicht(**applicant)
+                for applicant in search_result_dict["bewerber"]
+            )
+        except ValidationError as error:
+            logger.warning(f"Invalid applicant in search result: {error}")
     return search_result_dict
 
 
 @router.get("/applicants/arbeitsagentur/get", response_model=BewerberDetail)
-def get_applicant(applicant_id: Text):
-    api = ApplicantApi()
-    api.init()
-    applicant = api.get_applicant(applicant_id)
-    return applicant
+async def get_applicant(
+    applicant_id: Text,
+    response: Response,
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+    detailed_db: Annotated[
+        ApplicantsDb[BewerberDetail], Depends(get_detailed_applicants_db)
+    ],
+    searched_db: Annotated[
+        ApplicantsDb[BewerberUebersicht], Depends(get_searched_applicants_db)
+    ],
+    freshness_policy: Annotated[
+        DetailFreshnessPolicy, Depends(get_detail_freshness_policy)
+    ],
+):
+    """Answers from the local store while its copy of the details is fresh.
+
+    Otherwise the details are requested from the API and stored. The X-Cache header
+    of the response is HIT or MISS accordingly, or STALE if the copy is not fresh
+    but is returned anyway because the circuit of the API is open.
+    """
+    applicant, stored_at = await run_in_threadpool(
+        detailed_db.get_with_stored_at, applicant_id
+    )
+    if applicant is not None:
+        searched_applicant: Optional[BewerberUebersicht] = await run_in_threadpool(
+            searched_db.get_by_refnr, applicant_id
+        )
+        if freshness_policy.is_fresh(
+            applicant,
+            stored_at,
+            freshness_policy.latest_update(applicant_id, searched_applicant),
+        ):
+            response.headers[CACHE_HEADER] = "HIT"
+            return applicant
+
+    try:
+        # A stored copy which is not fresh may be outdated in the response cache too
+        applicant_dict: Dict = await api.get_applicant(
+            applicant_id, revalidate=applicant is not None
+        )
+    except CircuitOpenError:
+        if applicant is None:
+            raise
+        logger.warning(f"Returning stored details of {applicant_id}, the circuit is open")
+        response.headers[CACHE_HEADER] = "STALE"
+        return applicant
+    response.headers[CACHE_HEADER] = "MISS"
+    if "refnr" in applicant_dict:
+        try:
+            await run_in_threadpool(detailed_db.upsert, BewerberDetail(**applicant_dict))
+        except ValidationError as error:
+            logger.warning(f"Invalid details for applicant {applicant_id}: {error}")
+    return applicant_dict
+
+
+@router.get("/applicants/arbeitsagentur/rate_limit", response_model=RateLimiterStatistics)
+def rate_limiter_statistics(
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+):
+    return api.rate_limiter.statistics()
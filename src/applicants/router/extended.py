@@ -1,37 +1,57 @@
-from typing import Annotated, Dict, List, Optional, Text
+from contextlib import aclosing
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Annotated, Dict, List, Optional, Text, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+import httpx
 import logging
 
-from src.applicants.service.knowledge_base import (
-    CompetencesDb,
-    JobsDb,
-    LanguagesDb,
-    LicensesDb,
-    LocationDb,
-    SkillsDb,
-    WorkfieldsDb,
+from src.applicants.dependencies import (
+    get_applicant_api,
+    get_detailed_applicants_db,
+    get_knowledge_bases,
+    get_knowledge_matcher,
+    get_knowledge_matcher_pool,
+    get_searched_applicants_db,
+    get_sync_state_db,
+)
+from src.applicants.service.knowledge_base import KnowledgeBaseDb
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    KnowledgeMatcherPool,
 )
 from src.applicants.schemas.extended.request import (
     ExtendedDetailedSearchParameters,
     ExtendedSearchParameters,
     FetchParameters,
+    SuggestCriteriaBatchRequest,
+    SyncParameters,
 )
 from src.applicants.schemas.extended.response import (
     FetchApplicantsResponse,
+    KnowledgeAutocompletion,
     SearchApplicantsResponse,
+    SearchCacheStatistics,
     SearchCriteriaSuggestion,
+    SearchCriteriaSuggestionBatch,
+    SyncApplicantsResponse,
 )
-from src.applicants.service.extended.db import (
-    DetailedApplicantsDb,
-    SearchedApplicantsDb,
+from src.applicants.service.extended.db import ApplicantsDb
+from src.applicants.service.extended.sync import (
+    SyncState,
+    SyncStateDb,
+    SyncStatus,
+    compare_with_stored,
+    latest_update,
+    saved_search_key,
 )
 from src.applicants.schemas.arbeitsagentur.request import SearchParameters
 from src.applicants.schemas.extended.request import FetchApplicantsDetailsRequest
-from src.applicants.service.extended.query import (
-    build_knowledge_search_query,
-    build_search_query,
-    build_detailed_search_query,
+from src.applicants.service.extended.compiler import (
+    compile_detailed_search_query,
+    compile_search_query,
 )
 from src.applicants.schemas.arbeitsagentur.response import ApplicantSearchResponse
 from src.applicants.schemas.arbeitsagentur.enums import (
@@ -48,8 +68,14 @@ from src.applicants.schemas.arbeitsagentur.schemas import (
     BewerberUebersicht,
 )
 from src.applicants.schemas.extended.response import FetchDetailedApplicantsResponse
-from src.applicants.service.arbeitsagentur import ApplicantApi
-from src.configs import DEFAULT_LOGGING_CONFIG
+from src.applicants.service.arbeitsagentur import AsyncApplicantApi
+from src.applicants.service.circuit_breaker import CircuitOpenError
+from src.applicants.service.concurrency import gather_in_order
+from src.configs import (
+    DEFAULT_LOGGING_CONFIG,
+    FETCH_DETAILS_CONCURRENCY,
+    FETCH_PAGES_CONCURRENCY,
+)
 
 
 arbeitsagentur_router = APIRouter()
@@ -62,10 +88,13 @@ logger = logging.getLogger(__name__)
 
 
 @router.get("/applicants/fetch", response_model=FetchApplicantsResponse)
-def fetch_applicants(params: Annotated[Dict, Depends(FetchParameters)]):
-    api = ApplicantApi()
-    api.init()
-    db = SearchedApplicantsDb()
+async def fetch_applicants(
+    params: Annotated[Dict, Depends(FetchParameters)],
+    db: Annotated[
+        ApplicantsDb[BewerberUebersicht], Depends(get_searched_applicants_db)
+    ],
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+):
     searched_applicants_refnrs = []
     extended_search_params: FetchParameters = FetchParameters(**params.__dict__)
     page_start: int = (
@@ -73,31 +102,136 @@ def fetch_applicants(params: Annotated[Dict, Depends(FetchParameters)]):
         if extended_search_params.pages_start is not None
         else 0
     )
-    for page_idx, search_parameters in enumerate(
-        extended_search_params.get_original_search_params()
-    ):
-        search_result_dict: Dict = api.search_applicants(search_parameters)
-        logger.info(
-            f"Fetching resumes from page {page_start + page_idx + 1} with keys: {search_result_dict.keys()}"
+    # Pages are requested concurrently but processed in order, the pages after the
+    # first empty or failed one are cancelled
+    pages = gather_in_order(
+        [
+            partial(api.search_applicants, search_parameters)
+            for search_parameters in extended_search_params.get_original_search_params()
+        ],
+        FETCH_PAGES_CONCURRENCY,
+    )
+    page_idx: int = 0
+    async with aclosing(pages):
+        async for search_result_dict in pages:
+            logger.info(
+                f"Fetching resumes from page {page_start + page_idx + 1} with keys: {search_result_dict.keys()}"
+            )
+            if "messages" in search_result_dict:
+                logger.warning(
+                    f"Error while fetching resumes: {search_result_dict['messages']}"
+                )
+                raise HTTPException(
+                    status_code=400, detail=search_result_dict["messages"]
+                )
+            elif "bewerber" not in search_result_dict:
+                logger.warning(f"No applicants found on page {page_start + page_idx + 1}")
+                break
+            search_result: ApplicantSearchResponse = ApplicantSearchResponse(
+                **search_result_dict
+            )
+            await run_in_threadpool(db.upsert_many, search_result.bewerber)
+            searched_applicants_refnrs.extend(
+                [applicant.refnr for applicant in search_result.bewerber]
+            )
+            page_idx += 1
+
+    response = {
+        "count": len(searched_applicants_refnrs),
+        "applicantRefnrs": searched_applicants_refnrs,
+    }
+
+    return response
+
+
+@router.get("/applicants/fetch/sync", response_model=SyncApplicantsResponse)
+async def sync_applicants(
+    params: Annotated[Dict, Depends(SyncParameters)],
+    db: Annotated[
+        ApplicantsDb[BewerberUebersicht], Depends(get_searched_applicants_db)
+    ],
+    sync_state_db: Annotated[SyncStateDb, Depends(get_sync_state_db)],
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+):
+    """Fetches the new and changed applicants of a saved search since its last sync.
+
+    Pages are requested one after the other, from the first one, and only their new
+    and changed applicants are stored. Paging stops at the first page without any,
+    once it reaches the watermark of the previous sync: the latest
+    `aktualisierungsdatum` it saw. Without a watermark, i.e. on the first sync of a
+    search, all `pages_count` pages are fetched.
+    """
+    sync_parameters: SyncParameters = SyncParameters(**params.__dict__).model_copy(
+        update={"pages_start": 0}
+    )
+    search_key: Text = saved_search_key(sync_parameters)
+    sync_state: Optional[SyncState] = await run_in_threadpool(
+        sync_state_db.get, search_key
+    )
+    watermark: Optional[datetime] = (
+        sync_state.watermark if sync_state is not None else None
+    )
+
+    counts: Dict[SyncStatus, int] = {status: 0 for status in SyncStatus}
+    stored_refnrs: List[Text] = []
+    latest_watermark: Optional[datetime] = watermark
+    pages_count: int = 0
+    # Pages are requested one at a time, as the next one is only needed if the
+    # current one has new or changed applicants. Cached pages are revalidated, as
+    # they may be younger than the last sync.
+    for search_parameters in sync_parameters.get_original_search_params():
+        search_result_dict: Dict = await api.search_applicants(
+            search_parameters, revalidate=True
         )
+        pages_count += 1
         if "messages" in search_result_dict:
             logger.warning(
-                f"Error while fetching resumes: {search_result_dict['messages']}"
+                f"Error while syncing resumes: {search_result_dict['messages']}"
             )
             raise HTTPException(status_code=400, detail=search_result_dict["messages"])
-        elif "bewerber" not in search_result_dict:
-            logger.warning(f"No applicants found on page {page_start + page_idx + 1}")
+        if len(search_result_dict.get("bewerber") or []) == 0:
             break
-        search_result: ApplicantSearchResponse = ApplicantSearchResponse(
-            **search_result_dict
+        applicants: List[BewerberUebersicht] = [
+            BewerberUebersicht(**applicant) for applicant in search_result_dict["bewerber"]
+        ]
+
+        statuses: List[SyncStatus] = await run_in_threadpool(
+            compare_with_stored, db, applicants
         )
-        for applicant in search_result.bewerber:
-            db.upsert(applicant)
-            searched_applicants_refnrs.append(applicant.refnr)
+        changed_applicants: List[BewerberUebersicht] = [
+            applicant
+            for applicant, status in zip(applicants, statuses)
+            if status != SyncStatus.UNCHANGED
+        ]
+        for status in statuses:
+            counts[status] += 1
+        await run_in_threadpool(db.upsert_many, changed_applicants)
+        stored_refnrs.extend(applicant.refnr for applicant in changed_applicants)
+        latest_watermark = latest_update(latest_watermark, applicants)
+
+        if (
+            len(changed_applicants) == 0
+            and watermark is not None
+            and min(applicant.aktualisierungsdatum for applicant in applicants)
+            <= watermark
+        ):
+            logger.info(f"Sync reached known applicants on page {pages_count}")
+            break
+
+    await run_in_threadpool(
+        sync_state_db.put,
+        search_key,
+        SyncState(watermark=latest_watermark, synced_at=datetime.now(timezone.utc)),
+    )
 
     response = {
-        "count": len(searched_applicants_refnrs),
-        "applicantRefnrs": searched_applicants_refnrs,
+        "count": len(stored_refnrs),
+        "applicantRefnrs": stored_refnrs,
+        "newCount": counts[SyncStatus.NEW],
+        "changedCount": counts[SyncStatus.CHANGED],
+        "unchangedCount": counts[SyncStatus.UNCHANGED],
+        "pagesCount": pages_count,
+        "watermark": latest_watermark,
     }
 
     return response
@@ -105,12 +239,18 @@ def fetch_applicants(params: Annotated[Dict, Depends(FetchParameters)]):
 
 @router.get("/applicants/search", response_model=SearchApplicantsResponse)
 def search_applicants(
+    db: Annotated[
+        ApplicantsDb[BewerberUebersicht], Depends(get_searched_applicants_db)
+    ],
     keywords: List[Text] = Query([]),
     maxGraduationYear: int = Query(None),
     minWorkExperienceYears: int = Query(None),
     careerField: Text = Query(None),
     workingTime: WorkingTime = WorkingTime.UNDEFINED,
     locationKeyword: Text = Query(None),
+    availableFrom: Optional[date] = None,
+    publishedSince: Optional[date] = None,
+    updatedSince: Optional[date] = None,
     page: int = 1,
     size: int = 25,
 ):
@@ -121,22 +261,20 @@ def search_applicants(
         career_field=careerField,
         working_time=workingTime,
         location_keyword=locationKeyword,
+        available_from=availableFrom,
+        published_since=publishedSince,
+        updated_since=updatedSince,
     )
 
-    query = build_search_query(search_parameters)
+    query = compile_search_query(search_parameters)
     logger.info(f"Query: {query}")
 
-    db = SearchedApplicantsDb()
-
-    if query is not None:
-        applicants = db.get(query)
-    else:
-        applicants = db.get_all()
+    cursor = db.find(query)
 
-    total_count: int = len(applicants)
+    total_count: int = len(cursor)
     logger.info(f"Found in total {total_count} applicants")
 
-    applicants = applicants[(page - 1) * size : (page - 1) * size + size]
+    applicants = cursor.page(page, size)
 
     response = {
         "maxCount": total_count,
@@ -155,40 +293,63 @@ def search_applicants(
 @router.post(
     "/applicants/fetch/details", response_model=FetchDetailedApplicantsResponse
 )
-def fetch_applicant_details(request: FetchApplicantsDetailsRequest):
+async def fetch_applicant_details(
+    request: FetchApplicantsDetailsRequest,
+    db: Annotated[ApplicantsDb[BewerberDetail], Depends(get_detailed_applicants_db)],
+    api: Annotated[AsyncApplicantApi, Depends(get_applicant_api)],
+):
     applicant_ids: List[Text] = request.applicantIds
 
-    db = DetailedApplicantsDb()
-    api = ApplicantApi()
-    api.init()
-
     all_applicants_details: List[BewerberDetail] = []
-    for applicant_id in applicant_ids:
-        applicant_details_dict: Dict = api.get_applicant(applicant_id)
-        if "messages" in applicant_details_dict:
-            logger.warning(
-                f"Error while fetching details for applicant {applicant_id}: {applicant_details_dict['messages']}"
-            )
-            raise HTTPException(
-                status_code=400, detail=applicant_details_dict["messages"]
-            )
-        elif "refnr" not in applicant_details_dict:
-            logger.warning(f"No details found for applicant {applicant_id}")
-            continue
-        applicant_detail: BewerberDetail = BewerberDetail(**applicant_details_dict)
-        all_applicants_details.append(applicant_detail)
-        db.upsert(applicant_detail)
+    failures: List[Dict[Text, Text]] = []
+    details = gather_in_order(
+        [partial(fetch_applicant_detail, api, applicant_id) for applicant_id in applicant_ids],
+        FETCH_DETAILS_CONCURRENCY,
+    )
+    async with aclosing(details):
+        async for applicant_id, applicant_detail, error in details:
+            if applicant_detail is not None:
+                all_applicants_details.append(applicant_detail)
+            else:
+                failures.append({"applicantId": applicant_id, "error": error})
+
+    # All fetched details are stored in a single write
+    await run_in_threadpool(db.upsert_many, all_applicants_details)
 
     response = {
         "count": len(all_applicants_details),
         "applicantRefnrs": [applicant.refnr for applicant in all_applicants_details],
+        "failures": failures,
     }
 
     return response
 
 
+async def fetch_applicant_detail(
+    api: AsyncApplicantApi, applicant_id: Text
+) -> Tuple[Text, Optional[BewerberDetail], Optional[Text]]:
+    """Fetches the details of an applicant, or the error that prevented it."""
+    try:
+        applicant_details_dict: Dict = await api.get_applicant(applicant_id)
+        if "messages" in applicant_details_dict:
+            logger.warning(
+                f"Error while fetching details for applicant {applicant_id}: {applicant_details_dict['messages']}"
+            )
+            return applicant_id, None, str(applicant_details_dict["messages"])
+        elif "refnr" not in applicant_details_dict:
+            logger.warning(f"No details found for applicant {applicant_id}")
+            return applicant_id, None, "No details found"
+        return applicant_id, BewerberDetail(**applicant_details_dict), None
+    except (httpx.HTTPError, ValueError, CircuitOpenError) as error:
+        # ValueError covers invalid json and pydantic's ValidationError. If the
+        # circuit opens during a batch, the details fetched before it are still stored.
+        logger.warning(f"Error while fetching details for applicant {applicant_id}: {error}")
+        return applicant_id, None, f"{type(error).__name__}: {error}"
+
+
 @router.post("/applicants/search/details", response_class=JSONResponse)
 def search_applicant_details(
+    db: Annotated[ApplicantsDb[BewerberDetail], Depends(get_detailed_applicants_db)],
     jobTitle: Optional[Text] = None,
     location: Optional[Text] = None,
     minAvgJobPositionYears: Optional[int] = None,
@@ -198,6 +359,9 @@ def search_applicant_details(
     educationKeyword: Optional[Text] = None,
     skills: List[Text] = Query([]),
     languages: List[Text] = Query([]),
+    availableFrom: Optional[date] = None,
+    publishedSince: Optional[date] = None,
+    updatedSince: Optional[date] = None,
     page: int = 1,
     size: int = 25,
 ):
@@ -211,22 +375,20 @@ def search_applicant_details(
         education_keyword=educationKeyword,
         skills=skills,
         languages=languages,
+        available_from=availableFrom,
+        published_since=publishedSince,
+        updated_since=updatedSince,
     )
 
-    query = build_detailed_search_query(search_parameters)
+    query = compile_detailed_search_query(search_parameters)
     logger.info(f"Query: {query}")
 
-    db = DetailedApplicantsDb()
+    cursor = db.find(query)
 
-    if query is not None:
-        applicants = db.get(query)
-    else:
-        applicants = db.get_all()
-
-    total_count: int = len(applicants)
+    total_count: int = len(cursor)
     logger.info(f"Found in total {total_count} applicants")
 
-    applicants = applicants[(page - 1) * size : (page - 1) * size + size]
+    applicants = cursor.page(page, size)
 
     response = {
         "maxCount": total_count,
@@ -242,38 +404,85 @@ def search_applicant_details(
     return response
 
 
+@router.get("/applicants/search/cache", response_model=SearchCacheStatistics)
+def search_cache_statistics(
+    db: Annotated[
+        ApplicantsDb[BewerberUebersicht], Depends(get_searched_applicants_db)
+    ],
+    details_db: Annotated[
+        ApplicantsDb[BewerberDetail], Depends(get_detailed_applicants_db)
+    ],
+):
+    return {
+        "applicants": db.search_cache.statistics(),
+        "applicantDetails": details_db.search_cache.statistics(),
+    }
+
+
 @router.post("/applicants/suggest_criteria", response_model=SearchCriteriaSuggestion)
-def suggest_criteria(job_description: Text = Query()):
-    query = build_knowledge_search_query(job_description)
-    logger.info(f"Query: {query}")
+def suggest_criteria(
+    knowledge_matcher: Annotated[KnowledgeMatcher, Depends(get_knowledge_matcher)],
+    job_description: Text = Query(),
+    fuzzy: bool = False,
+):
+    return build_criteria_suggestion(knowledge_matcher.match(job_description, fuzzy))
 
-    competences_db = CompetencesDb()
-    competences_results = competences_db.get(query)
 
-    location_db: LocationDb = LocationDb()
-    location_results = location_db.get(query)
+@router.post(
+    "/applicants/suggest_criteria/batch", response_model=SearchCriteriaSuggestionBatch
+)
+def suggest_criteria_batch(
+    request: SuggestCriteriaBatchRequest,
+    knowledge_matcher: Annotated[KnowledgeMatcher, Depends(get_knowledge_matcher)],
+    knowledge_matcher_pool: Annotated[
+        KnowledgeMatcherPool, Depends(get_knowledge_matcher_pool)
+    ],
+):
+    all_matches: List[Dict[Text, List[Text]]] = knowledge_matcher_pool.match_many(
+        knowledge_matcher, request.jobDescriptions, request.fuzzy
+    )
 
-    jobs_db = JobsDb()
-    job_results = jobs_db.get(query)
+    response = {
+        "count": len(all_matches),
+        "suggestions": [build_criteria_suggestion(matches) for matches in all_matches],
+    }
 
-    skills_db = SkillsDb()
-    skills_results = skills_db.get(query)
+    return response
 
-    licenses_db = LicensesDb()
-    licenses_results = licenses_db.get(query)
 
-    languages_db = LanguagesDb()
-    languages_results = languages_db.get(query)
+@router.get(
+    "/knowledge/{category}/autocomplete", response_model=KnowledgeAutocompletion
+)
+def autocomplete_knowledge(
+    knowledge_bases: Annotated[
+        Dict[Text, KnowledgeBaseDb], Depends(get_knowledge_bases)
+    ],
+    category: Text,
+    prefix: Text = "",
+    limit: int = Query(10, ge=1, le=100),
+):
+    if category not in knowledge_bases:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown knowledge base {category}, expected one of {list(knowledge_bases.keys())}",
+        )
+
+    response = {
+        "category": category,
+        "prefix": prefix,
+        "completions": knowledge_bases[category].autocomplete(prefix, limit),
+    }
+
+    return response
 
-    work_fields_db = WorkfieldsDb()
-    work_fields_results = work_fields_db.get(query)
 
+def build_criteria_suggestion(matches: Dict[Text, List[Text]]) -> Dict:
     return {
-        "locations": location_results,
-        "jobTitles": job_results,
-        "jobDescriptions": work_fields_results,
-        "competences": competences_results,
-        "skills": skills_results,
-        "licenses": licenses_results,
-        "languages": languages_results,
+        "locations": matches["location"],
+        "jobTitles": matches["jobs"],
+        "jobDescriptions": matches["workfields"],
+        "competences": matches["competences"],
+        "skills": matches["skills"],
+        "licenses": matches["licenses"],
+        "languages": matches["languages"],
     }
@@ -1,3 +1,4 @@
+from datetime import date
 from typing import Iterable, List, Text, Optional
 from fastapi import Query
 from pydantic import BaseModel
@@ -13,6 +14,7 @@ from src.applicants.schemas.arbeitsagentur.enums import (
     WorkExperience,
     WorkingTime,
 )
+from src.configs import SYNC_MAX_PAGES
 
 
 class FetchParameters(BaseModel):
@@ -47,10 +49,21 @@ class FetchParameters(BaseModel):
             yield params
 
 
+class SyncParameters(FetchParameters):
+    """Parameters of a sync, which always starts at the first page."""
+
+    pages_count: int = SYNC_MAX_PAGES
+
+
 class FetchApplicantsDetailsRequest(BaseModel):
     applicantIds: List[Text]
 
 
+class SuggestCriteriaBatchRequest(BaseModel):
+    jobDescriptions: List[Text]
+    fuzzy: bool = False
+
+
 class ExtendedSearchParameters(BaseModel):
     keywords: Optional[List[Text]] = None
     max_graduation_year: Optional[int] = None
@@ -58,6 +71,9 @@ class ExtendedSearchParameters(BaseModel):
     career_field: Optional[Text] = None
     working_time: WorkingTime = WorkingTime.UNDEFINED
     location_keyword: Optional[Text] = None
+    available_from: Optional[date] = None
+    published_since: Optional[date] = None
+    updated_since: Optional[date] = None
 
 
 class ExtendedDetailedSearchParameters(BaseModel):
@@ -70,3 +86,6 @@ class ExtendedDetailedSearchParameters(BaseModel):
     education_keyword: Optional[Text] = None
     skills: Optional[List[Text]] = None
     languages: Optional[List[Text]] = None
+    available_from: Optional[date] = None
+    published_since: Optional[date] = None
+    updated_since: Optional[date] = None
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Optional, Text
 
 from pydantic import BaseModel
@@ -8,9 +9,15 @@ from src.applicants.schemas.arbeitsagentur.schemas import (
 )
 
 
+class FetchFailure(BaseModel):
+    applicantId: Text
+    error: Text
+
+
 class FetchDetailedApplicantsResponse(BaseModel):
     count: int
     applicantRefnrs: List[Text]
+    failures: List[FetchFailure] = []
 
 
 class FetchApplicantsResponse(BaseModel):
@@ -18,6 +25,14 @@ class FetchApplicantsResponse(BaseModel):
     applicantRefnrs: List[Text]
 
 
+class SyncApplicantsResponse(FetchApplicantsResponse):
+    newCount: int
+    changedCount: int
+    unchangedCount: int
+    pagesCount: int
+    watermark: Optional[datetime] = None
+
+
 class SearchApplicantsResponse(BaseModel):
     maxCount: int
     count: int
@@ -34,3 +49,36 @@ class SearchCriteriaSuggestion(BaseModel):
     skills: List[Text]
     licenses: List[Text]
     languages: List[Text]
+
+
+class SearchCriteriaSuggestionBatch(BaseModel):
+    count: int
+    suggestions: List[SearchCriteriaSuggestion]
+
+
+class KnowledgeAutocompletion(BaseModel):
+    category: Text
+    prefix: Text
+    completions: List[Text]
+
+
+class CacheStatistics(BaseModel):
+    hits: int
+    misses: int
+    size: int
+    maxSize: int
+
+
+class SearchCacheStatistics(BaseModel):
+    applicants: CacheStatistics
+    applicantDetails: CacheStatistics
+
+
+class RateLimiterStatistics(BaseModel):
+    rate: float
+    concurrency: int
+    inFlight: int
+    requests: int
+    throttled: int
+    retryAfters: int
+    waitSeconds: float
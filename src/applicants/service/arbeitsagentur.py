@@ -1,6 +1,15 @@
+import asyncio
 from enum import Enum
-from typing import Any, Dict, Optional, Text
+from functools import partial
+import json
+import random
+import time
+from typing import Any, Dict, Optional, Text, Tuple
+from weakref import WeakKeyDictionary
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
 from src.applicants.schemas.arbeitsagentur.enums import ParamEnum
@@ -8,12 +17,82 @@ from src.applicants.schemas.arbeitsagentur.request import (
     SearchParameters,
     SEARCH_PARAMETERS_TO_GET_PARAMS,
 )
+from src.configs import (
+    API_BACKOFF_FACTOR,
+    API_BACKOFF_JITTER,
+    API_CACHE_DETAIL_TTL,
+    API_CACHE_SEARCH_TTL,
+    API_CONNECT_TIMEOUT,
+    API_MAX_RETRIES,
+    API_MAX_RETRY_DELAY,
+    API_POOL_SIZE,
+    API_READ_TIMEOUT,
+)
+from src.applicants.service.circuit_breaker import CircuitBreaker, api_circuit_breaker
+from src.applicants.service.http_cache import (
+    CachedResponse,
+    HttpResponseCache,
+    get_api_response_cache,
+    response_cache_key,
+)
+from src.applicants.service.rate_limiter import AdaptiveRateLimiter, api_rate_limiter
+from src.applicants.service.single_flight import AsyncSingleFlight, SingleFlight
 
 
 logger = logging.getLogger(__name__)
 
+RETRIED_STATUS_CODES: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: int = API_POOL_SIZE,
+    max_retries: int = API_MAX_RETRIES,
+    backoff_factor: float = API_BACKOFF_FACTOR,
+    backoff_jitter: float = API_BACKOFF_JITTER,
+) -> requests.Session:
+    """Session keeping up to `pool_size` connections alive, retrying failed connections.
+
+    Connection errors are retried with exponential backoff plus a random jitter, so
+    that parallel clients do not retry in lockstep. Responses with the status codes
+    in RETRIED_STATUS_CODES are retried by ApplicantApi, which passes them to its
+    rate limiter first.
+    """
+    retry = Retry(
+        total=max_retries,
+        status_forcelist=None,
+        allowed_methods=["GET"],
+        backoff_factor=backoff_factor,
+        backoff_jitter=backoff_jitter,
+        # Retry-After is handled by ApplicantApi, which bounds the delay
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def backoff_delay(
+    retry: int,
+    backoff_factor: float = API_BACKOFF_FACTOR,
+    backoff_jitter: float = API_BACKOFF_JITTER,
+) -> float:
+    """Seconds to wait before the given retry, counted from 0."""
+    return backoff_factor * 2**retry + random.uniform(0, backoff_jitter)
+
 
-class ApplicantApi:
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """The delay in seconds of a Retry-After header, if it has one in seconds."""
+    retry_after: Optional[Text] = headers.get("Retry-After")
+    if retry_after is None or not retry_after.strip().isdigit():
+        return None
+    return float(retry_after)
+
+
+class BaseApplicantApi:
     api_base_url: Text = (
         "https://rest.arbeitsagentur.de/jobboerse/bewerbersuche-service/pc/v1"
     )
@@ -21,15 +100,93 @@ class ApplicantApi:
     api_detail_url: Text = f"{api_base_url}/bewerberdetails"
     api_key: Text = "jobboerse-bewerbersuche-ui"
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = API_MAX_RETRIES,
+        backoff_factor: float = API_BACKOFF_FACTOR,
+        backoff_jitter: float = API_BACKOFF_JITTER,
+        max_retry_delay: float = API_MAX_RETRY_DELAY,
+        response_cache: Optional[HttpResponseCache] = None,
+        search_ttl: float = API_CACHE_SEARCH_TTL,
+        detail_ttl: float = API_CACHE_DETAIL_TTL,
+    ):
+        self.rate_limiter: AdaptiveRateLimiter = (
+            rate_limiter if rate_limiter is not None else api_rate_limiter
+        )
+        self.circuit_breaker: CircuitBreaker = (
+            circuit_breaker if circuit_breaker is not None else api_circuit_breaker
+        )
+        self.max_retries: int = max_retries
+        self.backoff_factor: float = backoff_factor
+        self.backoff_jitter: float = backoff_jitter
+        self.max_retry_delay: float = max_retry_delay
+        # Responses are only cached if a cache is given
+        self.response_cache: Optional[HttpResponseCache] = response_cache
+        self.search_ttl: float = search_ttl
+        self.detail_ttl: float = detail_ttl
 
     def init(self):
         pass
 
-    def search_applicants(
+    def is_stale(self) -> bool:
+        return False
+
+    def get_retry_delay(
+        self, retry: int, status_code: int, retry_after: Optional[float]
+    ) -> Optional[float]:
+        """Seconds to wait before retrying a response, None if it is not retried.
+
+        Responses asking to wait longer than `max_retry_delay` are not retried, so
+        that a request does not wait for an unbounded time.
+        """
+        if status_code not in RETRIED_STATUS_CODES or retry >= self.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_delay else None
+        return min(
+            backoff_delay(retry, self.backoff_factor, self.backoff_jitter),
+            self.max_retry_delay,
+        )
+
+    def get_single_flight_key(self, key: Text, revalidate: bool) -> Text:
+        """Revalidating requests do not join requests which may use the cache."""
+        return f"{key} (revalidate)" if revalidate else key
+
+    def is_failure(self, status_code: int) -> bool:
+        """Whether a response counts as a failed call for the circuit breaker."""
+        return status_code >= 500
+
+    def get_cached_response(self, key: Text) -> Optional[CachedResponse]:
+        if self.response_cache is None:
+            return None
+        return self.response_cache.get(key)
+
+    def cache_response(
+        self,
+        key: Text,
+        cached_response: Optional[CachedResponse],
+        status_code: int,
+        body: bytes,
+        headers: Any,
+        ttl: float,
+    ) -> bytes:
+        """Stores a response in the cache and returns its body, the cached one if unchanged."""
+        if self.response_cache is None:
+            return body
+        if status_code == 304 and cached_response is not None:
+            self.response_cache.refresh(key, ttl)
+            return cached_response.body
+        if status_code == 200:
+            self.response_cache.put(
+                key, body, ttl, headers.get("ETag"), headers.get("Last-Modified")
+            )
+        return body
+
+    def get_search_params(
         self, search_parameters: Optional[SearchParameters] = None
-    ) -> Dict:
+    ) -> Dict[Text, Any]:
         request_params: Dict[Text, Any] = {}
         if search_parameters is not None:
             for key, value in search_parameters.model_dump().items():
@@ -43,23 +200,353 @@ class ApplicantApi:
                     )
                 else:
                     request_params[SEARCH_PARAMETERS_TO_GET_PARAMS[key]] = value
+        return request_params
+
+    def get_headers(self):
+        return {"X-API-Key": self.api_key}
+
+
+class ApplicantApi(BaseApplicantApi):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: Tuple[float, float] = (API_CONNECT_TIMEOUT, API_READ_TIMEOUT),
+        **kwargs,
+    ):
+        """
+        Client of the Arbeitsagentur API.
+        Args: session (requests.Session): The session to send the requests with, to
+              share its connections with other clients. A new one by default.
+              timeout (Tuple[float, float]): The connect and read timeouts in seconds.
+              kwargs: The rate limiter and the circuit breaker, shared by all
+              clients by default, and the retry settings of BaseApplicantApi.
+        """
+        super().__init__(**kwargs)
+        self.session: requests.Session = (
+            session if session is not None else create_session()
+        )
+        self.timeout: Tuple[float, float] = timeout
+        self.single_flight = SingleFlight()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def search_applicants(
+        self,
+        search_parameters: Optional[SearchParameters] = None,
+        revalidate: bool = False,
+    ) -> Dict:
+        """Searches applicants, with `revalidate` like in `get_json`."""
+        request_params: Dict[Text, Any] = self.get_search_params(search_parameters)
         logger.info(
             f"Searching applicants with the following parameters: {request_params}"
         )
-        response = requests.get(
-            self.api_search_url,
-            headers=self.get_headers(),
-            params=request_params,
+        search_result: Dict = self.get_json(
+            self.api_search_url, request_params, self.search_ttl, revalidate
+        )
+        logger.info(f"Received response with keys {search_result.keys()}")
+        return search_result
+
+    def get_applicant(
+        self, applicant_id: Text, revalidate: bool = False
+    ) -> Dict:
+        """Details of an applicant, with `revalidate` like in `get_json`."""
+        api_url = f"{self.api_detail_url}/{applicant_id}"
+        return self.get_json(api_url, ttl=self.detail_ttl, revalidate=revalidate)
+
+    def get_json(
+        self,
+        url: Text,
+        params: Optional[Dict[Text, Any]] = None,
+        ttl: float = 0,
+        revalidate: bool = False,
+    ) -> Any:
+        """Parsed response to a GET request, from the cache while it is fresh.
+
+        With `revalidate`, a fresh cached response is revalidated like an expired
+        one. Concurrent identical requests are sent once and share the parsed response.
+        """
+        key: Text = response_cache_key(url, params)
+        return self.single_flight.run(
+            self.get_single_flight_key(key, revalidate),
+            partial(self._get_json_, key, url, params, ttl, revalidate),
+        )
+
+    def _get_json_(
+        self,
+        key: Text,
+        url: Text,
+        params: Optional[Dict[Text, Any]],
+        ttl: float,
+        revalidate: bool,
+    ) -> Any:
+        cached_response: Optional[CachedResponse] = self.get_cached_response(key)
+        if (
+            cached_response is not None
+            and cached_response.is_fresh()
+            and not revalidate
+        ):
+            return cached_response.json()
+        response = self.get(
+            url,
+            params,
+            cached_response.validators() if cached_response is not None else None,
+        )
+        return json.loads(
+            self.cache_response(
+                key,
+                cached_response,
+                response.status_code,
+                response.content,
+                response.headers,
+                ttl,
+            )
         )
+
+    def get(
+        self,
+        url: Text,
+        params: Optional[Dict[Text, Any]] = None,
+        headers: Optional[Dict[Text, Text]] = None,
+    ) -> requests.Response:
+        """Sends a GET request within the rate limit, retrying it while it fails.
+
+        Raises CircuitOpenError instead of sending it while the circuit is open.
+        """
+        for retry in range(self.max_retries + 1):
+            started_at: float = self.circuit_breaker.before_call()
+            acquired_at: float = self.rate_limiter.acquire()
+            try:
+                response = self.session.get(
+                    url,
+                    headers={**self.get_headers(), **(headers or {})},
+                    params=params,
+                    timeout=self.timeout,
+                )
+            except Exception:
+                self.rate_limiter.release(acquired_at)
+                self.circuit_breaker.record(
+                    started_at, True, time.monotonic() - acquired_at
+                )
+                raise
+            self.circuit_breaker.record(
+                started_at,
+                self.is_failure(response.status_code),
+                time.monotonic() - acquired_at,
+            )
+            retry_after: Optional[float] = parse_retry_after(response.headers)
+            self.rate_limiter.release(acquired_at, response.status_code, retry_after)
+            delay: Optional[float] = self.get_retry_delay(
+                retry, response.status_code, retry_after
+            )
+            if delay is None:
+                return response
+            logger.info(
+                f"Retrying {url} in {delay:.2f}s after status code {response.status_code}"
+            )
+            time.sleep(delay)
+        return response
+
+
+def create_async_client(
+    pool_size: int = API_POOL_SIZE,
+    connect_timeout: float = API_CONNECT_TIMEOUT,
+    read_timeout: float = API_READ_TIMEOUT,
+    max_retries: int = API_MAX_RETRIES,
+) -> httpx.AsyncClient:
+    """Client keeping up to `pool_size` connections alive, retrying failed connects."""
+    limits = httpx.Limits(
+        max_connections=pool_size, max_keepalive_connections=pool_size
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        transport=httpx.AsyncHTTPTransport(limits=limits, retries=max_retries),
+    )
+
+
+class AsyncApplicantApi(BaseApplicantApi):
+    """Asynchronous client of the Arbeitsagentur API, with the methods of ApplicantApi.
+
+    Requests wait on their sockets instead of blocking a thread. Like with
+    ApplicantApi, they are sent within the rate limit, and responses with the status
+    codes in RETRIED_STATUS_CODES are retried with exponential backoff plus jitter,
+    or after their Retry-After delay. The pooled connections of a client belong to
+    the event loop they were opened in, so a client is created for every event loop
+    the API is used from.
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.client: Optional[httpx.AsyncClient] = client
+        self.single_flight = AsyncSingleFlight()
+        self.loop_clients: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = WeakKeyDictionary()
+
+    async def aclose(self) -> None:
+        """Closes the clients of all event loops, each one on its own loop.
+
+        The clients of loops which are closed or not running anymore are dropped,
+        their connections cannot be closed from another loop.
+        """
+        if self.client is not None:
+            await self.client.aclose()
+            return
+        running_loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        for loop, client in list(self.loop_clients.items()):
+            del self.loop_clients[loop]
+            if loop is running_loop:
+                await client.aclose()
+            elif loop.is_running() and not loop.is_closed():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+                )
+
+    async def search_applicants(
+        self,
+        search_parameters: Optional[SearchParameters] = None,
+        revalidate: bool = False,
+    ) -> Dict:
+        """Searches applicants, with `revalidate` like in `get_json`."""
+        request_params: Dict[Text, Any] = self.get_search_params(search_parameters)
         logger.info(
-            f"Received response with status code {response.status_code} and keys {response.json().keys()}"
+            f"Searching applicants with the following parameters: {request_params}"
         )
-        return response.json()
+        search_result: Dict = await self.get_json(
+            self.api_search_url, request_params, self.search_ttl, revalidate
+        )
+        logger.info(f"Received response with keys {search_result.keys()}")
+        return search_result
 
-    def get_applicant(self, applicant_id: Text) -> Dict:
+    async def get_applicant(
+        self, applicant_id: Text, revalidate: bool = False
+    ) -> Dict:
+        """Details of an applicant, with `revalidate` like in `get_json`."""
         api_url = f"{self.api_detail_url}/{applicant_id}"
-        response = requests.get(api_url, headers=self.get_headers())
-        return response.json()
+        return await self.get_json(api_url, ttl=self.detail_ttl, revalidate=revalidate)
 
-    def get_headers(self):
-        return {"X-API-Key": self.api_key}
+    async def get_json(
+        self,
+        url: Text,
+        params: Optional[Dict[Text, Any]] = None,
+        ttl: float = 0,
+        revalidate: bool = False,
+    ) -> Any:
+        """Parsed response to a GET request, from the cache while it is fresh.
+
+        With `revalidate`, a fresh cached response is revalidated like an expired
+        one. Concurrent identical requests are sent once and share the parsed response.
+        """
+        key: Text = response_cache_key(url, params)
+        return await self.single_flight.run(
+            self.get_single_flight_key(key, revalidate),
+            partial(self._get_json_, key, url, params, ttl, revalidate),
+        )
+
+    async def _get_json_(
+        self,
+        key: Text,
+        url: Text,
+        params: Optional[Dict[Text, Any]],
+        ttl: float,
+        revalidate: bool,
+    ) -> Any:
+        # The cache is on disk, so it is read and written outside of the event loop
+        cached_response: Optional[CachedResponse] = await asyncio.to_thread(
+            self.get_cached_response, key
+        )
+        if (
+            cached_response is not None
+            and cached_response.is_fresh()
+            and not revalidate
+        ):
+            return cached_response.json()
+        response: httpx.Response = await self.get(
+            url,
+            params,
+            cached_response.validators() if cached_response is not None else None,
+        )
+        return json.loads(
+            await asyncio.to_thread(
+                self.cache_response,
+                key,
+                cached_response,
+                response.status_code,
+                response.content,
+                response.headers,
+                ttl,
+            )
+        )
+
+    async def get(
+        self,
+        url: Text,
+        params: Optional[Dict[Text, Any]] = None,
+        headers: Optional[Dict[Text, Text]] = None,
+    ) -> httpx.Response:
+        """Sends a GET request within the rate limit, retrying it while it fails.
+
+        Raises CircuitOpenError instead of sending it while the circuit is open.
+        """
+        client: httpx.AsyncClient = self.get_client()
+        for retry in range(self.max_retries + 1):
+            started_at: float = self.circuit_breaker.before_call()
+            try:
+                acquired_at: float = await self.rate_limiter.acquire_async()
+            except BaseException:
+                self.circuit_breaker.record(started_at, None)
+                raise
+            try:
+                response: httpx.Response = await client.get(
+                    url, headers={**self.get_headers(), **(headers or {})}, params=params
+                )
+            except BaseException as error:
+                # Also gives back the slot if the request is cancelled
+                self.rate_limiter.release(acquired_at)
+                self.circuit_breaker.record(
+                    started_at,
+                    None if isinstance(error, asyncio.CancelledError) else True,
+                    time.monotonic() - acquired_at,
+                )
+                raise
+            self.circuit_breaker.record(
+                started_at,
+                self.is_failure(response.status_code),
+                time.monotonic() - acquired_at,
+            )
+            retry_after: Optional[float] = parse_retry_after(response.headers)
+            self.rate_limiter.release(acquired_at, response.status_code, retry_after)
+            delay: Optional[float] = self.get_retry_delay(
+                retry, response.status_code, retry_after
+            )
+            if delay is None:
+                return response
+            logger.info(
+                f"Retrying {url} in {delay:.2f}s after status code {response.status_code}"
+            )
+            await asyncio.sleep(delay)
+        return response
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is not None:
+            return self.client
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        client: Optional[httpx.AsyncClient] = self.loop_clients.get(loop)
+        if client is None:
+            # Drops the clients of loops which were closed without closing them
+            for closed_loop in [
+                other_loop for other_loop in self.loop_clients if other_loop.is_closed()
+            ]:
+                del self.loop_clients[closed_loop]
+            client = create_async_client(max_retries=self.max_retries)
+            self.loop_clients[loop] = client
+        return client
+
+
+def create_applicant_api() -> AsyncApplicantApi:
+    return AsyncApplicantApi(response_cache=get_api_response_cache())
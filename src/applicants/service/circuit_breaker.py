@@ -0,0 +1,181 @@
+from collections import deque
+from enum import Enum
+import threading
+import time
+from typing import Deque, Dict, Optional, Text, Tuple, Union
+
+from src.configs import (
+    API_CIRCUIT_ERROR_RATE,
+    API_CIRCUIT_HALF_OPEN_CALLS,
+    API_CIRCUIT_MIN_CALLS,
+    API_CIRCUIT_OPEN_DURATION,
+    API_CIRCUIT_SLOW_CALL_DURATION,
+    API_CIRCUIT_SLOW_CALL_RATE,
+    API_CIRCUIT_WINDOW,
+)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            f"The Arbeitsagentur API is unavailable, retry in {retry_after:.0f}s"
+        )
+        self.retry_after: float = retry_after
+
+
+class CircuitBreaker:
+    """Circuit breaker failing requests to an API fast while it is degraded.
+
+    The circuit is closed at first and every call is let through and recorded. It
+    opens once at least `min_calls` calls ended in the last `window` seconds and
+    either the rate of failed calls reaches `error_rate` or the rate of calls slower
+    than `slow_call_duration` seconds reaches `slow_call_rate`. While it is open,
+    `before_call` raises CircuitOpenError. After `open_duration` seconds it is half
+    open and lets `half_open_calls` trial calls through: it closes if they all
+    succeed in time and opens again as soon as one of them does not.
+
+    Every call let through by `before_call` must be recorded with `record`. Thread
+    safe, and usable from coroutines as it never blocks.
+    """
+
+    def __init__(
+        self,
+        window: float = API_CIRCUIT_WINDOW,
+        min_calls: int = API_CIRCUIT_MIN_CALLS,
+        error_rate: float = API_CIRCUIT_ERROR_RATE,
+        slow_call_duration: float = API_CIRCUIT_SLOW_CALL_DURATION,
+        slow_call_rate: float = API_CIRCUIT_SLOW_CALL_RATE,
+        open_duration: float = API_CIRCUIT_OPEN_DURATION,
+        half_open_calls: int = API_CIRCUIT_HALF_OPEN_CALLS,
+    ):
+        self.window: float = window
+        self.min_calls: int = max(min_calls, 1)
+        self.error_rate: float = error_rate
+        self.slow_call_duration: float = slow_call_duration
+        self.slow_call_rate: float = slow_call_rate
+        self.open_duration: float = open_duration
+        self.half_open_calls: int = max(half_open_calls, 1)
+
+        self.state: CircuitState = CircuitState.CLOSED
+        # End time, failure and slowness of the calls ended within the window
+        self.calls: Deque[Tuple[float, bool, bool]] = deque()
+        self.failed_calls: int = 0
+        self.slow_calls: int = 0
+        self.opened_at: float = 0
+        self.trial_calls: int = 0
+        self.successful_trial_calls: int = 0
+        self.openings: int = 0
+        self.rejected_calls: int = 0
+        self.lock = threading.Lock()
+
+    def before_call(self) -> float:
+        """Lets a call through or raises CircuitOpenError.
+
+        Returns the time the call started at, to be passed to `record`.
+        """
+        with self.lock:
+            now: float = time.monotonic()
+            if self.state == CircuitState.OPEN:
+                if self._current_state_(now) == CircuitState.OPEN:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(self.opened_at + self.open_duration - now)
+                self.state = CircuitState.HALF_OPEN
+                self.trial_calls = 0
+                self.successful_trial_calls = 0
+            if self.state == CircuitState.HALF_OPEN:
+                if self.trial_calls >= self.half_open_calls:
+                    self.rejected_calls += 1
+                    raise CircuitOpenError(self.open_duration)
+                self.trial_calls += 1
+            return now
+
+    def record(
+        self, started_at: float, failed: Optional[bool], duration: Optional[float] = None
+    ) -> None:
+        """Records the outcome of a call, None if it has none, e.g. when cancelled.
+
+        The duration of the call is the time since it started by default, it can be
+        given to leave out the time it waited for something else, like a rate limit.
+        """
+        with self.lock:
+            now: float = time.monotonic()
+            slow: bool = (
+                duration if duration is not None else now - started_at
+            ) >= self.slow_call_duration
+            if self.state == CircuitState.HALF_OPEN and started_at >= self.opened_at:
+                self._record_trial_call_(now, failed, slow)
+                return
+            if failed is None or self.state != CircuitState.CLOSED:
+                return
+            self.calls.append((now, failed, slow))
+            self.failed_calls += failed
+            self.slow_calls += slow
+            self._expire_calls_(now)
+            if len(self.calls) >= self.min_calls and (
+                self.failed_calls >= self.error_rate * len(self.calls)
+                or self.slow_calls >= self.slow_call_rate * len(self.calls)
+            ):
+                self._open_(now)
+
+    def current_state(self) -> CircuitState:
+        """The state the next call sees, half open once an open circuit timed out."""
+        with self.lock:
+            return self._current_state_(time.monotonic())
+
+    def statistics(self) -> Dict[Text, Union[Text, int]]:
+        with self.lock:
+            now: float = time.monotonic()
+            self._expire_calls_(now)
+            return {
+                "state": self._current_state_(now).value,
+                "calls": len(self.calls),
+                "failedCalls": self.failed_calls,
+                "slowCalls": self.slow_calls,
+                "openings": self.openings,
+                "rejectedCalls": self.rejected_calls,
+            }
+
+    def _record_trial_call_(self, now: float, failed: Optional[bool], slow: bool) -> None:
+        if failed is None:
+            # Gives the trial to another call
+            self.trial_calls -= 1
+        elif failed or slow:
+            self._open_(now)
+        else:
+            self.successful_trial_calls += 1
+            if self.successful_trial_calls >= self.half_open_calls:
+                self.state = CircuitState.CLOSED
+
+    def _current_state_(self, now: float) -> CircuitState:
+        if (
+            self.state == CircuitState.OPEN
+            and now - self.opened_at >= self.open_duration
+        ):
+            return CircuitState.HALF_OPEN
+        return self.state
+
+    def _open_(self, now: float) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self.openings += 1
+        self.calls.clear()
+        self.failed_calls = 0
+        self.slow_calls = 0
+
+    def _expire_calls_(self, now: float) -> None:
+        while len(self.calls) > 0 and self.calls[0][0] < now - self.window:
+            _, failed, slow = self.calls.popleft()
+            self.failed_calls -= failed
+            self.slow_calls -= slow
+
+
+# Shared by all clients of the Arbeitsagentur API in the process
+api_circuit_breaker = CircuitBreaker()
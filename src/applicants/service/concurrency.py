@@ -0,0 +1,32 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+async def gather_in_order(
+    calls: Iterable[Callable[[], Awaitable[T]]], concurrency: int
+) -> AsyncIterator[T]:
+    """Runs the calls concurrently and yields their results in the order of the calls.
+
+    At most `concurrency` calls run at the same time, the earlier ones first. If the
+    iteration stops early, e.g. because the caller breaks out of it or a call
+    fails, the calls still running or waiting are cancelled. Use it with
+    `contextlib.aclosing` so that this happens right away.
+    """
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def run(call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await call()
+
+    tasks: List[asyncio.Task] = [asyncio.ensure_future(run(call)) for call in calls]
+    try:
+        for task in tasks:
+            yield await task
+    finally:
+        pending: List[asyncio.Task] = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
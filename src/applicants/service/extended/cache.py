@@ -0,0 +1,76 @@
+from collections import OrderedDict
+import json
+import threading
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+from pydantic import BaseModel
+
+
+SearchKey = Tuple[Text, Text]
+
+
+def search_cache_key(search_parameters: BaseModel) -> SearchKey:
+    """Canonical form of search parameters, equal for searches with the same result.
+
+    All list filters are order independent, so the lists are sorted and deduplicated,
+    and an empty list is the same as no filter at all.
+    """
+    parameters: Dict[Text, Any] = search_parameters.model_dump(mode="json")
+    for name, value in parameters.items():
+        if isinstance(value, list):
+            parameters[name] = sorted(set(value)) if len(value) > 0 else None
+    return (
+        type(search_parameters).__name__,
+        json.dumps(parameters, sort_keys=True, ensure_ascii=False),
+    )
+
+
+class SearchResultCache:
+    """LRU cache of the ordered refnrs matching a search.
+
+    Every entry remembers the version of the store it was computed on. A lookup with
+    another version drops the entry, so that a write to the store invalidates all
+    results computed before it.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size: int = max_size
+        self.entries: OrderedDict[SearchKey, Tuple[int, List[Text]]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: SearchKey, version: int) -> Optional[List[Text]]:
+        with self.lock:
+            entry: Optional[Tuple[int, List[Text]]] = self.entries.get(key)
+            if entry is not None and entry[0] != version:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: SearchKey, version: int, refnrs: List[Text]) -> None:
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (version, refnrs)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def statistics(self) -> Dict[Text, int]:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self.entries),
+                "maxSize": self.max_size,
+            }
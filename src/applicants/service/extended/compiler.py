@@ -0,0 +1,606 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Text,
+    Tuple,
+    Union,
+)
+import logging
+
+from pydantic import BaseModel, TypeAdapter
+
+from src.applicants.schemas.arbeitsagentur.enums import WorkingTime
+from src.applicants.schemas.arbeitsagentur.schemas import TimePeriod
+from src.applicants.schemas.extended.request import (
+    ExtendedSearchParameters,
+    ExtendedDetailedSearchParameters,
+)
+from src.configs import DEFAULT_LOGGING_CONFIG
+
+
+logging.basicConfig(**DEFAULT_LOGGING_CONFIG)
+logger = logging.getLogger(__name__)
+
+
+Predicate = Callable[[Dict], bool]
+
+MISSING = object()
+
+TIME_PERIOD_PATTERN: re.Pattern = re.compile(TimePeriod._regexp_pattern_())
+
+DATE_ADAPTER: TypeAdapter = TypeAdapter(date)
+
+DATETIME_ADAPTER: TypeAdapter = TypeAdapter(datetime)
+
+
+class DerivedFields(NamedTuple):
+    """Numbers derived from an applicant document, computed once when it is written.
+
+    A value is None if it cannot be derived from the document, in which case the
+    filters using it do not match.
+    """
+
+    experience_days: Optional[int]
+    experience_years: Optional[int]
+    average_position_years: Optional[int]
+    sabbatical_days: Optional[int]
+    earliest_graduation_year: Optional[int]
+    latest_graduation_year: Optional[int]
+    available_from: Optional[date]
+    published_on: Optional[date]
+    updated_on: Optional[date]
+
+
+DerivedPredicate = Callable[[DerivedFields], bool]
+
+
+class CompiledQuery:
+    """A search query compiled into plain Python predicates over stored documents.
+
+    It is used like a TinyDB query: calling it with a raw applicant dict tells
+    whether the applicant matches. All regular expressions are compiled once, when
+    the query is built, and no pydantic model is created while matching.
+
+    Filters on numbers derived from the document are kept apart, as predicates over
+    `DerivedFields`. Stores keeping the derived fields of their documents evaluate
+    them with `matches_derived` without touching the documents at all.
+    """
+
+    def __init__(
+        self,
+        predicates: List[Tuple[Text, Predicate]],
+        search_parameters: BaseModel,
+        derived_predicates: Optional[List[Tuple[Text, DerivedPredicate]]] = None,
+    ):
+        self.predicates: List[Tuple[Text, Predicate]] = predicates
+        self.derived_predicates: List[Tuple[Text, DerivedPredicate]] = (
+            derived_predicates or []
+        )
+        self.search_parameters: BaseModel = search_parameters
+
+    def __call__(self, doc: Dict) -> bool:
+        if not self.matches_doc(doc):
+            return False
+        return len(self.derived_predicates) == 0 or self.matches_derived(
+            derive_fields(doc)
+        )
+
+    def matches_doc(self, doc: Dict) -> bool:
+        for _, predicate in self.predicates:
+            if not predicate(doc):
+                return False
+        return True
+
+    def matches_derived(self, derived_fields: DerivedFields) -> bool:
+        for _, predicate in self.derived_predicates:
+            if not predicate(derived_fields):
+                return False
+        return True
+
+    def is_cacheable(self) -> bool:
+        # The predicates are closures without a stable hash, TinyDB must not
+        # keep the results in its query cache
+        return False
+
+    def __repr__(self) -> Text:
+        names: Text = " & ".join(
+            [name for name, _ in self.predicates + self.derived_predicates]
+        )
+        return f"CompiledQuery({names})"
+
+
+def resolve(doc: Any, *path: Text) -> Any:
+    """Follows a path of keys in a document, returning MISSING if it does not exist."""
+    value: Any = doc
+    for key in path:
+        try:
+            value = value[key]
+        except (KeyError, TypeError, IndexError):
+            return MISSING
+    return value
+
+
+def compile_keyword(keyword: Text, flags: Union[int, re.RegexFlag] = re.IGNORECASE):
+    """Compiles a keyword the way TinyDB's `Query().matches` applies it."""
+    pattern: re.Pattern = re.compile(keyword, flags)
+
+    def matches(value: Any) -> bool:
+        return isinstance(value, str) and pattern.match(value) is not None
+
+    return matches
+
+
+def any_element(
+    values: Any, test: Callable[[Any], bool], *path: Text
+) -> bool:
+    if not isinstance(values, list):
+        return False
+    for element in values:
+        if test(resolve(element, *path)):
+            return True
+    return False
+
+
+@lru_cache(maxsize=4096)
+def parse_time_period(value: Text) -> Optional[Tuple[int, int, int]]:
+    """Parses a PnYnMnD duration into (years, months, days), None if it is invalid."""
+    search = TIME_PERIOD_PATTERN.match(value)
+    if search is None:
+        return None
+    return (
+        int(search.group(2) or 0),
+        int(search.group(4) or 0),
+        int(search.group(6) or 0),
+    )
+
+
+def time_period_years(value: Any) -> Optional[int]:
+    if not isinstance(value, str):
+        return None
+    time_period = parse_time_period(value)
+    if time_period is None:
+        return None
+    return time_period[0]
+
+
+def time_period_days(value: Any) -> Optional[int]:
+    """Same as `TimePeriod.get_time`, the duration in days."""
+    if not isinstance(value, str):
+        return None
+    time_period = parse_time_period(value)
+    if time_period is None:
+        return None
+    years, months, days = time_period
+    return years * 365 + months * 30 + days
+
+
+@lru_cache(maxsize=16384)
+def _parse_date_(value: Text) -> Optional[date]:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return DATE_ADAPTER.validate_python(value)
+
+
+@lru_cache(maxsize=16384)
+def _parse_datetime_date_(value: Text) -> date:
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        return DATETIME_ADAPTER.validate_python(value).date()
+
+
+def parse_datetime_date(value: Any) -> Optional[date]:
+    """Date part of an ISO 8601 date-time, as stored for `aktualisierungsdatum`."""
+    if value is None or value is MISSING:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    return _parse_datetime_date_(str(value))
+
+
+def parse_date(value: Any) -> Optional[date]:
+    if value is None or value is MISSING:
+        return None
+    if isinstance(value, date):
+        return value
+    return _parse_date_(str(value))
+
+
+def average_position_years(berufsfeld_erfahrungen: Any) -> int:
+    """Average duration of the experiences per job field, in whole years."""
+    if not isinstance(berufsfeld_erfahrungen, list):
+        return 0
+    job_position_time_list: List[int] = []
+    for berufsfeld_erfahrung in berufsfeld_erfahrungen:
+        days: Optional[int] = time_period_days(resolve(berufsfeld_erfahrung, "erfahrung"))
+        if days is not None:
+            job_position_time_list.append(days)
+    if len(job_position_time_list) == 0:
+        return 0
+    avg_job_position_time = sum(job_position_time_list) / len(job_position_time_list)
+    return int(avg_job_position_time / 365.25)
+
+
+def sabbatical_time(werdegang: Any) -> Optional[timedelta]:
+    """Time between the consecutive entries of a career.
+
+    Returns None if the career is missing or one of the entries has no start date,
+    or no end date while being followed by another entry.
+    """
+    if not isinstance(werdegang, list):
+        return None
+    total_time = timedelta(0)
+    last_stop: Any = MISSING
+    for lebenslauf_element in werdegang:
+        start_date: Optional[date] = parse_date(resolve(lebenslauf_element, "von"))
+        if start_date is None or last_stop is None:
+            return None
+        if last_stop is not MISSING:
+            total_time += last_stop - start_date
+        last_stop = parse_date(resolve(lebenslauf_element, "bis"))
+    return total_time
+
+
+def search_keyword_values(doc: Dict) -> Iterator[Any]:
+    """Yields the values of an applicant that the search keywords are matched on."""
+    yield resolve(doc, "refnr")
+    yield resolve(doc, "freierTitelStellengesuch")
+    berufe: Any = resolve(doc, "berufe")
+    if isinstance(berufe, list):
+        yield from berufe
+    yield resolve(doc, "letzteTaetigkeit", "bezeichnung")
+    berufsfeld_erfahrungen: Any = resolve(doc, "erfahrung", "berufsfeldErfahrung")
+    if isinstance(berufsfeld_erfahrungen, list):
+        for berufsfeld_erfahrung in berufsfeld_erfahrungen:
+            yield resolve(berufsfeld_erfahrung, "berufsfeld")
+    ausbildungen: Any = resolve(doc, "ausbildungen")
+    if isinstance(ausbildungen, list):
+        for ausbildung in ausbildungen:
+            yield resolve(ausbildung, "art")
+
+
+def graduation_years(ausbildungen: Any) -> List[int]:
+    if not isinstance(ausbildungen, list):
+        return []
+    return [
+        jahr
+        for jahr in [resolve(ausbildung, "jahr") for ausbildung in ausbildungen]
+        if isinstance(jahr, int)
+    ]
+
+
+def derive_fields(doc: Dict) -> DerivedFields:
+    """Computes the derived numbers the search filters compare against."""
+    gesamterfahrung: Any = resolve(doc, "erfahrung", "gesamterfahrung")
+    berufsfeld_erfahrungen: Any = resolve(doc, "erfahrung", "berufsfeldErfahrung")
+    total_sabbatical_time: Optional[timedelta] = sabbatical_time(
+        resolve(doc, "werdegang")
+    )
+    years: List[int] = graduation_years(resolve(doc, "ausbildungen"))
+    return DerivedFields(
+        experience_days=time_period_days(gesamterfahrung),
+        experience_years=time_period_years(gesamterfahrung),
+        average_position_years=(
+            None
+            if berufsfeld_erfahrungen is MISSING
+            else average_position_years(berufsfeld_erfahrungen)
+        ),
+        sabbatical_days=(
+            None if total_sabbatical_time is None else total_sabbatical_time.days
+        ),
+        earliest_graduation_year=min(years) if len(years) > 0 else None,
+        latest_graduation_year=max(years) if len(years) > 0 else None,
+        available_from=parse_date(resolve(doc, "verfuegbarkeitVon")),
+        published_on=parse_date(resolve(doc, "veroeffentlichungsdatum")),
+        updated_on=parse_datetime_date(resolve(doc, "aktualisierungsdatum")),
+    )
+
+
+def compile_date_filters(
+    search_parameters: Union[ExtendedSearchParameters, ExtendedDetailedSearchParameters],
+) -> List[Tuple[Text, DerivedPredicate]]:
+    """Predicates of the date filters shared by both searches."""
+    derived_predicates: List[Tuple[Text, DerivedPredicate]] = []
+
+    if search_parameters.available_from is not None:
+        available_from: date = search_parameters.available_from
+
+        def availability_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.available_from is not None
+                and derived_fields.available_from <= available_from
+            )
+
+        derived_predicates.append(
+            (f"available_from({available_from})", availability_check)
+        )
+
+    if search_parameters.published_since is not None:
+        published_since: date = search_parameters.published_since
+
+        def publication_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.published_on is not None
+                and derived_fields.published_on >= published_since
+            )
+
+        derived_predicates.append(
+            (f"published_since({published_since})", publication_check)
+        )
+
+    if search_parameters.updated_since is not None:
+        updated_since: date = search_parameters.updated_since
+
+        def update_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.updated_on is not None
+                and derived_fields.updated_on >= updated_since
+            )
+
+        derived_predicates.append((f"updated_since({updated_since})", update_check))
+
+    return derived_predicates
+
+
+def compile_search_query(
+    search_parameters: ExtendedSearchParameters,
+) -> Optional[CompiledQuery]:
+    """Compiled counterpart of `build_search_query`."""
+    predicates: List[Tuple[Text, Predicate]] = []
+    derived_predicates: List[Tuple[Text, DerivedPredicate]] = []
+
+    if search_parameters.keywords is not None and search_parameters.keywords != []:
+        for keyword in search_parameters.keywords:
+            matches = compile_keyword(keyword)
+
+            def keyword_check(doc: Dict, matches=matches) -> bool:
+                return any(matches(value) for value in search_keyword_values(doc))
+
+            predicates.append((f"keyword({keyword!r})", keyword_check))
+
+    if search_parameters.max_graduation_year is not None:
+        max_graduation_year: int = search_parameters.max_graduation_year
+
+        def graduation_year_check(derived_fields: DerivedFields) -> bool:
+            # Some graduation is before the limit iff the earliest one is
+            return (
+                derived_fields.earliest_graduation_year is not None
+                and derived_fields.earliest_graduation_year <= max_graduation_year
+            )
+
+        derived_predicates.append(
+            (f"max_graduation_year({max_graduation_year})", graduation_year_check)
+        )
+
+    if search_parameters.min_work_experience_years is not None:
+        min_work_experience_years: int = search_parameters.min_work_experience_years
+
+        def experience_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.experience_years is not None
+                and min_work_experience_years <= derived_fields.experience_years
+            )
+
+        derived_predicates.append(
+            (f"min_work_experience_years({min_work_experience_years})", experience_check)
+        )
+
+    if search_parameters.career_field is not None:
+        career_field_matches = compile_keyword(search_parameters.career_field)
+
+        def career_field_check(doc: Dict) -> bool:
+            return any_element(
+                resolve(doc, "erfahrung", "berufsfeldErfahrung"),
+                career_field_matches,
+                "berufsfeld",
+            )
+
+        predicates.append(
+            (f"career_field({search_parameters.career_field!r})", career_field_check)
+        )
+
+    if (
+        search_parameters.working_time is not None
+        and search_parameters.working_time != WorkingTime.UNDEFINED
+    ):
+        working_time: Text = search_parameters.working_time.value
+
+        def working_time_check(doc: Dict) -> bool:
+            return any_element(
+                resolve(doc, "arbeitszeitModelle"),
+                lambda value: isinstance(value, str) and value in working_time,
+            )
+
+        predicates.append((f"working_time({working_time!r})", working_time_check))
+
+    if search_parameters.location_keyword is not None:
+        location_matches = compile_keyword(search_parameters.location_keyword)
+
+        def location_check(doc: Dict) -> bool:
+            lokation: Any = resolve(doc, "lokation")
+            return (
+                location_matches(resolve(lokation, "ort"))
+                or location_matches(resolve(lokation, "land"))
+                or location_matches(resolve(lokation, "plz"))
+                or location_matches(resolve(lokation, "bundesland"))
+                or location_matches(resolve(lokation, "region"))
+            )
+
+        predicates.append(
+            (f"location({search_parameters.location_keyword!r})", location_check)
+        )
+
+    derived_predicates.extend(compile_date_filters(search_parameters))
+
+    if len(predicates) == 0 and len(derived_predicates) == 0:
+        return None
+    return CompiledQuery(predicates, search_parameters, derived_predicates)
+
+
+EDUCATION_FIELDS: List[Text] = [
+    "ort",
+    "land",
+    "lebenslaufart",
+    "berufsbezeichnung",
+    "beschreibung",
+    "lebenslaufartenKategorie",
+    "nameArtEinrichtung",
+    "schulAbschluss",
+    "schulart",
+]
+
+KNOWLEDGE_LEVELS: List[Text] = [
+    "Expertenkenntnisse",
+    "ErweiterteKenntnisse",
+    "Grundkenntnisse",
+]
+
+
+def compile_detailed_search_query(
+    search_parameters: ExtendedDetailedSearchParameters,
+) -> Optional[CompiledQuery]:
+    """Compiled counterpart of `build_detailed_search_query`."""
+    predicates: List[Tuple[Text, Predicate]] = []
+    derived_predicates: List[Tuple[Text, DerivedPredicate]] = []
+
+    if search_parameters.job_title is not None:
+        job_title_matches = compile_keyword(search_parameters.job_title)
+        predicates.append(
+            (
+                f"job_title({search_parameters.job_title!r})",
+                lambda doc: job_title_matches(resolve(doc, "freierTitelStellengesuch")),
+            )
+        )
+
+    if search_parameters.location is not None:
+        location_matches = compile_keyword(search_parameters.location)
+        predicates.append(
+            (
+                f"location({search_parameters.location!r})",
+                lambda doc: any_element(
+                    resolve(doc, "lokationen"), location_matches, "ort"
+                ),
+            )
+        )
+
+    if search_parameters.min_avg_job_position_years is not None:
+        min_avg_job_position_years: int = search_parameters.min_avg_job_position_years
+
+        def avg_duration_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.average_position_years is not None
+                and derived_fields.average_position_years >= min_avg_job_position_years
+            )
+
+        derived_predicates.append(
+            (
+                f"min_avg_job_position_years({min_avg_job_position_years})",
+                avg_duration_check,
+            )
+        )
+
+    if search_parameters.min_work_experience_years is not None:
+        min_work_experience_years: int = search_parameters.min_work_experience_years
+
+        def experience_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.experience_years is not None
+                and derived_fields.experience_years >= min_work_experience_years
+            )
+
+        derived_predicates.append(
+            (f"min_work_experience_years({min_work_experience_years})", experience_check)
+        )
+
+    if search_parameters.max_sabbatical_time_years is not None:
+        max_sabbatical_time_years: int = search_parameters.max_sabbatical_time_years
+
+        def max_sabbatical_time_check(derived_fields: DerivedFields) -> bool:
+            return (
+                derived_fields.sabbatical_days is not None
+                and (derived_fields.sabbatical_days / 365.25) <= max_sabbatical_time_years
+            )
+
+        derived_predicates.append(
+            (
+                f"max_sabbatical_time_years({max_sabbatical_time_years})",
+                max_sabbatical_time_check,
+            )
+        )
+
+    if search_parameters.job_keywords:
+        for keyword in search_parameters.job_keywords:
+            matches = compile_keyword(keyword)
+
+            def job_keyword_check(doc: Dict, matches=matches) -> bool:
+                return (
+                    any_element(resolve(doc, "berufe"), matches)
+                    or any_element(
+                        resolve(doc, "erfahrung", "berufsfeldErfahrung"),
+                        matches,
+                        "berufsfeld",
+                    )
+                    or any_element(resolve(doc, "werdegang"), matches, "berufsbezeichnung")
+                    or any_element(resolve(doc, "werdegang"), matches, "beschreibung")
+                )
+
+            predicates.append((f"job_keyword({keyword!r})", job_keyword_check))
+
+    if search_parameters.education_keyword is not None:
+        education_matches = compile_keyword(search_parameters.education_keyword)
+
+        def education_check(doc: Dict) -> bool:
+            bildung: Any = resolve(doc, "bildung")
+            return any_element(
+                bildung,
+                lambda element: any(
+                    education_matches(resolve(element, field))
+                    for field in EDUCATION_FIELDS
+                ),
+            )
+
+        predicates.append(
+            (f"education({search_parameters.education_keyword!r})", education_check)
+        )
+
+    if search_parameters.skills:
+        for skill_keyword in search_parameters.skills:
+            # Skills are matched case sensitive, like in build_detailed_search_query
+            skill_matches = compile_keyword(skill_keyword, 0)
+
+            def skill_check(doc: Dict, skill_matches=skill_matches) -> bool:
+                return any(
+                    any_element(resolve(doc, "kenntnisse", level), skill_matches)
+                    for level in KNOWLEDGE_LEVELS
+                ) or any_element(resolve(doc, "softskills"), skill_matches)
+
+            predicates.append((f"skill({skill_keyword!r})", skill_check))
+
+    if search_parameters.languages:
+        languages: List[Text] = search_parameters.languages
+
+        def languages_check(doc: Dict) -> bool:
+            return any(
+                any_element(
+                    resolve(doc, "sprachkenntnisse", level),
+                    lambda language: language in languages,
+                )
+                for level in KNOWLEDGE_LEVELS
+            )
+
+        predicates.append((f"languages({languages!r})", languages_check))
+
+    derived_predicates.extend(compile_date_filters(search_parameters))
+
+    if len(predicates) == 0 and len(derived_predicates) == 0:
+        return None
+    return CompiledQuery(predicates, search_parameters, derived_predicates)
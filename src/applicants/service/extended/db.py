@@ -1,142 +1,534 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 import datetime
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Text, Union
-from tinydb import TinyDB, Query
-
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Text,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from tinydb import TinyDB
+from tinydb.middlewares import Middleware
 from tinydb.queries import QueryLike
+from tinydb.storages import JSONStorage
 from tinydb.table import Document
+from pydantic import BaseModel
 
 from src.applicants.schemas.arbeitsagentur.enums import *
+from src.configs import SEARCH_CACHE_SIZE
 from src.applicants.schemas.arbeitsagentur.schemas import (
     BewerberUebersicht,
     BewerberDetail,
+    GenericBewerber,
+)
+from src.applicants.service.extended.cache import (
+    SearchKey,
+    SearchResultCache,
+    search_cache_key,
+)
+from src.applicants.service.extended.compiler import (
+    CompiledQuery,
+    DerivedFields,
+    derive_fields,
+)
+from src.applicants.service.extended.index import (
+    DETAILED_APPLICANTS_INDEXES,
+    SEARCHED_APPLICANTS_INDEXES,
+    ApplicantIndex,
+    intersect,
 )
 
 
 PathLike = Union[Path, Text]
 
+ApplicantType = TypeVar("ApplicantType", bound=GenericBewerber)
 
-class DetailedApplicantsDb:
-    def __init__(self, db_path: PathLike = "data/db/applicants_detail.json"):
-        self.db = TinyDB(db_path)
-
-    def insert(self, applicant: BewerberDetail):
-        query = Query()
-        if self.db.contains(query.refnr == applicant.refnr):
-            raise ValueError(f"Document with refnr {applicant.refnr} already exists.")
-        applicant_serializable_dict = self._serialize_object_(applicant)
-        self.db.insert(applicant_serializable_dict)
-
-    def get(self, query: QueryLike) -> List[BewerberDetail]:
-        docs: List[Document] = self.db.search(query)
-        applicants: List[BewerberDetail] = [
-            self._unserealize_object_(doc) for doc in docs
-        ]
-        return applicants
+# Field of the stored documents holding the time they were last stored at, as a
+# Unix timestamp. It is not part of the models, so it is dropped when they are read.
+STORED_AT_FIELD: Text = "_storedAt"
 
-    def get_by_refnr(self, refnr: Text) -> Optional[BewerberDetail]:
-        doc: Optional[Document | List[Document]] = self.db.get(Query().refnr == refnr)
-        if doc is None:
-            return None
-        elif isinstance(doc, list):
-            return self._unserealize_object_(doc[0])
-        return self._unserealize_object_(doc)
 
-    def _serialize_object_(self, applicant: BewerberDetail) -> Dict:
-        applicant_json = json.dumps(applicant.__dict__, default=default_json_dumps)
-        applicant_serializable_dict = json.loads(applicant_json)
-        return applicant_serializable_dict
+class ReadCacheMiddleware(Middleware):
+    """TinyDB middleware keeping the parsed database in memory.
 
-    def _unserealize_object_(self, applicant_dict: Dict) -> BewerberDetail:
-        return BewerberDetail(**applicant_dict)
+    Reads are served from memory once the file has been parsed, writes are passed
+    through to the underlying storage immediately, so the file on disk is always
+    up to date. Inside a `batch()` block, writes only update the memory copy and the
+    file is written once when the block is left.
+    """
 
-    def upsert(self, applicant: BewerberDetail):
-        query = Query()
-        if self.db.contains(query.refnr == applicant.refnr):
-            serializable_dict = self._serialize_object_(applicant)
-            self.db.upsert(serializable_dict, Query().refnr == applicant.refnr)
+    def __init__(self, storage_cls=JSONStorage):
+        super().__init__(storage_cls)
+        self.path: Optional[Path] = None
+        self.mtime: Optional[int] = None
+        self.cache: Optional[Dict[Text, Dict[Text, Any]]] = None
+        self.is_batching: bool = False
+        self.is_dirty: bool = False
+
+    def __call__(self, path: PathLike, *args, **kwargs):
+        self.path = Path(path)
+        return super().__call__(path, *args, **kwargs)
+
+    def read(self) -> Optional[Dict[Text, Dict[Text, Any]]]:
+        if self.cache is None:
+            self.cache = self.storage.read()
+            self.mtime = self._file_mtime_()
+        return self.cache
+
+    def write(self, data: Dict[Text, Dict[Text, Any]]) -> None:
+        self.cache = data
+        if self.is_batching:
+            self.is_dirty = True
         else:
-            self.insert(applicant)
+            self._write_through_(data)
 
-    def get_all(self) -> List[BewerberDetail]:
-        docs: List[Document] = self.db.all()
-        applicants: List[BewerberDetail] = [
-            self._unserealize_object_(doc) for doc in docs
-        ]
-        return applicants
+    def is_stale(self) -> bool:
+        """Whether the file has been modified by someone else since it was read."""
+        return self.cache is not None and self._file_mtime_() != self.mtime
 
+    def _write_through_(self, data: Dict[Text, Dict[Text, Any]]) -> None:
+        self.storage.write(data)
+        self.mtime = self._file_mtime_()
 
-class SearchedApplicantsDb:
-    def __init__(self, db_path: PathLike = "data/db/applicants.json"):
-        self.db = TinyDB(db_path)
-
-    def insert(self, applicant: BewerberUebersicht):
-        query = Query()
-        if self.db.contains(query.refnr == applicant.refnr):
-            raise ValueError(f"Document with refnr {applicant.refnr} already exists.")
-        applicant_serializable_dict = self._serialize_object_(applicant)
-        self.db.insert(applicant_serializable_dict)
-
-    def get_by_refnr(self, refnr: Text) -> Optional[BewerberUebersicht]:
-        doc: Optional[Document | List[Document]] = self.db.get(Query().refnr == refnr)
-        if doc is None:
+    def _file_mtime_(self) -> Optional[int]:
+        if self.path is None or not self.path.exists():
             return None
-        elif isinstance(doc, list):
-            return BewerberUebersicht(**doc[0])
-        return BewerberUebersicht(**doc)
-
-    def get_by_refnrs(self, refnrs: List[Text]) -> List[BewerberUebersicht]:
-        docs: List[Document] = self.db.search(Query().refnr.test(lambda x: x in refnrs))
-        applicants: List[BewerberUebersicht] = [
-            self._unserealize_object_(doc) for doc in docs
+        return self.path.stat().st_mtime_ns
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        if self.is_batching:
+            yield
+            return
+        self.is_batching = True
+        try:
+            yield
+        finally:
+            self.is_batching = False
+            if self.is_dirty and self.cache is not None:
+                self._write_through_(self.cache)
+            self.is_dirty = False
+
+
+class ApplicantsDb(ABC, Generic[ApplicantType]):
+    """Base class for the local applicant stores.
+
+    Implements the public store interface on top of a few abstract storage
+    primitives, which are provided by the TinyDB and SQLite subclasses. Documents are always handled
+    as plain JSON-serializable dicts keyed by their refnr.
+
+    Next to the storage, the store keeps the in-memory indexes listed in
+    `index_classes` and the derived fields of every document up to date. They are
+    built when the store is opened and used to narrow down searches with compiled
+    queries. The results of `find` are cached per search parameters until the next
+    write, which bumps the store `version`.
+    """
+
+    model: Type[ApplicantType]
+    index_classes: List[Type[ApplicantIndex]] = []
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.positions: Dict[Text, int] = {}
+        self.next_position: int = 0
+        self.derived_fields: Dict[Text, DerivedFields] = {}
+        self.indexes: List[ApplicantIndex] = [
+            index_class() for index_class in self.index_classes
+        ]
+        self.version: int = 0
+        self.search_cache = SearchResultCache(SEARCH_CACHE_SIZE)
+
+    def insert(self, applicant: ApplicantType) -> None:
+        with self.lock:
+            if self.contains(applicant.refnr):
+                raise ValueError(
+                    f"Document with refnr {applicant.refnr} already exists."
+                )
+            self._store_applicants_([applicant])
+
+    def get(self, query: QueryLike) -> List[ApplicantType]:
+        applicants: List[ApplicantType] = [
+            self._unserealize_object_(doc) for doc in self._search_docs_(query)
         ]
         return applicants
 
-    def get(self, query: QueryLike) -> List[BewerberUebersicht]:
-        docs: List[Document] = self.db.search(query)
-        applicants: List[BewerberUebersicht] = [
-            self._unserealize_object_(doc) for doc in docs
+    def find(self, query: Optional[QueryLike]) -> "ApplicantCursor[ApplicantType]":
+        """Searches lazily, all applicants match if the query is None.
+
+        Matching is done on the stored documents, models are only created for the
+        applicants read from the returned cursor.
+        """
+        search_parameters: Optional[BaseModel] = getattr(
+            query, "search_parameters", None
+        )
+        if search_parameters is None:
+            return ApplicantCursor(self, self._search_refnrs_(query))
+
+        key: SearchKey = search_cache_key(search_parameters)
+        # The version is read before searching, a result computed while another
+        # thread writes is then outdated as soon as it is cached
+        version: int = self.version
+        refnrs: Optional[List[Text]] = self.search_cache.get(key, version)
+        if refnrs is None:
+            refnrs = self._search_refnrs_(query)
+            self.search_cache.put(key, version, refnrs)
+        return ApplicantCursor(self, refnrs)
+
+    def get_by_refnr(self, refnr: Text) -> Optional[ApplicantType]:
+        docs: List[Dict] = self._read_docs_([refnr])
+        if len(docs) == 0:
+            return None
+        return self._unserealize_object_(docs[0])
+
+    def get_with_stored_at(
+        self, refnr: Text
+    ) -> Tuple[Optional[ApplicantType], Optional[float]]:
+        """The applicant and the time it was stored at, None if unknown.
+
+        The time is None as well for documents stored before it was recorded.
+        """
+        docs: List[Dict] = self._read_docs_([refnr])
+        if len(docs) == 0:
+            return None, None
+        return self._unserealize_object_(docs[0]), docs[0].get(STORED_AT_FIELD)
+
+    def get_by_refnrs(self, refnrs: List[Text]) -> List[ApplicantType]:
+        applicants: List[ApplicantType] = [
+            self._unserealize_object_(doc) for doc in self._read_docs_(refnrs)
         ]
         return applicants
 
-    def get_all(self) -> List[BewerberUebersicht]:
-        docs: List[Document] = self.db.all()
-        applicants: List[BewerberUebersicht] = [
-            self._unserealize_object_(doc) for doc in docs
+    def get_all(self) -> List[ApplicantType]:
+        applicants: List[ApplicantType] = [
+            self._unserealize_object_(doc) for doc in self._iter_docs_()
         ]
         return applicants
 
+    @abstractmethod
+    def contains(self, refnr: Text) -> bool:
+        ...
+
     def update(self, query: QueryLike, data) -> None:
-        self.db.update(data, query)
+        with self.lock:
+            updated_docs: Dict[Text, Dict] = {}
+            for doc in self._search_docs_(query):
+                updated_doc: Dict = dict(doc)
+                if callable(data):
+                    data(updated_doc)
+                else:
+                    updated_doc.update(data)
+                updated_docs[doc["refnr"]] = updated_doc
+            if len(updated_docs) > 0:
+                self._store_docs_(updated_docs)
 
-    def upsert(self, applicant: BewerberUebersicht) -> None:
-        query = Query()
-        if self.db.contains(query.refnr == applicant.refnr):
-            serializable_dict = self._serialize_object_(applicant)
-            self.db.upsert(serializable_dict, Query().refnr == applicant.refnr)
-        else:
-            self.insert(applicant)
+    def upsert(self, applicant: ApplicantType) -> None:
+        self._store_applicants_([applicant])
+
+    def upsert_many(self, applicants: Iterable[ApplicantType]) -> None:
+        """Upserts a batch of applicants with a single write to the storage."""
+        self._store_applicants_(applicants)
 
     def remove(self, query: QueryLike) -> None:
-        self.db.remove(query)
+        with self.lock:
+            refnrs: List[Text] = [doc["refnr"] for doc in self._search_docs_(query)]
+            if len(refnrs) > 0:
+                self._delete_docs_(refnrs)
+                for refnr in refnrs:
+                    self._unindex_doc_(refnr)
+                self.version += 1
 
     def remove_all(self) -> None:
-        self.db.purge()
+        with self.lock:
+            self._delete_all_docs_()
+            self.positions = {}
+            self.derived_fields = {}
+            self.version += 1
+            for index in self.indexes:
+                index.clear()
+
+    def is_stale(self) -> bool:
+        """Whether the storage has been modified by another process since it was opened."""
+        return False
 
+    @abstractmethod
     def close(self) -> None:
-        self.db.close()
+        ...
 
-    def __del__(self) -> None:
-        self.db.close()
+    def _build_indexes_(self) -> None:
+        """Fills the indexes from the storage, called once the storage is opened."""
+        with self.lock:
+            for doc in self._iter_docs_():
+                self._index_doc_(doc, bulk=True)
+            for index in self.indexes:
+                index.end_bulk_add()
+
+    def _index_doc_(self, doc: Dict, bulk: bool = False) -> None:
+        refnr: Text = doc["refnr"]
+        if refnr not in self.positions:
+            self.positions[refnr] = self.next_position
+            self.next_position += 1
+        derived_fields: DerivedFields = derive_fields(doc)
+        self.derived_fields[refnr] = derived_fields
+        for index in self.indexes:
+            if bulk:
+                index.bulk_add(refnr, doc, derived_fields)
+            else:
+                index.add(refnr, doc, derived_fields)
+
+    def _unindex_doc_(self, refnr: Text) -> None:
+        self.positions.pop(refnr, None)
+        self.derived_fields.pop(refnr, None)
+        for index in self.indexes:
+            index.remove(refnr)
+
+    def _store_applicants_(self, applicants: Iterable[ApplicantType]) -> None:
+        stored_at: float = time.time()
+        docs: Dict[Text, Dict] = {}
+        for applicant in applicants:
+            docs.setdefault(applicant.refnr, {}).update(
+                self._serialize_object_(applicant)
+            )
+            docs[applicant.refnr][STORED_AT_FIELD] = stored_at
+        if len(docs) > 0:
+            self._store_docs_(docs)
+
+    def _store_docs_(self, docs: Dict[Text, Dict]) -> None:
+        with self.lock:
+            for stored_doc in self._write_docs_(docs):
+                self._index_doc_(stored_doc)
+            self.version += 1
+
+    def _candidates_(self, query: QueryLike) -> Optional[List[Text]]:
+        """Asks the indexes for the refnrs that may match a compiled query.
 
-    def _serialize_object_(self, applicant: BewerberUebersicht) -> Dict:
+        Returns them in storage order, or None if the whole store has to be scanned.
+        """
+        search_parameters: Optional[BaseModel] = getattr(
+            query, "search_parameters", None
+        )
+        if search_parameters is None:
+            return None
+        with self.lock:
+            candidates: Optional[Set[Text]] = intersect(
+                [
+                    refnrs
+                    for refnrs in [
+                        index.candidates(search_parameters) for index in self.indexes
+                    ]
+                    if refnrs is not None
+                ]
+            )
+            if candidates is None:
+                return None
+            return sorted(candidates, key=self.positions.__getitem__)
+
+    def _filter_derived_(
+        self, query: CompiledQuery, candidates: Optional[List[Text]]
+    ) -> List[Text]:
+        with self.lock:
+            refnrs: Iterable[Text] = (
+                self.positions.keys() if candidates is None else candidates
+            )
+            return [
+                refnr
+                for refnr in refnrs
+                if query.matches_derived(self.derived_fields[refnr])
+            ]
+
+    def _search_docs_(self, query: QueryLike) -> List[Dict]:
+        candidates: Optional[List[Text]] = self._candidates_(query)
+        if not isinstance(query, CompiledQuery) or len(query.derived_predicates) == 0:
+            docs: Iterable[Dict] = (
+                self._iter_docs_()
+                if candidates is None
+                else self._read_docs_(candidates)
+            )
+            return [doc for doc in docs if query(doc)]
+
+        # Filter on the derived fields first, only the remaining documents are read
+        candidates = self._filter_derived_(query, candidates)
+        return [doc for doc in self._read_docs_(candidates) if query.matches_doc(doc)]
+
+    def _search_refnrs_(self, query: Optional[QueryLike]) -> List[Text]:
+        if query is None:
+            with self.lock:
+                return list(self.positions.keys())
+        if isinstance(query, CompiledQuery) and len(query.predicates) == 0:
+            # Decided by the indexes and derived fields, no document has to be read
+            return self._filter_derived_(query, self._candidates_(query))
+        return [doc["refnr"] for doc in self._search_docs_(query)]
+
+    @abstractmethod
+    def _iter_docs_(self) -> Iterator[Dict]:
+        """Iterates over all stored documents in insertion order."""
+
+    @abstractmethod
+    def _read_docs_(self, refnrs: Iterable[Text]) -> List[Dict]:
+        """Returns the stored documents of the given refnrs, skipping unknown ones."""
+
+    @abstractmethod
+    def _write_docs_(self, docs: Dict[Text, Dict]) -> List[Dict]:
+        """Inserts or merges the given documents, keyed by refnr, in one write.
+
+        Returns the documents as they are stored after the write.
+        """
+
+    @abstractmethod
+    def _delete_docs_(self, refnrs: List[Text]) -> None:
+        ...
+
+    @abstractmethod
+    def _delete_all_docs_(self) -> None:
+        ...
+
+    def _serialize_object_(self, applicant: ApplicantType) -> Dict:
         applicant_json = json.dumps(applicant.__dict__, default=default_json_dumps)
         applicant_serializable_dict = json.loads(applicant_json)
         return applicant_serializable_dict
 
-    def _unserealize_object_(self, applicant_dict: Dict) -> BewerberUebersicht:
-        return BewerberUebersicht(**applicant_dict)
+    def _unserealize_object_(self, applicant_dict: Dict) -> ApplicantType:
+        return self.model(**applicant_dict)
+
+
+class ApplicantCursor(Generic[ApplicantType]):
+    """Lazy result of `ApplicantsDb.find`.
+
+    Holds the refnrs of the matching applicants in storage order. The stored
+    documents are only read and turned into models when accessed, e.g. for the one
+    page of results returned by an endpoint.
+    """
+
+    batch_size: int = 100
+
+    def __init__(self, db: ApplicantsDb[ApplicantType], refnrs: List[Text]):
+        self.db: ApplicantsDb[ApplicantType] = db
+        self.refnrs: List[Text] = refnrs
+
+    def __len__(self) -> int:
+        return len(self.refnrs)
+
+    def __iter__(self) -> Iterator[ApplicantType]:
+        for start in range(0, len(self.refnrs), self.batch_size):
+            yield from self.db.get_by_refnrs(
+                self.refnrs[start : start + self.batch_size]
+            )
+
+    def page(self, page: int, size: int) -> List[ApplicantType]:
+        """The applicants of a 1-based page, might be fewer if some were removed since."""
+        return self.db.get_by_refnrs(
+            self.refnrs[(page - 1) * size : (page - 1) * size + size]
+        )
+
+
+class TinyApplicantsDb(ApplicantsDb[ApplicantType]):
+    """Applicant store backed by a TinyDB JSON file.
+
+    Keeps a refnr -> document id index next to the TinyDB table, so that point
+    lookups and upserts by refnr do not need to scan the whole table. The index is
+    rebuilt when the database is opened and kept up to date on every write going
+    through this class.
+    """
+
+    def __init__(self, db_path: PathLike):
+        super().__init__()
+        self.db = TinyDB(db_path, storage=ReadCacheMiddleware(JSONStorage))
+        self.refnr_index: Dict[Text, int] = {}
+        self._build_refnr_index_()
+        self._build_indexes_()
+
+    def contains(self, refnr: Text) -> bool:
+        return refnr in self.refnr_index
+
+    def is_stale(self) -> bool:
+        return self.db.storage.is_stale()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __del__(self) -> None:
+        if hasattr(self, "db"):
+            self.db.close()
+
+    def _build_refnr_index_(self) -> None:
+        self.refnr_index = {doc["refnr"]: doc.doc_id for doc in self.db.all()}
+
+    def _iter_docs_(self) -> Iterator[Dict]:
+        return iter(self.db)
+
+    def _read_docs_(self, refnrs: Iterable[Text]) -> List[Dict]:
+        docs: List[Dict] = []
+        for refnr in refnrs:
+            doc_id: Optional[int] = self.refnr_index.get(refnr)
+            if doc_id is None:
+                continue
+            doc: Optional[Document] = self.db.get(doc_id=doc_id)
+            if doc is not None:
+                docs.append(doc)
+        return docs
+
+    def _write_docs_(self, docs: Dict[Text, Dict]) -> List[Dict]:
+        updates: Dict[Text, Dict] = {
+            refnr: doc for refnr, doc in docs.items() if refnr in self.refnr_index
+        }
+        inserts: Dict[Text, Dict] = {
+            refnr: doc for refnr, doc in docs.items() if refnr not in self.refnr_index
+        }
+
+        with self.lock, self.db.storage.batch():
+            if len(updates) > 0:
+                self.db.update(
+                    lambda doc: doc.update(updates[doc["refnr"]]),
+                    doc_ids=[self.refnr_index[refnr] for refnr in updates.keys()],
+                )
+            if len(inserts) > 0:
+                doc_ids: List[int] = self.db.insert_multiple(inserts.values())
+                for refnr, doc_id in zip(inserts.keys(), doc_ids):
+                    self.refnr_index[refnr] = doc_id
+        return self._read_docs_(docs.keys())
+
+    def _delete_docs_(self, refnrs: List[Text]) -> None:
+        with self.lock:
+            doc_ids: List[int] = [
+                self.refnr_index.pop(refnr)
+                for refnr in refnrs
+                if refnr in self.refnr_index
+            ]
+            if len(doc_ids) > 0:
+                self.db.remove(doc_ids=doc_ids)
+
+    def _delete_all_docs_(self) -> None:
+        with self.lock:
+            self.db.truncate()
+            self.refnr_index = {}
+
+
+class DetailedApplicantsDb(TinyApplicantsDb[BewerberDetail]):
+    model = BewerberDetail
+    index_classes = DETAILED_APPLICANTS_INDEXES
+
+    def __init__(self, db_path: PathLike = "data/db/applicants_detail.json"):
+        super().__init__(db_path)
+
+
+class SearchedApplicantsDb(TinyApplicantsDb[BewerberUebersicht]):
+    model = BewerberUebersicht
+    index_classes = SEARCHED_APPLICANTS_INDEXES
+
+    def __init__(self, db_path: PathLike = "data/db/applicants.json"):
+        super().__init__(db_path)
 
 
 def default_json_dumps(obj: Any):
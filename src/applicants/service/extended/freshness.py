@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import time
+from typing import Iterable, List, Optional, Text
+
+from src.applicants.schemas.arbeitsagentur.schemas import GenericBewerber
+from src.configs import APPLICANT_DETAIL_MAX_AGE
+
+
+class DetailFreshnessPolicy:
+    """Decides whether a stored copy of an applicant's details can be served.
+
+    A copy is fresh while it is younger than `max_age` seconds and no search result
+    showed a later `aktualisierungsdatum` for the applicant than the copy has. The
+    update dates of the latest `max_updates` applicants seen in search results are
+    kept in memory, next to the ones of the stored search results.
+    """
+
+    max_updates: int = 100000
+
+    def __init__(self, max_age: float = APPLICANT_DETAIL_MAX_AGE):
+        self.max_age: float = max_age
+        self.updates: OrderedDict[Text, datetime] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def see(self, applicants: Iterable[GenericBewerber]) -> None:
+        """Records the update dates of applicants found in a search result."""
+        with self.lock:
+            for applicant in applicants:
+                self.updates[applicant.refnr] = applicant.aktualisierungsdatum
+                self.updates.move_to_end(applicant.refnr)
+            while len(self.updates) > self.max_updates:
+                self.updates.popitem(last=False)
+
+    def latest_update(
+        self, refnr: Text, searched_applicant: Optional[GenericBewerber] = None
+    ) -> Optional[datetime]:
+        """Latest update date seen in search results, None if there is none."""
+        with self.lock:
+            updates: List[Optional[datetime]] = [self.updates.get(refnr)]
+        if searched_applicant is not None:
+            updates.append(searched_applicant.aktualisierungsdatum)
+        return max((update for update in updates if update is not None), default=None)
+
+    def is_fresh(
+        self,
+        applicant: Optional[GenericBewerber],
+        stored_at: Optional[float],
+        latest_update: Optional[datetime] = None,
+    ) -> bool:
+        return (
+            applicant is not None
+            and stored_at is not None
+            and time.time() - stored_at < self.max_age
+            and (latest_update is None or latest_update <= applicant.aktualisierungsdatum)
+        )
+
+
+# Shared by the endpoints of the process
+detail_freshness_policy = DetailFreshnessPolicy()
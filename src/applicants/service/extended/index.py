@@ -0,0 +1,278 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from operator import itemgetter
+import re
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Text, Tuple, Type
+
+from pydantic import BaseModel
+
+from src.applicants.schemas.extended.request import ExtendedSearchParameters
+from src.applicants.service.extended.compiler import (
+    DerivedFields,
+    search_keyword_values,
+)
+
+
+TOKEN_PATTERN: re.Pattern = re.compile(r"\w+")
+
+REGEX_SPECIAL_CHARACTERS: FrozenSet[Text] = frozenset(".^$*+?{}[]\\|()")
+
+
+def tokenize(value: Text) -> List[Text]:
+    return TOKEN_PATTERN.findall(value.lower())
+
+
+class ApplicantIndex(ABC):
+    """Base class for the in-memory secondary indexes of an applicant store.
+
+    The store calls `add` for every document it writes, `remove` for every document
+    it deletes and asks all its indexes for `candidates` before a search. When the
+    store is opened, the index is filled with `bulk_add` for every stored document
+    followed by `end_bulk_add`.
+    """
+
+    @abstractmethod
+    def add(self, refnr: Text, doc: Dict, derived_fields: DerivedFields) -> None:
+        ...
+
+    def bulk_add(self, refnr: Text, doc: Dict, derived_fields: DerivedFields) -> None:
+        """Adds a document of a new store, whose refnrs are all distinct."""
+        self.add(refnr, doc, derived_fields)
+
+    def end_bulk_add(self) -> None:
+        pass
+
+    @abstractmethod
+    def remove(self, refnr: Text) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def candidates(self, search_parameters: BaseModel) -> Optional[Set[Text]]:
+        """Returns a superset of the refnrs matching the search parameters.
+
+        None means that the index cannot narrow down this search.
+        """
+        return None
+
+
+class KeywordIndex(ApplicantIndex):
+    """Inverted index from lowercase word tokens to the refnrs containing them.
+
+    Covers the fields searched by the `keywords` filter. A keyword is matched at the
+    start of a field, so all its tokens but the last one are whole tokens of the
+    field and the last one is a prefix of one. The candidates of a keyword are
+    therefore the intersection of the posting lists of its tokens, where the last
+    token takes the union over all tokens starting with it. Keywords using regular
+    expression syntax cannot be resolved this way and are left to the scan.
+    """
+
+    def __init__(self):
+        self.postings: Dict[Text, Set[Text]] = {}
+        self.doc_tokens: Dict[Text, FrozenSet[Text]] = {}
+        self.vocabulary: List[Text] = []
+        self.is_vocabulary_outdated: bool = False
+
+    def add(self, refnr: Text, doc: Dict, derived_fields: DerivedFields) -> None:
+        self.remove(refnr)
+        tokens: Set[Text] = set()
+        for value in search_keyword_values(doc):
+            if isinstance(value, str):
+                tokens.update(tokenize(value))
+        for token in tokens:
+            if token not in self.postings:
+                self.postings[token] = set()
+                self.is_vocabulary_outdated = True
+            self.postings[token].add(refnr)
+        self.doc_tokens[refnr] = frozenset(tokens)
+
+    def remove(self, refnr: Text) -> None:
+        for token in self.doc_tokens.pop(refnr, frozenset()):
+            refnrs: Set[Text] = self.postings[token]
+            refnrs.discard(refnr)
+            if len(refnrs) == 0:
+                del self.postings[token]
+                self.is_vocabulary_outdated = True
+
+    def clear(self) -> None:
+        self.postings = {}
+        self.doc_tokens = {}
+        self.vocabulary = []
+        self.is_vocabulary_outdated = False
+
+    def candidates(self, search_parameters: BaseModel) -> Optional[Set[Text]]:
+        if not isinstance(search_parameters, ExtendedSearchParameters):
+            return None
+        if not search_parameters.keywords:
+            return None
+
+        keyword_candidates: List[Set[Text]] = []
+        for keyword in search_parameters.keywords:
+            refnrs: Optional[Set[Text]] = self.keyword_candidates(keyword)
+            if refnrs is not None:
+                keyword_candidates.append(refnrs)
+        return intersect(keyword_candidates)
+
+    def keyword_candidates(self, keyword: Text) -> Optional[Set[Text]]:
+        if any(character in REGEX_SPECIAL_CHARACTERS for character in keyword):
+            return None
+        tokens: List[Text] = tokenize(keyword)
+        if len(tokens) == 0:
+            return None
+
+        token_candidates: List[Set[Text]] = [
+            self.postings.get(token, set()) for token in tokens[:-1]
+        ]
+        if TOKEN_PATTERN.fullmatch(keyword[-1]) is None:
+            # The keyword ends after its last token, so the token is complete
+            token_candidates.append(self.postings.get(tokens[-1], set()))
+        else:
+            token_candidates.append(self.prefix_candidates(tokens[-1]))
+        return intersect(token_candidates)
+
+    def prefix_candidates(self, prefix: Text) -> Set[Text]:
+        if self.is_vocabulary_outdated:
+            self.vocabulary = sorted(self.postings.keys())
+            self.is_vocabulary_outdated = False
+        refnrs: Set[Text] = set()
+        position: int = bisect_left(self.vocabulary, prefix)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(
+            prefix
+        ):
+            refnrs |= self.postings[self.vocabulary[position]]
+            position += 1
+        return refnrs
+
+
+class RangeIndex(ApplicantIndex):
+    """Sorted index over one of the derived fields, for range filters.
+
+    Keeps the (value, refnr) pairs of all documents with a value in a sorted list,
+    so that the refnrs in a range are found with two binary searches. The bounds
+    are read from the search parameters named by `lower_bound_parameter` and
+    `upper_bound_parameter`, both inclusive.
+    """
+
+    field: Text
+    lower_bound_parameter: Optional[Text] = None
+    upper_bound_parameter: Optional[Text] = None
+
+    def __init__(self):
+        self.entries: List[Tuple[Any, Text]] = []
+        self.values: Dict[Text, Any] = {}
+
+    def add(self, refnr: Text, doc: Dict, derived_fields: DerivedFields) -> None:
+        self.remove(refnr)
+        value: Any = getattr(derived_fields, self.field)
+        if value is None:
+            return
+        insort(self.entries, (value, refnr))
+        self.values[refnr] = value
+
+    def remove(self, refnr: Text) -> None:
+        if refnr not in self.values:
+            return
+        value: Any = self.values.pop(refnr)
+        del self.entries[bisect_left(self.entries, (value, refnr))]
+
+    def bulk_add(self, refnr: Text, doc: Dict, derived_fields: DerivedFields) -> None:
+        # Inserting every entry in order would be quadratic, they are sorted once
+        # at the end instead
+        value: Any = getattr(derived_fields, self.field)
+        if value is None:
+            return
+        self.entries.append((value, refnr))
+        self.values[refnr] = value
+
+    def end_bulk_add(self) -> None:
+        self.entries.sort()
+
+    def clear(self) -> None:
+        self.entries = []
+        self.values = {}
+
+    def candidates(self, search_parameters: BaseModel) -> Optional[Set[Text]]:
+        lower: Any = self.bound(search_parameters, self.lower_bound_parameter)
+        upper: Any = self.bound(search_parameters, self.upper_bound_parameter)
+        if lower is None and upper is None:
+            return None
+        start: int = (
+            0
+            if lower is None
+            else bisect_left(self.entries, lower, key=itemgetter(0))
+        )
+        end: int = (
+            len(self.entries)
+            if upper is None
+            else bisect_right(self.entries, upper, key=itemgetter(0))
+        )
+        return {refnr for _, refnr in self.entries[start:end]}
+
+    def bound(self, search_parameters: BaseModel, parameter: Optional[Text]) -> Any:
+        if parameter is None:
+            return None
+        return getattr(search_parameters, parameter, None)
+
+
+class GraduationYearIndex(RangeIndex):
+    # Some graduation is before the maximal year iff the earliest one is
+    field = "earliest_graduation_year"
+    upper_bound_parameter = "max_graduation_year"
+
+
+class ExperienceIndex(RangeIndex):
+    field = "experience_years"
+    lower_bound_parameter = "min_work_experience_years"
+
+
+class AveragePositionIndex(RangeIndex):
+    field = "average_position_years"
+    lower_bound_parameter = "min_avg_job_position_years"
+
+
+class AvailabilityIndex(RangeIndex):
+    field = "available_from"
+    upper_bound_parameter = "available_from"
+
+
+class PublicationDateIndex(RangeIndex):
+    field = "published_on"
+    lower_bound_parameter = "published_since"
+
+
+class UpdateDateIndex(RangeIndex):
+    field = "updated_on"
+    lower_bound_parameter = "updated_since"
+
+
+SEARCHED_APPLICANTS_INDEXES: List[Type[ApplicantIndex]] = [
+    KeywordIndex,
+    GraduationYearIndex,
+    ExperienceIndex,
+    AvailabilityIndex,
+    PublicationDateIndex,
+    UpdateDateIndex,
+]
+
+DETAILED_APPLICANTS_INDEXES: List[Type[ApplicantIndex]] = [
+    ExperienceIndex,
+    AveragePositionIndex,
+    AvailabilityIndex,
+    PublicationDateIndex,
+    UpdateDateIndex,
+]
+
+
+def intersect(refnr_sets: List[Set[Text]]) -> Optional[Set[Text]]:
+    """Intersects the sets starting with the smallest one, None if there is none."""
+    if len(refnr_sets) == 0:
+        return None
+    refnr_sets = sorted(refnr_sets, key=len)
+    result: Set[Text] = set(refnr_sets[0])
+    for refnrs in refnr_sets[1:]:
+        if len(result) == 0:
+            break
+        result &= refnrs
+    return result
@@ -0,0 +1,143 @@
+from contextlib import contextmanager
+import json
+from pathlib import Path
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Text
+
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberUebersicht,
+    BewerberDetail,
+)
+from src.applicants.service.extended.db import ApplicantsDb, ApplicantType, PathLike
+from src.applicants.service.extended.index import (
+    DETAILED_APPLICANTS_INDEXES,
+    SEARCHED_APPLICANTS_INDEXES,
+)
+
+
+class SqliteApplicantsDb(ApplicantsDb[ApplicantType]):
+    """Applicant store backed by a SQLite file.
+
+    The refnr is the primary key and the applicant is kept as a JSON document in a
+    second column. The database runs in WAL mode, so writes only touch the changed
+    rows and readers in other processes are not blocked while the crawler writes.
+    """
+
+    def __init__(self, db_path: PathLike):
+        super().__init__()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS applicants ("
+            "refnr TEXT PRIMARY KEY, "
+            "document TEXT NOT NULL)"
+        )
+        self.data_version: int = self._data_version_()
+        self._build_indexes_()
+
+    def contains(self, refnr: Text) -> bool:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT 1 FROM applicants WHERE refnr = ?", (refnr,)
+            ).fetchone()
+        return row is not None
+
+    def _delete_all_docs_(self) -> None:
+        with self._transaction_():
+            self.connection.execute("DELETE FROM applicants")
+
+    def is_stale(self) -> bool:
+        return self._data_version_() != self.data_version
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    def __del__(self) -> None:
+        if hasattr(self, "connection"):
+            self.connection.close()
+
+    def _data_version_(self) -> int:
+        # Only changes when another connection commits to the database
+        with self.lock:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+
+    @contextmanager
+    def _transaction_(self) -> Iterator[None]:
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def _iter_docs_(self) -> Iterator[Dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT document FROM applicants ORDER BY rowid"
+            ).fetchall()
+        for (document,) in rows:
+            yield json.loads(document)
+
+    def _read_docs_(self, refnrs: Iterable[Text]) -> List[Dict]:
+        docs: List[Dict] = []
+        with self.lock:
+            for refnr in refnrs:
+                row = self.connection.execute(
+                    "SELECT document FROM applicants WHERE refnr = ?", (refnr,)
+                ).fetchone()
+                if row is not None:
+                    docs.append(json.loads(row[0]))
+        return docs
+
+    def _write_docs_(self, docs: Dict[Text, Dict]) -> List[Dict]:
+        stored_docs: List[Dict] = []
+        with self._transaction_():
+            for refnr, doc in docs.items():
+                row = self.connection.execute(
+                    "SELECT document FROM applicants WHERE refnr = ?", (refnr,)
+                ).fetchone()
+                if row is None:
+                    self.connection.execute(
+                        "INSERT INTO applicants (refnr, document) VALUES (?, ?)",
+                        (refnr, json.dumps(doc)),
+                    )
+                    stored_docs.append(doc)
+                else:
+                    stored_doc: Dict = json.loads(row[0])
+                    stored_doc.update(doc)
+                    self.connection.execute(
+                        "UPDATE applicants SET document = ? WHERE refnr = ?",
+                        (json.dumps(stored_doc), refnr),
+                    )
+                    stored_docs.append(stored_doc)
+        return stored_docs
+
+    def _delete_docs_(self, refnrs: List[Text]) -> None:
+        with self._transaction_():
+            self.connection.executemany(
+                "DELETE FROM applicants WHERE refnr = ?",
+                [(refnr,) for refnr in refnrs],
+            )
+
+
+class SqliteDetailedApplicantsDb(SqliteApplicantsDb[BewerberDetail]):
+    model = BewerberDetail
+    index_classes = DETAILED_APPLICANTS_INDEXES
+
+    def __init__(self, db_path: PathLike = "data/db/applicants_detail.sqlite"):
+        super().__init__(db_path)
+
+
+class SqliteSearchedApplicantsDb(SqliteApplicantsDb[BewerberUebersicht]):
+    model = BewerberUebersicht
+    index_classes = SEARCHED_APPLICANTS_INDEXES
+
+    def __init__(self, db_path: PathLike = "data/db/applicants.sqlite"):
+        super().__init__(db_path)
@@ -0,0 +1,30 @@
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberUebersicht,
+    BewerberDetail,
+)
+from src.applicants.service.extended.db import (
+    ApplicantsDb,
+    DetailedApplicantsDb,
+    SearchedApplicantsDb,
+)
+from src.applicants.service.extended.sqlite_db import (
+    SqliteDetailedApplicantsDb,
+    SqliteSearchedApplicantsDb,
+)
+from src.configs import APPLICANTS_DB_BACKEND, DbBackend
+
+
+def create_searched_applicants_db(
+    backend: DbBackend = APPLICANTS_DB_BACKEND,
+) -> ApplicantsDb[BewerberUebersicht]:
+    if backend == DbBackend.SQLITE:
+        return SqliteSearchedApplicantsDb()
+    return SearchedApplicantsDb()
+
+
+def create_detailed_applicants_db(
+    backend: DbBackend = APPLICANTS_DB_BACKEND,
+) -> ApplicantsDb[BewerberDetail]:
+    if backend == DbBackend.SQLITE:
+        return SqliteDetailedApplicantsDb()
+    return DetailedApplicantsDb()
@@ -0,0 +1,122 @@
+from datetime import datetime
+from enum import Enum
+import json
+from pathlib import Path
+import threading
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Text, Union
+
+from pydantic import BaseModel
+from tinydb import Query, TinyDB
+
+from src.applicants.schemas.arbeitsagentur.schemas import BewerberUebersicht
+from src.applicants.service.extended.db import ApplicantsDb
+
+
+PathLike = Union[Path, Text]
+
+# Parameters of a fetch which only select the pages, not the applicants
+PAGING_PARAMETERS: List[Text] = ["pages_count", "pages_start", "size"]
+
+
+def saved_search_key(fetch_parameters: BaseModel) -> Text:
+    """Canonical form of the search parameters of a fetch, without the paging."""
+    return json.dumps(
+        fetch_parameters.model_dump(mode="json", exclude=set(PAGING_PARAMETERS)),
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+
+
+class SyncStatus(str, Enum):
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+
+
+def compare_with_stored(
+    db: ApplicantsDb[BewerberUebersicht], applicants: List[BewerberUebersicht]
+) -> List[SyncStatus]:
+    """Whether each applicant of a search result is new, changed or unchanged.
+
+    An applicant changed if its `aktualisierungsdatum` differs from the one of the
+    stored copy. The stored copies are read in a single batch.
+    """
+    stored_updates: Dict[Text, datetime] = {
+        applicant.refnr: applicant.aktualisierungsdatum
+        for applicant in db.get_by_refnrs([applicant.refnr for applicant in applicants])
+    }
+    statuses: List[SyncStatus] = []
+    for applicant in applicants:
+        stored_update: Optional[datetime] = stored_updates.get(applicant.refnr)
+        if stored_update is None:
+            statuses.append(SyncStatus.NEW)
+        elif stored_update != applicant.aktualisierungsdatum:
+            statuses.append(SyncStatus.CHANGED)
+        else:
+            statuses.append(SyncStatus.UNCHANGED)
+    return statuses
+
+
+class SyncState(NamedTuple):
+    # Latest aktualisierungsdatum seen by the syncs of the saved search
+    watermark: Optional[datetime]
+    synced_at: datetime
+
+
+class SyncStateDb:
+    """Sync state of every saved search, in a TinyDB JSON file.
+
+    The file is read on every access, so the states written by other processes,
+    e.g. the crawler script, are always seen.
+    """
+
+    def __init__(self, db_path: PathLike = "data/db/sync_state.json"):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = TinyDB(db_path)
+        self.lock = threading.Lock()
+
+    def get(self, search_key: Text) -> Optional[SyncState]:
+        with self.lock:
+            doc: Optional[Dict[Text, Any]] = self.db.get(
+                Query().searchKey == search_key
+            )
+        if doc is None:
+            return None
+        return SyncState(
+            watermark=(
+                datetime.fromisoformat(doc["watermark"])
+                if doc["watermark"] is not None
+                else None
+            ),
+            synced_at=datetime.fromisoformat(doc["syncedAt"]),
+        )
+
+    def put(self, search_key: Text, state: SyncState) -> None:
+        with self.lock:
+            self.db.upsert(
+                {
+                    "searchKey": search_key,
+                    "watermark": (
+                        state.watermark.isoformat()
+                        if state.watermark is not None
+                        else None
+                    ),
+                    "syncedAt": state.synced_at.isoformat(),
+                },
+                Query().searchKey == search_key,
+            )
+
+    def is_stale(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def latest_update(
+    watermark: Optional[datetime], applicants: Iterable[BewerberUebersicht]
+) -> Optional[datetime]:
+    updates: List[datetime] = [applicant.aktualisierungsdatum for applicant in applicants]
+    if watermark is not None:
+        updates.append(watermark)
+    return max(updates, default=None)
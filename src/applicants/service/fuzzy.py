@@ -0,0 +1,157 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Text, Tuple
+
+
+WORD_PATTERN: re.Pattern = re.compile(r"\w+")
+
+# Spellings of the German umlauts without them, e.g. "Muenchen" for "München"
+UMLAUT_TRANSLITERATIONS: List[Tuple[Text, Text]] = [
+    ("ae", "ä"),
+    ("oe", "ö"),
+    ("ue", "ü"),
+]
+
+
+def levenshtein(first: Text, second: Text, max_distance: int) -> int:
+    """Edit distance of two strings, or max_distance + 1 if it is larger."""
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    previous_row: List[int] = list(range(len(second) + 1))
+    for i, first_character in enumerate(first, start=1):
+        current_row: List[int] = [i]
+        for j, second_character in enumerate(second, start=1):
+            current_row.append(
+                min(
+                    previous_row[j] + 1,
+                    current_row[j - 1] + 1,
+                    previous_row[j - 1] + (first_character != second_character),
+                )
+            )
+        if min(current_row) > max_distance:
+            return max_distance + 1
+        previous_row = current_row
+    return min(previous_row[-1], max_distance + 1)
+
+
+def allowed_distance(word: Text) -> int:
+    """Number of typos tolerated in a word, none in short words."""
+    if len(word) < 6:
+        return 0
+    if len(word) < 10:
+        return 1
+    return 2
+
+
+class SymmetricDeleteIndex:
+    """Spelling correction index over a vocabulary, using symmetric deletes.
+
+    Like SymSpell, every vocabulary word is stored under all the strings obtained by
+    deleting up to `max_distance` characters from its first `prefix_length`
+    characters. Words within the edit distance of a misspelled word are then found
+    among the words stored under the deletes of the misspelled word, with a few
+    dictionary lookups instead of comparing it to the whole vocabulary. As typos
+    shift the characters, the deletes of the misspelled prefixes up to
+    `max_distance` characters shorter or longer are looked up too.
+    """
+
+    max_corrections: int = 65536
+
+    def __init__(
+        self, words: Iterable[Text], max_distance: int = 2, prefix_length: int = 7
+    ):
+        self.max_distance: int = max_distance
+        self.prefix_length: int = prefix_length
+        self.word_counts: Dict[Text, int] = {}
+        self.deletes: Dict[Text, List[Text]] = {}
+        self.corrections: Dict[Text, Text] = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word: Text) -> None:
+        if word in self.word_counts:
+            self.word_counts[word] += 1
+            return
+        self.word_counts[word] = 1
+        self.corrections = {}
+        for delete in self._deletes_(word[: self.prefix_length], self.max_distance):
+            self.deletes.setdefault(delete, []).append(word)
+
+    def lookup(self, word: Text, max_distance: int) -> List[Tuple[Text, int]]:
+        """Vocabulary words within the edit distance, closest and most frequent first."""
+        max_distance = min(max_distance, self.max_distance)
+        prefixes: Set[Text] = {
+            word[:length]
+            for length in range(
+                self.prefix_length - max_distance,
+                self.prefix_length + max_distance + 1,
+            )
+        }
+        deletes: Set[Text] = set()
+        for prefix in prefixes:
+            deletes.update(self._deletes_(prefix, max_distance))
+        candidates: Set[Text] = set()
+        for delete in deletes:
+            candidates.update(self.deletes.get(delete, []))
+
+        suggestions: List[Tuple[Text, int]] = []
+        for candidate in candidates:
+            distance: int = levenshtein(word, candidate, max_distance)
+            if distance <= max_distance:
+                suggestions.append((candidate, distance))
+        suggestions.sort(
+            key=lambda suggestion: (
+                suggestion[1],
+                -self.word_counts[suggestion[0]],
+                suggestion[0],
+            )
+        )
+        return suggestions
+
+    def correct_word(self, word: Text) -> Text:
+        """Closest vocabulary word, or the word itself if it is known or has none."""
+        if word in self.word_counts:
+            return word
+        correction: Optional[Text] = self.corrections.get(word)
+        if correction is None:
+            correction = self._find_correction_(word)
+            if len(self.corrections) >= self.max_corrections:
+                self.corrections = {}
+            self.corrections[word] = correction
+        return correction
+
+    def correct_text(self, text: Text) -> Text:
+        """Lowercases the text and corrects all its words."""
+        return WORD_PATTERN.sub(
+            lambda match: self.correct_word(match.group(0)), text.lower()
+        )
+
+    def _find_correction_(self, word: Text) -> Text:
+        transliterated: Text = word
+        for transliteration, umlaut in UMLAUT_TRANSLITERATIONS:
+            transliterated = transliterated.replace(transliteration, umlaut)
+        if transliterated in self.word_counts:
+            return transliterated
+        # Looking for a single typo first is much cheaper than for two
+        for max_distance in range(1, allowed_distance(word) + 1):
+            suggestions: List[Tuple[Text, int]] = self.lookup(word, max_distance)
+            if len(suggestions) > 0:
+                return suggestions[0][0]
+        return word
+
+    def _deletes_(self, word: Text, max_distance: int) -> Set[Text]:
+        deletes: Set[Text] = {word}
+        current: Set[Text] = {word}
+        for _ in range(max_distance):
+            current = {
+                candidate[:position] + candidate[position + 1 :]
+                for candidate in current
+                for position in range(len(candidate))
+            }
+            deletes.update(current)
+        return deletes
+
+
+def vocabulary(items: Iterable[Text]) -> Iterable[Text]:
+    """The lowercase words of the given knowledge base items."""
+    for item in items:
+        yield from WORD_PATTERN.findall(str(item).lower())
@@ -0,0 +1,178 @@
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, NamedTuple, Optional, Text, Union
+from urllib.parse import urlencode
+
+from src.configs import API_CACHE_MAX_ENTRIES, API_CACHE_PATH
+
+
+PathLike = Union[Path, Text]
+
+
+def response_cache_key(url: Text, params: Optional[Dict[Text, Any]] = None) -> Text:
+    """URL plus its query parameters sorted by name, without the empty ones."""
+    if not params:
+        return url
+    query: Text = urlencode(
+        sorted((name, str(value)) for name, value in params.items() if value is not None)
+    )
+    return f"{url}?{query}" if query else url
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: Optional[Text]
+    last_modified: Optional[Text]
+    expires_at: float
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def validators(self) -> Dict[Text, Text]:
+        """Headers of a conditional request for this response."""
+        headers: Dict[Text, Text] = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpResponseCache:
+    """Cache of API response bodies in a SQLite file, shared between processes.
+
+    Every entry is fresh for the time to live it was stored with. Expired entries
+    are kept, so that they can be revalidated with their ETag or Last-Modified
+    validators instead of downloaded again, until they are evicted: the cache holds
+    at most `max_entries` entries and evicts the least recently used ones. Eviction
+    runs every `eviction_interval` writes, so the bound may be exceeded in between.
+    """
+
+    eviction_interval: int = 100
+
+    def __init__(self, path: PathLike = API_CACHE_PATH, max_entries: int = API_CACHE_MAX_ENTRIES):
+        self.max_entries: int = max_entries
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "body BLOB NOT NULL, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self.writes: int = 0
+        self.hits: int = 0
+        self.revalidations: int = 0
+        self.misses: int = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Text) -> Optional[CachedResponse]:
+        """Returns the entry even if it expired, it is up to the caller to check it."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        cached_response = CachedResponse(*row)
+        if cached_response.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cached_response
+
+    def put(
+        self,
+        key: Text,
+        body: bytes,
+        ttl: float,
+        etag: Optional[Text] = None,
+        last_modified: Optional[Text] = None,
+    ) -> None:
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        now: float = time.time()
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, body, etag, last_modified, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, body, etag, last_modified, now + ttl, now),
+            )
+            self.writes += 1
+            if self.writes % self.eviction_interval == 0:
+                self._evict_()
+
+    def refresh(self, key: Text, ttl: float) -> None:
+        """Extends an entry that the API confirmed to be unchanged."""
+        with self.lock:
+            self.revalidations += 1
+            self.connection.execute(
+                "UPDATE responses SET expires_at = ? WHERE key = ?",
+                (time.time() + ttl, key),
+            )
+
+    def clear(self) -> None:
+        with self.lock:
+            self.connection.execute("DELETE FROM responses")
+
+    def statistics(self) -> Dict[Text, int]:
+        with self.lock:
+            size: int = self.connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()[0]
+            return {
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "size": size,
+                "maxSize": self.max_entries,
+            }
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    def _evict_(self) -> None:
+        self.connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+
+_api_response_cache: Optional[HttpResponseCache] = None
+_api_response_cache_lock = threading.Lock()
+
+
+def get_api_response_cache() -> Optional[HttpResponseCache]:
+    """The response cache shared by the API clients of the process, None if disabled."""
+    global _api_response_cache
+    if API_CACHE_MAX_ENTRIES <= 0:
+        return None
+    with _api_response_cache_lock:
+        if _api_response_cache is None:
+            _api_response_cache = HttpResponseCache()
+        return _api_response_cache
@@ -1,25 +1,59 @@
+from bisect import bisect_left
 import json
 from re import RegexFlag
 import re
-from typing import Any, Callable, List, Dict, Optional, Union, Text
+import threading
+from typing import Any, Callable, List, Dict, Optional, Sequence, Type, Union, Text
 from pathlib import Path
 from tinydb import Query, TinyDB
 from tinydb.queries import QueryLike
 from tinydb.table import Document
 
+from src.applicants.service.fuzzy import SymmetricDeleteIndex, vocabulary
+from src.applicants.service.knowledge_snapshot import (
+    KnowledgeSnapshot,
+    KnowledgeSnapshotWriter,
+)
+
 
 PathLike = Union[Path, Text]
 
 
 class KnowledgeBaseDb:
 
-    def __init__(self, db_basepath: PathLike, root_element: Text):
+    def __init__(
+        self,
+        db_basepath: PathLike,
+        root_element: Text,
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
         """
         Initialize the "database".
         Args: path (PathLike): The path to the json file.
+              snapshot (KnowledgeSnapshot): A snapshot to load the records and their
+              indexes from instead of the json file.
         """
-        data: Dict[Text, Any] = json.loads(open(db_basepath).read())
+        self.path: Path = Path(db_basepath)
+        self.root_element: Text = root_element
+        self.mtime: int = self.path.stat().st_mtime_ns
+        self.fuzzy_index: Optional[SymmetricDeleteIndex] = None
+        self.fuzzy_lock = threading.Lock()
+        if snapshot is not None and snapshot.has_section(f"{root_element}/items"):
+            self.db: List[Text] = snapshot.strings(f"{root_element}/items")
+            self._build_autocomplete_index_(
+                snapshot.integers(f"{root_element}/autocomplete_order")
+            )
+            return
+        with open(self.path) as db_file:
+            data: Dict[Text, Any] = json.load(db_file)
         self.db: List[Text] = data[root_element]
+        self._build_autocomplete_index_()
+
+    def is_stale(self) -> bool:
+        """
+        Checks whether the json file has been modified since it was loaded.
+        """
+        return self.path.stat().st_mtime_ns != self.mtime
 
     def get_all(self) -> List[Text]:
         """
@@ -46,42 +80,155 @@ class KnowledgeBaseDb:
         """
         return self.get(lambda item: re.search(pattern, item, flags) is not None)
 
+    def autocomplete(self, prefix: Text, limit: int = 10) -> List[Text]:
+        """
+        Retrieves the records starting with the prefix, ignoring case, in
+        alphabetical order. Uses binary search over the sorted case-folded records.
+        """
+        key: Text = prefix.casefold()
+        completions: List[Text] = []
+        position: int = bisect_left(self.autocomplete_keys, key)
+        while (
+            len(completions) < limit
+            and position < len(self.autocomplete_keys)
+            and self.autocomplete_keys[position].startswith(key)
+        ):
+            item: Text = self.autocomplete_items[position]
+            if len(completions) == 0 or completions[-1] != item:
+                completions.append(item)
+            position += 1
+        return completions
+
+    def add_to_snapshot(self, writer: KnowledgeSnapshotWriter) -> None:
+        """
+        Adds the records and their autocomplete index to a snapshot.
+        """
+        writer.add_strings(f"{self.root_element}/items", [str(item) for item in self.db])
+        writer.add_integers(
+            f"{self.root_element}/autocomplete_order", self.autocomplete_order
+        )
+
+    def _build_autocomplete_index_(
+        self, autocomplete_order: Optional[Sequence[int]] = None
+    ) -> None:
+        if autocomplete_order is None:
+            autocomplete_order = sorted(
+                range(len(self.db)),
+                key=lambda position: (str(self.db[position]).casefold(), str(self.db[position])),
+            )
+        self.autocomplete_order: Sequence[int] = autocomplete_order
+        self.autocomplete_items: List[Text] = [
+            str(self.db[position]) for position in autocomplete_order
+        ]
+        self.autocomplete_keys: List[Text] = [
+            item.casefold() for item in self.autocomplete_items
+        ]
+
+    def get_fuzzy(self, text: Text) -> List[Text]:
+        """
+        Retrieves the records contained in the text, ignoring case and small typos.
+        The words of the text are corrected to the closest words of the records with
+        a spelling index, which is built on the first fuzzy lookup.
+        """
+        if self.fuzzy_index is None:
+            with self.fuzzy_lock:
+                # Concurrent lookups wait for the index built by the first one
+                if self.fuzzy_index is None:
+                    self.fuzzy_index = SymmetricDeleteIndex(vocabulary(self.db))
+        lowercase_text: Text = text.lower()
+        corrected_text: Text = self.fuzzy_index.correct_text(text)
+        return self.get(
+            lambda item: str(item).lower() in lowercase_text
+            or str(item).lower() in corrected_text
+        )
+
 
 class CertificatesDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/certificates.json"):
-        super().__init__(db_basepath, "certificates")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/certificates.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "certificates", snapshot)
 
 
 class CompetencesDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/competences.json"):
-        super().__init__(db_basepath, "competences")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/competences.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "competences", snapshot)
 
 
 class JobsDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/jobs.json"):
-        super().__init__(db_basepath, "jobs")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/jobs.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "jobs", snapshot)
 
 
 class SkillsDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/skills.json"):
-        super().__init__(db_basepath, "skills")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/skills.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "skills", snapshot)
 
 
 class LanguagesDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/languages.json"):
-        super().__init__(db_basepath, "languages")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/languages.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "languages", snapshot)
 
 
 class LicensesDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/licenses.json"):
-        super().__init__(db_basepath, "licenses")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/licenses.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "licenses", snapshot)
 
 
 class LocationDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/location.json"):
-        super().__init__(db_basepath, "location")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/location.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "location", snapshot)
 
 
 class WorkfieldsDb(KnowledgeBaseDb):
-    def __init__(self, db_basepath: PathLike = "data/knowledge_base/workfields.json"):
-        super().__init__(db_basepath, "workfields")
+    def __init__(
+        self,
+        db_basepath: PathLike = "data/knowledge_base/workfields.json",
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        super().__init__(db_basepath, "workfields", snapshot)
+
+
+KNOWLEDGE_BASES: Dict[Text, Type[KnowledgeBaseDb]] = {
+    "certificates": CertificatesDb,
+    "competences": CompetencesDb,
+    "jobs": JobsDb,
+    "skills": SkillsDb,
+    "languages": LanguagesDb,
+    "licenses": LicensesDb,
+    "location": LocationDb,
+    "workfields": WorkfieldsDb,
+}
+
+
+def create_knowledge_base(
+    category: Text, snapshot: Optional[KnowledgeSnapshot] = None
+) -> KnowledgeBaseDb:
+    """Loads a knowledge base from the snapshot if there is one, else from json."""
+    return KNOWLEDGE_BASES[category](snapshot=snapshot)
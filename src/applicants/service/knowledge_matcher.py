@@ -0,0 +1,343 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import threading
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Text, Tuple
+
+from src.applicants.service.fuzzy import SymmetricDeleteIndex, vocabulary
+from src.applicants.service.knowledge_base import (
+    KNOWLEDGE_BASES,
+    KnowledgeBaseDb,
+    PathLike,
+    create_knowledge_base,
+)
+from src.applicants.service.knowledge_snapshot import (
+    KnowledgeSnapshot,
+    KnowledgeSnapshotHandle,
+    KnowledgeSnapshotWriter,
+    knowledge_base_sources,
+)
+from src.configs import (
+    KNOWLEDGE_BASE_DIRECTORY,
+    KNOWLEDGE_BASE_SNAPSHOT,
+    SUGGEST_CRITERIA_PROCESS_MIN_BATCH_SIZE,
+    SUGGEST_CRITERIA_PROCESSES,
+)
+
+
+class KnowledgeMatcher:
+    """Aho-Corasick automaton over the terms of all knowledge bases.
+
+    Finds the knowledge base terms contained in a text, ignoring case, in a single
+    pass over the text. A term matches like with `build_knowledge_search_query`,
+    i.e. if its lowercase form is a substring of the lowercase text, and the
+    matches of every knowledge base are returned in the order of the knowledge base.
+
+    In fuzzy mode, the words of the text are also corrected to the closest words of
+    the knowledge bases, and the terms contained in the corrected text match too.
+    The spelling index is built on the first fuzzy match.
+
+    The outputs of the states and the entries of the terms are kept in flat arrays,
+    so that the automaton can be stored in a knowledge base snapshot. A matcher
+    loaded from a snapshot only builds the transitions of a state when a text first
+    reaches it.
+    """
+
+    def __init__(
+        self,
+        knowledge_bases: Dict[Text, KnowledgeBaseDb],
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ):
+        self.knowledge_bases: Dict[Text, KnowledgeBaseDb] = knowledge_bases
+        self.categories: List[Text] = list(knowledge_bases.keys())
+        self.fuzzy_index: Optional[SymmetricDeleteIndex] = None
+        self.fuzzy_lock = threading.Lock()
+        if snapshot is not None and self._is_in_snapshot_(snapshot):
+            self._load_snapshot_(snapshot)
+            return
+
+        # The entries of every distinct lowercase term, as (category, position)
+        term_entries: List[List[Tuple[int, int]]] = []
+        self.transitions: List[Optional[Dict[Text, int]]] = [{}]
+        self.fail: Sequence[int] = [0]
+        outputs: List[List[int]] = [[]]
+        self._build_trie_(term_entries, outputs)
+        self._build_fail_links_(outputs)
+        self.output_starts, self.output_terms = flatten(outputs)
+        self.entry_starts, entries = flatten(term_entries)
+        self.entry_categories: Sequence[int] = [category for category, _ in entries]
+        self.entry_positions: Sequence[int] = [position for _, position in entries]
+
+    def is_stale(self) -> bool:
+        return any(
+            knowledge_base.is_stale() for knowledge_base in self.knowledge_bases.values()
+        )
+
+    def match(self, text: Text, fuzzy: bool = False) -> Dict[Text, List[Text]]:
+        """Returns the terms of every knowledge base which are contained in the text."""
+        matched_terms: Set[int] = self._match_terms_(text.lower())
+        if fuzzy:
+            if self.fuzzy_index is None:
+                with self.fuzzy_lock:
+                    if self.fuzzy_index is None:
+                        self.fuzzy_index = SymmetricDeleteIndex(
+                            vocabulary(
+                                item
+                                for knowledge_base in self.knowledge_bases.values()
+                                for item in knowledge_base.get_all()
+                            )
+                        )
+            matched_terms |= self._match_terms_(self.fuzzy_index.correct_text(text))
+
+        positions: List[List[int]] = [[] for _ in self.categories]
+        for term in matched_terms:
+            for entry in range(self.entry_starts[term], self.entry_starts[term + 1]):
+                positions[self.entry_categories[entry]].append(
+                    self.entry_positions[entry]
+                )
+
+        matches: Dict[Text, List[Text]] = {}
+        for category, category_positions in zip(self.categories, positions):
+            items: List[Text] = self.knowledge_bases[category].get_all()
+            matches[category] = [items[position] for position in sorted(category_positions)]
+        return matches
+
+    def add_to_snapshot(self, writer: KnowledgeSnapshotWriter) -> None:
+        edge_starts: List[int] = [0]
+        edge_characters: List[int] = []
+        edge_targets: List[int] = []
+        for state in range(len(self.transitions)):
+            for character, next_state in self._get_transitions_(state).items():
+                edge_characters.append(ord(character))
+                edge_targets.append(next_state)
+            edge_starts.append(len(edge_characters))
+
+        writer.add_strings("matcher/categories", self.categories)
+        writer.add_integers("matcher/edge_starts", edge_starts)
+        writer.add_integers("matcher/edge_characters", edge_characters)
+        writer.add_integers("matcher/edge_targets", edge_targets)
+        writer.add_integers("matcher/fail", self.fail)
+        writer.add_integers("matcher/output_starts", self.output_starts)
+        writer.add_integers("matcher/output_terms", self.output_terms)
+        writer.add_integers("matcher/entry_starts", self.entry_starts)
+        writer.add_integers("matcher/entry_categories", self.entry_categories)
+        writer.add_integers("matcher/entry_positions", self.entry_positions)
+
+    def _match_terms_(self, lowercase_text: Text) -> Set[int]:
+        transitions: List[Optional[Dict[Text, int]]] = self.transitions
+        fail: Sequence[int] = self.fail
+        output_starts: Sequence[int] = self.output_starts
+        output_terms: Sequence[int] = self.output_terms
+
+        matched_terms: Set[int] = set(output_terms[output_starts[0] : output_starts[1]])
+        state: int = 0
+        for character in lowercase_text:
+            while True:
+                state_transitions: Optional[Dict[Text, int]] = transitions[state]
+                if state_transitions is None:
+                    state_transitions = self._get_transitions_(state)
+                if state == 0 or character in state_transitions:
+                    break
+                state = fail[state]
+            state = state_transitions.get(character, 0)
+            start: int = output_starts[state]
+            end: int = output_starts[state + 1]
+            if start != end:
+                matched_terms.update(output_terms[start:end])
+        return matched_terms
+
+    def _get_transitions_(self, state: int) -> Dict[Text, int]:
+        state_transitions: Optional[Dict[Text, int]] = self.transitions[state]
+        if state_transitions is None:
+            start: int = self.edge_starts[state]
+            end: int = self.edge_starts[state + 1]
+            state_transitions = dict(
+                zip(
+                    map(chr, self.edge_characters[start:end]),
+                    self.edge_targets[start:end],
+                )
+            )
+            self.transitions[state] = state_transitions
+        return state_transitions
+
+    def _is_in_snapshot_(self, snapshot: KnowledgeSnapshot) -> bool:
+        return (
+            snapshot.has_section("matcher/categories")
+            and snapshot.strings("matcher/categories") == self.categories
+        )
+
+    def _load_snapshot_(self, snapshot: KnowledgeSnapshot) -> None:
+        self.edge_starts: Sequence[int] = snapshot.integers("matcher/edge_starts")
+        self.edge_characters: Sequence[int] = snapshot.integers("matcher/edge_characters")
+        self.edge_targets: Sequence[int] = snapshot.integers("matcher/edge_targets")
+        self.fail = snapshot.integers("matcher/fail")
+        # Read on every character, which is faster from a list than from the mapping
+        self.output_starts = snapshot.integers("matcher/output_starts").tolist()
+        self.output_terms = snapshot.integers("matcher/output_terms")
+        self.entry_starts = snapshot.integers("matcher/entry_starts")
+        self.entry_categories = snapshot.integers("matcher/entry_categories")
+        self.entry_positions = snapshot.integers("matcher/entry_positions")
+        self.transitions = [None] * len(self.fail)
+        self._get_transitions_(0)
+
+    def _build_trie_(
+        self, term_entries: List[List[Tuple[int, int]]], outputs: List[List[int]]
+    ) -> None:
+        term_ids: Dict[Text, int] = {}
+        for category_id, category in enumerate(self.categories):
+            for position, item in enumerate(self.knowledge_bases[category].get_all()):
+                term: Text = str(item).lower()
+                if term not in term_ids:
+                    term_ids[term] = len(term_entries)
+                    term_entries.append([])
+                    self._add_term_(term, term_ids[term], outputs)
+                term_entries[term_ids[term]].append((category_id, position))
+
+    def _add_term_(self, term: Text, term_id: int, outputs: List[List[int]]) -> None:
+        state: int = 0
+        for character in term:
+            next_state = self.transitions[state].get(character)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.fail.append(0)
+                outputs.append([])
+                self.transitions[state][character] = next_state
+            state = next_state
+        outputs[state].append(term_id)
+
+    def _build_fail_links_(self, outputs: List[List[int]]) -> None:
+        # Breadth first, so that the fail link of a state is set before its children
+        queue: Deque[int] = deque(self.transitions[0].values())
+        while len(queue) > 0:
+            state: int = queue.popleft()
+            for character, next_state in self.transitions[state].items():
+                fail_state: int = self.fail[state]
+                while fail_state != 0 and character not in self.transitions[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.transitions[fail_state].get(character, 0)
+                # A state also outputs all terms that are suffixes of its own prefix
+                if self.fail[next_state] != 0:
+                    outputs[next_state] = outputs[next_state] + outputs[self.fail[next_state]]
+                queue.append(next_state)
+
+
+def flatten(lists: List[List[Any]]) -> Tuple[List[int], List[Any]]:
+    """Concatenates the lists, the i-th list is values[starts[i] : starts[i + 1]]."""
+    starts: List[int] = [0]
+    values: List[Any] = []
+    for values_list in lists:
+        values.extend(values_list)
+        starts.append(len(values))
+    return starts, values
+
+
+def create_knowledge_matcher(
+    knowledge_bases: Optional[Dict[Text, KnowledgeBaseDb]] = None,
+    snapshot_handle: Optional[KnowledgeSnapshotHandle] = None,
+) -> KnowledgeMatcher:
+    """Builds the matcher over the knowledge bases, loaded from the same snapshot.
+
+    The snapshot and the knowledge bases are opened if they are not given.
+    """
+    if snapshot_handle is None:
+        snapshot_handle = KnowledgeSnapshotHandle()
+    if knowledge_bases is None:
+        knowledge_bases = {
+            category: create_knowledge_base(category, snapshot_handle.snapshot)
+            for category in KNOWLEDGE_BASES.keys()
+        }
+    return KnowledgeMatcher(knowledge_bases, snapshot_handle.snapshot)
+
+
+def build_knowledge_snapshot(
+    path: PathLike = KNOWLEDGE_BASE_SNAPSHOT,
+    directory: PathLike = KNOWLEDGE_BASE_DIRECTORY,
+) -> None:
+    """Compiles the knowledge base files and the matcher into a snapshot file."""
+    knowledge_bases: Dict[Text, KnowledgeBaseDb] = {
+        category: knowledge_base_class(Path(directory) / f"{category}.json")
+        for category, knowledge_base_class in KNOWLEDGE_BASES.items()
+    }
+    writer = KnowledgeSnapshotWriter(knowledge_base_sources(directory))
+    for knowledge_base in knowledge_bases.values():
+        knowledge_base.add_to_snapshot(writer)
+    KnowledgeMatcher(knowledge_bases).add_to_snapshot(writer)
+    writer.write(path)
+
+
+# Matcher of a worker process of KnowledgeMatcherPool, built by its initializer
+_worker_matcher: Optional[KnowledgeMatcher] = None
+
+
+def _init_worker_() -> None:
+    global _worker_matcher
+    _worker_matcher = create_knowledge_matcher()
+
+
+def _match_in_worker_(
+    texts: List[Text], fuzzy: bool = False
+) -> List[Dict[Text, List[Text]]]:
+    return [_worker_matcher.match(text, fuzzy) for text in texts]
+
+
+class KnowledgeMatcherPool:
+    """Spreads the matching of very large batches over a pool of worker processes.
+
+    Every worker builds its own matcher once, when it starts. Batches smaller than
+    `min_batch_size`, or all batches if `processes` is 0, are matched in the
+    calling process instead. The pool is restarted if the knowledge bases changed,
+    i.e. if it is called with another matcher than the one it was started for.
+    """
+
+    def __init__(self, processes: int, min_batch_size: int, chunk_size: int = 100):
+        self.processes: int = processes
+        self.min_batch_size: int = min_batch_size
+        self.chunk_size: int = chunk_size
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.matcher: Optional[KnowledgeMatcher] = None
+        self.lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return False
+
+    def match_many(
+        self, matcher: KnowledgeMatcher, texts: List[Text], fuzzy: bool = False
+    ) -> List[Dict[Text, List[Text]]]:
+        if self.processes <= 0 or len(texts) < self.min_batch_size:
+            return [matcher.match(text, fuzzy) for text in texts]
+
+        chunks: List[List[Text]] = [
+            texts[start : start + self.chunk_size]
+            for start in range(0, len(texts), self.chunk_size)
+        ]
+        matches: List[Dict[Text, List[Text]]] = []
+        for chunk_matches in self._get_executor_(matcher).map(
+            _match_in_worker_, chunks, [fuzzy] * len(chunks)
+        ):
+            matches.extend(chunk_matches)
+        return matches
+
+    def close(self) -> None:
+        with self.lock:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+
+    def _get_executor_(self, matcher: KnowledgeMatcher) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is not None and self.matcher is not matcher:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.processes, initializer=_init_worker_
+                )
+                self.matcher = matcher
+            return self.executor
+
+
+def create_knowledge_matcher_pool() -> KnowledgeMatcherPool:
+    return KnowledgeMatcherPool(
+        SUGGEST_CRITERIA_PROCESSES, SUGGEST_CRITERIA_PROCESS_MIN_BATCH_SIZE
+    )
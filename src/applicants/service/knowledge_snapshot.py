@@ -0,0 +1,192 @@
+from array import array
+import hashlib
+import json
+import logging
+import mmap
+from pathlib import Path
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Text, Tuple, Union
+
+from src.configs import KNOWLEDGE_BASE_DIRECTORY, KNOWLEDGE_BASE_SNAPSHOT
+
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[Path, Text]
+
+# Magic bytes, format version, header length and checksum of the sources
+PREAMBLE: struct.Struct = struct.Struct("<8sII32s")
+MAGIC: bytes = b"KBSNAP\x00\x01"
+FORMAT_VERSION: int = 1
+# Sections start at multiples of the alignment, so that they can be cast in place
+ALIGNMENT: int = 8
+
+
+def knowledge_base_sources(directory: PathLike = KNOWLEDGE_BASE_DIRECTORY) -> List[Path]:
+    return sorted(Path(directory).glob("*.json"))
+
+
+def sources_checksum(sources: Sequence[Path]) -> bytes:
+    """SHA-256 over the names and contents of the source files."""
+    digest = hashlib.sha256()
+    for source in sources:
+        digest.update(source.name.encode("utf-8") + b"\x00")
+        digest.update(source.read_bytes())
+        digest.update(b"\x00")
+    return digest.digest()
+
+
+class KnowledgeSnapshotWriter:
+    """Collects the sections of a knowledge base snapshot and writes them to a file.
+
+    A section is either an array of unsigned 32-bit integers or a list of strings,
+    stored as their UTF-8 encodings separated by null characters.
+    """
+
+    def __init__(self, sources: Sequence[Path]):
+        self.sources: List[Path] = list(sources)
+        self.sections: Dict[Text, Tuple[Text, bytes]] = {}
+
+    def add_integers(self, name: Text, values: Sequence[int]) -> None:
+        self.sections[name] = ("I", array("I", values).tobytes())
+
+    def add_strings(self, name: Text, values: Sequence[Text]) -> None:
+        if any("\x00" in value for value in values):
+            raise ValueError(f"Section {name} contains a null character")
+        self.sections[name] = ("s", "\x00".join(values).encode("utf-8"))
+
+    def write(self, path: PathLike) -> None:
+        layout: Dict[Text, List[Any]] = {}
+        offset: int = 0
+        for name, (kind, data) in self.sections.items():
+            layout[name] = [kind, offset, len(data)]
+            offset += len(data) + self._padding_(len(data))
+        header: bytes = json.dumps(
+            {"sources": [source.name for source in self.sources], "sections": layout},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        header += b" " * self._padding_(PREAMBLE.size + len(header))
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the snapshot and renamed, so that readers never see half
+        temporary_path: Path = path.with_name(path.name + ".tmp")
+        with open(temporary_path, "wb") as snapshot_file:
+            snapshot_file.write(
+                PREAMBLE.pack(
+                    MAGIC, FORMAT_VERSION, len(header), sources_checksum(self.sources)
+                )
+            )
+            snapshot_file.write(header)
+            for _, data in self.sections.values():
+                snapshot_file.write(data)
+                snapshot_file.write(b"\x00" * self._padding_(len(data)))
+        temporary_path.replace(path)
+
+    def _padding_(self, length: int) -> int:
+        return -length % ALIGNMENT
+
+
+class KnowledgeSnapshot:
+    """Read-only view of a knowledge base snapshot, memory-mapped from its file.
+
+    Integer sections are returned as memoryviews of the mapping, without copying,
+    string sections are decoded on access. The snapshot is stale if the sources
+    it was built from changed since, which is detected with their checksum.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path: Path = Path(path)
+        with open(self.path, "rb") as snapshot_file:
+            # The mapping stays valid after the file is closed
+            self.buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.format_version, header_length, self.checksum = (
+            PREAMBLE.unpack_from(self.buffer)
+        )
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a knowledge base snapshot")
+        header: Dict[Text, Any] = json.loads(
+            self.buffer[PREAMBLE.size : PREAMBLE.size + header_length]
+        )
+        self.sources: List[Text] = header["sources"]
+        self.sections: Dict[Text, List[Any]] = header["sections"]
+        self.data_offset: int = PREAMBLE.size + header_length
+
+    def is_current(self, sources: Sequence[Path]) -> bool:
+        return (
+            self.format_version == FORMAT_VERSION
+            and self.sources == [source.name for source in sources]
+            and self.checksum == sources_checksum(sources)
+        )
+
+    def has_section(self, name: Text) -> bool:
+        return name in self.sections
+
+    def integers(self, name: Text) -> memoryview:
+        kind, offset, length = self.sections[name]
+        if kind != "I":
+            raise ValueError(f"Section {name} does not contain integers")
+        start: int = self.data_offset + offset
+        return memoryview(self.buffer)[start : start + length].cast("I")
+
+    def strings(self, name: Text) -> List[Text]:
+        kind, offset, length = self.sections[name]
+        if kind != "s":
+            raise ValueError(f"Section {name} does not contain strings")
+        if length == 0:
+            return []
+        start: int = self.data_offset + offset
+        return self.buffer[start : start + length].decode("utf-8").split("\x00")
+
+
+def open_knowledge_snapshot(
+    path: PathLike = KNOWLEDGE_BASE_SNAPSHOT,
+    directory: PathLike = KNOWLEDGE_BASE_DIRECTORY,
+) -> Optional[KnowledgeSnapshot]:
+    """Opens the snapshot if it is up to date with the knowledge base files.
+
+    Returns None if there is no snapshot or if it is stale, in which case the
+    knowledge bases are loaded from their json files instead.
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        snapshot = KnowledgeSnapshot(path)
+    except (OSError, ValueError, struct.error) as error:
+        logger.warning(f"Ignoring unreadable knowledge base snapshot {path}: {error}")
+        return None
+    if not snapshot.is_current(knowledge_base_sources(directory)):
+        logger.warning(
+            f"Ignoring stale knowledge base snapshot {path}, rebuild it with "
+            "scripts/build_knowledge_snapshot.py"
+        )
+        return None
+    return snapshot
+
+
+class KnowledgeSnapshotHandle:
+    """The snapshot the knowledge bases and the matcher of a process are loaded from.
+
+    Opened once and shared by all of them, `snapshot` is None if there is no
+    current snapshot. The handle is stale once the snapshot file or one of the
+    knowledge base files is modified, so that it is opened and checked again.
+    """
+
+    def __init__(
+        self,
+        path: PathLike = KNOWLEDGE_BASE_SNAPSHOT,
+        directory: PathLike = KNOWLEDGE_BASE_DIRECTORY,
+    ):
+        self.paths: List[Path] = [Path(path)] + knowledge_base_sources(directory)
+        self.mtimes: List[Optional[int]] = self._mtimes_()
+        self.snapshot: Optional[KnowledgeSnapshot] = open_knowledge_snapshot(
+            path, directory
+        )
+
+    def is_stale(self) -> bool:
+        return self._mtimes_() != self.mtimes
+
+    def _mtimes_(self) -> List[Optional[int]]:
+        return [
+            path.stat().st_mtime_ns if path.exists() else None for path in self.paths
+        ]
@@ -0,0 +1,159 @@
+import asyncio
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple, Text, Union
+
+from src.configs import (
+    API_CONCURRENCY,
+    API_MAX_CONCURRENCY,
+    API_MAX_RATE,
+    API_MIN_RATE,
+    API_RATE,
+    API_RATE_BURST,
+)
+
+
+THROTTLE_STATUS_CODES: Tuple[int, ...] = (429, 503)
+
+# Interval in seconds to check again for a free slot when all slots are used
+SLOT_POLL_INTERVAL: float = 0.01
+
+
+class AdaptiveRateLimiter:
+    """Token bucket limiting the rate and the concurrency of the requests to an API.
+
+    Both limits adapt to the API with AIMD (additive increase, multiplicative
+    decrease): every successful request raises the concurrency by about one per
+    round of requests and the rate by about `rate_increase` requests per second
+    each second, while a throttled request (429 or 503) multiplies both by
+    `decrease_factor`. A throttled request only cuts the limits if it was sent
+    after the previous cut, so that a burst of throttled requests cuts them once.
+    A Retry-After delay pauses all requests until it has passed.
+
+    The limiter is thread safe and can be used both from threads, with `acquire`,
+    and from coroutines, with `acquire_async`. Every acquired slot must be given
+    back with `release`.
+    """
+
+    def __init__(
+        self,
+        rate: float = API_RATE,
+        burst: float = API_RATE_BURST,
+        min_rate: float = API_MIN_RATE,
+        max_rate: float = API_MAX_RATE,
+        concurrency: float = API_CONCURRENCY,
+        min_concurrency: float = 1,
+        max_concurrency: float = API_MAX_CONCURRENCY,
+        rate_increase: float = 1,
+        decrease_factor: float = 0.5,
+    ):
+        self.rate: float = rate
+        self.burst: float = max(burst, 1)
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.concurrency: float = concurrency
+        self.min_concurrency: float = max(min_concurrency, 1)
+        self.max_concurrency: float = max_concurrency
+        self.rate_increase: float = rate_increase
+        self.decrease_factor: float = decrease_factor
+
+        self.tokens: float = self.burst
+        self.refilled_at: float = time.monotonic()
+        self.paused_until: float = 0
+        self.decreased_at: float = 0
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.throttled: int = 0
+        self.retry_afters: int = 0
+        self.wait_seconds: float = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self) -> Tuple[Optional[float], float]:
+        """Takes a slot if one is free now.
+
+        Returns the time the slot was taken at, to be passed to `release`, or None
+        and the number of seconds to wait before trying again.
+        """
+        with self.lock:
+            now: float = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.refilled_at) * self.rate
+            )
+            self.refilled_at = now
+            if now < self.paused_until:
+                return None, self.paused_until - now
+            if self.in_flight >= math.floor(self.concurrency):
+                return None, SLOT_POLL_INTERVAL
+            if self.tokens < 1:
+                return None, (1 - self.tokens) / self.rate
+            self.tokens -= 1
+            self.in_flight += 1
+            self.requests += 1
+            return now, 0
+
+    def acquire(self) -> float:
+        while True:
+            acquired_at, wait = self.try_acquire()
+            if acquired_at is not None:
+                return acquired_at
+            self._add_wait_(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self) -> float:
+        while True:
+            acquired_at, wait = self.try_acquire()
+            if acquired_at is not None:
+                return acquired_at
+            self._add_wait_(wait)
+            await asyncio.sleep(wait)
+
+    def release(
+        self,
+        acquired_at: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Gives back a slot and adapts the limits to the response, if there is one."""
+        with self.lock:
+            self.in_flight -= 1
+            if status_code is None:
+                return
+            now: float = time.monotonic()
+            if status_code in THROTTLE_STATUS_CODES:
+                self.throttled += 1
+                if acquired_at >= self.decreased_at:
+                    self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+                    self.concurrency = max(
+                        self.min_concurrency, self.concurrency * self.decrease_factor
+                    )
+                    self.decreased_at = now
+                if retry_after is not None:
+                    self.retry_afters += 1
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                    self.tokens = 0
+            elif status_code < 400:
+                self.rate = min(self.max_rate, self.rate + self.rate_increase / self.rate)
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1 / self.concurrency
+                )
+
+    def statistics(self) -> Dict[Text, Union[int, float]]:
+        with self.lock:
+            return {
+                "rate": round(self.rate, 3),
+                "concurrency": math.floor(self.concurrency),
+                "inFlight": self.in_flight,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "retryAfters": self.retry_afters,
+                "waitSeconds": round(self.wait_seconds, 3),
+            }
+
+    def _add_wait_(self, wait: float) -> None:
+        with self.lock:
+            self.wait_seconds += wait
+
+
+# Shared by all clients of the Arbeitsagentur API in the process
+api_rate_limiter = AdaptiveRateLimiter()
@@ -0,0 +1,143 @@
+from functools import partial
+import logging
+import threading
+from typing import Any, Callable, Dict, Text
+
+from src.applicants.service.arbeitsagentur import create_applicant_api
+from src.applicants.service.extended.stores import (
+    create_detailed_applicants_db,
+    create_searched_applicants_db,
+)
+from src.applicants.service.extended.sync import SyncStateDb
+from src.applicants.service.knowledge_base import (
+    KNOWLEDGE_BASES,
+    KnowledgeBaseDb,
+    create_knowledge_base,
+)
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    create_knowledge_matcher,
+    create_knowledge_matcher_pool,
+)
+from src.applicants.service.knowledge_snapshot import KnowledgeSnapshotHandle
+
+
+logger = logging.getLogger(__name__)
+
+
+class StoreRegistry:
+    """Keeps a single instance of every store for the lifetime of the application.
+
+    Stores are created from their registered factory on first access (or eagerly
+    with `open_all`) and shared between requests afterwards. A store is only created
+    again if it reports that its backing file has been modified by someone else,
+    e.g. by the crawler script running in another process. Every store has its own
+    lock for that, so rebuilding one store does not block access to the others.
+    A factory may get other stores from the registry to share them, `open_all`
+    opens the stores in the order they were registered in.
+    """
+
+    def __init__(self):
+        self.factories: Dict[Text, Callable[[], Any]] = {}
+        self.stores: Dict[Text, Any] = {}
+        self.store_locks: Dict[Text, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: Text, factory: Callable[[], Any]) -> None:
+        with self.lock:
+            self.factories[name] = factory
+            self.stores.pop(name, None)
+            self.store_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: Text) -> Any:
+        with self.lock:
+            store = self.stores.get(name)
+            store_lock = self.store_locks[name]
+        if store is not None and not store.is_stale():
+            return store
+        with store_lock:
+            # Another thread may have created the store while waiting for the lock
+            with self.lock:
+                store = self.stores.get(name)
+                factory = self.factories[name]
+            if store is not None and not store.is_stale():
+                return store
+            if store is not None:
+                # The old instance is not closed here, as requests still running
+                # may use it. It is closed once it is garbage collected.
+                logger.info(f"Store {name} changed on disk, reloading it")
+            store = factory()
+            with self.lock:
+                if self.factories.get(name) is factory:
+                    self.stores[name] = store
+            return store
+
+    def open_all(self) -> None:
+        for name in list(self.factories.keys()):
+            self.get(name)
+
+    def close_all(self) -> None:
+        with self.lock:
+            for store in self.stores.values():
+                self._close_store_(store)
+            self.stores = {}
+
+    async def aclose_all(self) -> None:
+        """Like `close_all`, but also awaits the stores which close asynchronously."""
+        with self.lock:
+            stores = list(self.stores.values())
+            self.stores = {}
+        for store in stores:
+            if hasattr(store, "aclose"):
+                await store.aclose()
+            else:
+                self._close_store_(store)
+
+    def _close_store_(self, store: Any) -> None:
+        if hasattr(store, "close"):
+            store.close()
+
+
+SEARCHED_APPLICANTS_DB: Text = "applicants/searched"
+DETAILED_APPLICANTS_DB: Text = "applicants/detailed"
+SYNC_STATE_DB: Text = "applicants/sync_state"
+KNOWLEDGE_SNAPSHOT: Text = "knowledge_base/snapshot"
+KNOWLEDGE_MATCHER: Text = "knowledge_base/matcher"
+KNOWLEDGE_MATCHER_POOL: Text = "knowledge_base/matcher_pool"
+APPLICANT_API: Text = "arbeitsagentur/api"
+
+
+def knowledge_base_store_name(category: Text) -> Text:
+    return f"knowledge_base/{category}"
+
+
+def create_shared_knowledge_base(category: Text) -> KnowledgeBaseDb:
+    """Loads a knowledge base from the snapshot shared by the registry."""
+    snapshot_handle: KnowledgeSnapshotHandle = store_registry.get(KNOWLEDGE_SNAPSHOT)
+    return create_knowledge_base(category, snapshot_handle.snapshot)
+
+
+def create_shared_knowledge_matcher() -> KnowledgeMatcher:
+    """Builds the matcher over the knowledge bases held by the registry."""
+    return create_knowledge_matcher(
+        {
+            category: store_registry.get(knowledge_base_store_name(category))
+            for category in KNOWLEDGE_BASES.keys()
+        },
+        store_registry.get(KNOWLEDGE_SNAPSHOT),
+    )
+
+
+store_registry = StoreRegistry()
+store_registry.register(SEARCHED_APPLICANTS_DB, create_searched_applicants_db)
+store_registry.register(DETAILED_APPLICANTS_DB, create_detailed_applicants_db)
+store_registry.register(SYNC_STATE_DB, SyncStateDb)
+store_registry.register(KNOWLEDGE_SNAPSHOT, KnowledgeSnapshotHandle)
+for category in KNOWLEDGE_BASES.keys():
+    store_registry.register(
+        knowledge_base_store_name(category),
+        partial(create_shared_knowledge_base, category),
+    )
+store_registry.register(KNOWLEDGE_MATCHER, create_shared_knowledge_matcher)
+store_registry.register(KNOWLEDGE_MATCHER_POOL, create_knowledge_matcher_pool)
+store_registry.register(APPLICANT_API, create_applicant_api)
@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import Future
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Text
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single call.
+
+    The first caller of a key runs the call, the callers arriving while it runs wait
+    for it and get the same result, or the same exception. The result is shared
+    between them, so it must not be modified. Thread safe.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Text, Future] = {}
+        self.coalesced: int = 0
+        self.lock = threading.Lock()
+
+    def run(self, key: Text, call: Callable[[], Any]) -> Any:
+        with self.lock:
+            future: Optional[Future] = self.calls.get(key)
+            is_leader: bool = future is None
+            if is_leader:
+                future = Future()
+                self.calls[key] = future
+            else:
+                self.coalesced += 1
+        if not is_leader:
+            return future.result()
+
+        try:
+            future.set_result(call())
+        except BaseException as error:
+            future.set_exception(error)
+        finally:
+            with self.lock:
+                del self.calls[key]
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """Like SingleFlight, for coroutines.
+
+    The call runs in a task of its own, so that it goes on for the other callers
+    if the caller that started it is cancelled. Once all its callers are cancelled,
+    e.g. when the client of a request disconnects, the call is cancelled too. Calls
+    are only coalesced within the same event loop.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Text, asyncio.Task] = {}
+        self.waiters: Dict[asyncio.Task, int] = {}
+        self.coalesced: int = 0
+
+    async def run(self, key: Text, call: Callable[[], Awaitable[Any]]) -> Any:
+        task: Optional[asyncio.Task] = self.calls.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self._remove_(key, task))
+        self.waiters[task] = self.waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self.waiters[task] -= 1
+            if self.waiters[task] == 0:
+                del self.waiters[task]
+                if not task.done():
+                    # The last caller was cancelled, no one needs the result anymore
+                    self._remove_(key, task)
+                    task.cancel()
+
+    def _remove_(self, key: Text, task: asyncio.Task) -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if task.done() and not task.cancelled():
+            # Marks the exception as retrieved, even if all callers were cancelled
+            task.exception()
@@ -1,4 +1,6 @@
+from enum import Enum
 import logging
+import os
 from typing import Any, Dict, Text
 
 
@@ -11,3 +13,100 @@ DEFAULT_LOGGING_CONFIG: Dict[Text, Any] = {
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     "filename": "logs/api.log",
 }
+
+
+class DbBackend(Enum):
+    TINYDB = "tinydb"
+    SQLITE = "sqlite"
+
+
+# Storage used for the local applicant databases, selected with the environment
+# variable APPLICANTS_DB_BACKEND ("tinydb" or "sqlite")
+APPLICANTS_DB_BACKEND: DbBackend = DbBackend(
+    os.environ.get("APPLICANTS_DB_BACKEND", DbBackend.TINYDB.value)
+)
+
+# Number of searches per applicant store whose results are kept in memory, set
+# with the environment variable SEARCH_CACHE_SIZE (0 disables the cache)
+SEARCH_CACHE_SIZE: int = int(os.environ.get("SEARCH_CACHE_SIZE", 256))
+
+# Directory of the knowledge base json files, and the binary snapshot compiled from
+# them by scripts/build_knowledge_snapshot.py, set with KNOWLEDGE_BASE_SNAPSHOT
+KNOWLEDGE_BASE_DIRECTORY: Text = "data/knowledge_base"
+KNOWLEDGE_BASE_SNAPSHOT: Text = os.environ.get(
+    "KNOWLEDGE_BASE_SNAPSHOT", "data/knowledge_base.snapshot"
+)
+
+# Worker processes used by /applicants/suggest_criteria/batch for batches of at
+# least SUGGEST_CRITERIA_PROCESS_MIN_BATCH_SIZE job descriptions (0 disables them)
+SUGGEST_CRITERIA_PROCESSES: int = int(os.environ.get("SUGGEST_CRITERIA_PROCESSES", 0))
+SUGGEST_CRITERIA_PROCESS_MIN_BATCH_SIZE: int = int(
+    os.environ.get("SUGGEST_CRITERIA_PROCESS_MIN_BATCH_SIZE", 1000)
+)
+
+# Number of pages requested at the same time by /applicants/fetch
+FETCH_PAGES_CONCURRENCY: int = int(os.environ.get("FETCH_PAGES_CONCURRENCY", 5))
+
+# Number of applicant details requested at the same time by /applicants/fetch/details
+FETCH_DETAILS_CONCURRENCY: int = int(os.environ.get("FETCH_DETAILS_CONCURRENCY", 10))
+
+# Connections to the Arbeitsagentur API: size of the connection pool, timeouts in
+# seconds, and retries of failed or rate limited (429, 5xx) requests, which wait
+# API_BACKOFF_FACTOR * 2 ** (retry - 1) seconds plus up to API_BACKOFF_JITTER seconds,
+# or the delay of their Retry-After header. Responses asking to wait longer than
+# API_MAX_RETRY_DELAY seconds are not retried
+API_POOL_SIZE: int = int(os.environ.get("API_POOL_SIZE", 10))
+API_CONNECT_TIMEOUT: float = float(os.environ.get("API_CONNECT_TIMEOUT", 5))
+API_READ_TIMEOUT: float = float(os.environ.get("API_READ_TIMEOUT", 30))
+API_MAX_RETRIES: int = int(os.environ.get("API_MAX_RETRIES", 3))
+API_BACKOFF_FACTOR: float = float(os.environ.get("API_BACKOFF_FACTOR", 0.5))
+API_BACKOFF_JITTER: float = float(os.environ.get("API_BACKOFF_JITTER", 0.5))
+API_MAX_RETRY_DELAY: float = float(os.environ.get("API_MAX_RETRY_DELAY", 60))
+
+# Cache of the API responses on disk, with the number of seconds a search result
+# and an applicant's details stay fresh, and the maximal number of cached responses
+# (0 disables the cache)
+API_CACHE_PATH: Text = os.environ.get("API_CACHE_PATH", "data/cache/api_responses.db")
+API_CACHE_MAX_ENTRIES: int = int(os.environ.get("API_CACHE_MAX_ENTRIES", 100000))
+API_CACHE_SEARCH_TTL: float = float(os.environ.get("API_CACHE_SEARCH_TTL", 3600))
+API_CACHE_DETAIL_TTL: float = float(os.environ.get("API_CACHE_DETAIL_TTL", 6 * 3600))
+
+# Rate limit of the requests to the Arbeitsagentur API, shared by all clients of a
+# process: the initial rate in requests per second and its bounds, the burst of
+# requests allowed at once, and the initial and maximal number of requests in
+# flight. Rate and concurrency are adapted to throttled responses at runtime.
+API_RATE: float = float(os.environ.get("API_RATE", 5))
+API_MIN_RATE: float = float(os.environ.get("API_MIN_RATE", 0.2))
+API_MAX_RATE: float = float(os.environ.get("API_MAX_RATE", 50))
+API_RATE_BURST: float = float(os.environ.get("API_RATE_BURST", 5))
+API_CONCURRENCY: float = float(os.environ.get("API_CONCURRENCY", 4))
+API_MAX_CONCURRENCY: float = float(os.environ.get("API_MAX_CONCURRENCY", API_POOL_SIZE))
+
+# Number of seconds a copy of an applicant's details in the local store is used by
+# /applicants/arbeitsagentur/get instead of requesting them again (0 disables it)
+APPLICANT_DETAIL_MAX_AGE: float = float(
+    os.environ.get("APPLICANT_DETAIL_MAX_AGE", 24 * 3600)
+)
+
+# Circuit breaker around the Arbeitsagentur API, shared by all clients of a process.
+# It opens when at least API_CIRCUIT_MIN_CALLS requests were sent in the last
+# API_CIRCUIT_WINDOW seconds and the rate of failed requests (errors and 5xx) reaches
+# API_CIRCUIT_ERROR_RATE, or the rate of requests slower than
+# API_CIRCUIT_SLOW_CALL_DURATION seconds reaches API_CIRCUIT_SLOW_CALL_RATE. After
+# API_CIRCUIT_OPEN_DURATION seconds, API_CIRCUIT_HALF_OPEN_CALLS trial requests
+# decide whether it closes again.
+API_CIRCUIT_WINDOW: float = float(os.environ.get("API_CIRCUIT_WINDOW", 60))
+API_CIRCUIT_MIN_CALLS: int = int(os.environ.get("API_CIRCUIT_MIN_CALLS", 10))
+API_CIRCUIT_ERROR_RATE: float = float(os.environ.get("API_CIRCUIT_ERROR_RATE", 0.5))
+API_CIRCUIT_SLOW_CALL_DURATION: float = float(
+    os.environ.get("API_CIRCUIT_SLOW_CALL_DURATION", 10)
+)
+API_CIRCUIT_SLOW_CALL_RATE: float = float(
+    os.environ.get("API_CIRCUIT_SLOW_CALL_RATE", 0.8)
+)
+API_CIRCUIT_OPEN_DURATION: float = float(os.environ.get("API_CIRCUIT_OPEN_DURATION", 30))
+API_CIRCUIT_HALF_OPEN_CALLS: int = int(os.environ.get("API_CIRCUIT_HALF_OPEN_CALLS", 3))
+
+# Maximal number of pages requested by /applicants/fetch/sync, which usually stops
+# much earlier, at the first page without new or changed applicants
+SYNC_MAX_PAGES: int = int(os.environ.get("SYNC_MAX_PAGES", 100))
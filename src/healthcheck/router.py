@@ -1,6 +1,10 @@
-from fastapi import APIRouter
+from typing import Annotated
+from fastapi import APIRouter, Depends
 from fastapi.responses import PlainTextResponse
 
+from src.applicants.dependencies import get_api_circuit_breaker
+from src.applicants.service.circuit_breaker import CircuitBreaker, CircuitState
+
 router = APIRouter()
 
 
@@ -10,5 +14,15 @@ def liveness_probe():
 
 
 @router.get("/health/readiness", response_class=PlainTextResponse)
-def readiness_probe():
-    return "OK"
+def readiness_probe(
+    circuit_breaker: Annotated[CircuitBreaker, Depends(get_api_circuit_breaker)],
+):
+    """Ready as long as the app runs, the local stores do not need the API.
+
+    While the circuit of the Arbeitsagentur API is not closed, its state is reported
+    after the status.
+    """
+    state: CircuitState = circuit_breaker.current_state()
+    if state == CircuitState.CLOSED:
+        return "OK"
+    return f"OK\nArbeitsagentur API circuit: {state.value}"
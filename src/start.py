@@ -1,5 +1,7 @@
-from fastapi import FastAPI
-from fastapi.responses import PlainTextResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+import math
 import logging
 
 from src.healthcheck.router import router as healthcheck_router
@@ -7,12 +9,33 @@ from src.applicants.router.arbeitsagentur import (
     router as arbeitsagentur_applicants_router,
 )
 from src.applicants.router.extended import router as extended_applicants_router
+from src.applicants.service.circuit_breaker import CircuitOpenError
+from src.applicants.service.registry import store_registry
 
 logger = logging.getLogger(__name__)
 logger.info("Bundesagentur für Arbeit - API is starting now...")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    store_registry.open_all()
+    logger.info("Local stores are loaded.")
+    yield
+    await store_registry.aclose_all()
+
+
+async def circuit_open_handler(request: Request, error: CircuitOpenError):
+    """Fails requests to the Arbeitsagentur API fast while its circuit is open."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(error)},
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
 try:
-    app = FastAPI(docs_url="/")
+    app = FastAPI(docs_url="/", lifespan=lifespan)
+    app.add_exception_handler(CircuitOpenError, circuit_open_handler)
     logger.info("FastAPI app is initialized.")
     app.include_router(extended_applicants_router, tags=["Extended applicants search"])
     logger.info("Extended applicants search router is included in FastAPI app.")
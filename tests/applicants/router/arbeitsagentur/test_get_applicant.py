@@ -1,3 +1,7 @@
+from datetime import datetime
+import random
+import tempfile
+import time
 from typing import Any, Dict, List, Optional, Text
 import unittest
 from anyio import Path
@@ -24,8 +28,31 @@ from src.applicants.schemas.arbeitsagentur.enums import (
 from src.applicants.schemas.arbeitsagentur.schemas import (
     ApplicantSearchResponse,
     BewerberDetail,
+    BewerberUebersicht,
 )
+from src.applicants.dependencies import (
+    get_applicant_api,
+    get_detail_freshness_policy,
+    get_detailed_applicants_db,
+    get_searched_applicants_db,
+)
+from src.applicants.service.extended.db import (
+    STORED_AT_FIELD,
+    DetailedApplicantsDb,
+    SearchedApplicantsDb,
+)
+from src.applicants.service.arbeitsagentur import AsyncApplicantApi
+from src.applicants.service.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.applicants.service.extended.freshness import DetailFreshnessPolicy
+from src.applicants.service.http_cache import HttpResponseCache
+from src.applicants.service.rate_limiter import AdaptiveRateLimiter
 from src.start import app
+from tests.applicants.service.test_arbeitsagentur import (
+    local_api_class,
+    start_fake_api,
+    stop_fake_api,
+)
+from tests.utils.applicants import generate_applicant_detail_dict, generate_applicant_dict
 from tests.utils.regex import search_regex_in_deep
 
 SEARCH_KEYWORDS: List[Text] = [
@@ -74,5 +101,119 @@ class TestSearchApplicants(unittest.TestCase):
         self.assertEqual(applicant.refnr, applicant_id)
 
 
+class FakeApplicantApi:
+    def __init__(self, responses: Dict[Text, Dict]):
+        self.responses: Dict[Text, Dict] = responses
+        self.requests: List[Text] = []
+        self.circuit_open: bool = False
+
+    async def get_applicant(self, applicant_id: Text, revalidate: bool = False) -> Dict:
+        if self.circuit_open:
+            raise CircuitOpenError(30)
+        self.requests.append(applicant_id)
+        return self.responses[applicant_id]
+
+
+class TestGetApplicantLocalCopy(unittest.TestCase):
+    API_PATH: Text = "/applicants/arbeitsagentur/get"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = random.Random(0)
+        self.detail: Dict = generate_applicant_detail_dict(rng, 0)
+        self.refnr: Text = self.detail["refnr"]
+        self.api = FakeApplicantApi({self.refnr: self.detail})
+        self.detailed_db = DetailedApplicantsDb(f"{self.temp_dir.name}/details.json")
+        self.searched_db = SearchedApplicantsDb(f"{self.temp_dir.name}/search.json")
+        self.searched_applicant: Dict = {
+            **generate_applicant_dict(rng, 0),
+            "aktualisierungsdatum": self.detail["aktualisierungsdatum"],
+        }
+        self.policy = DetailFreshnessPolicy(max_age=60)
+        app.dependency_overrides = {
+            get_applicant_api: lambda: self.api,
+            get_detailed_applicants_db: lambda: self.detailed_db,
+            get_searched_applicants_db: lambda: self.searched_db,
+            get_detail_freshness_policy: lambda: self.policy,
+        }
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.detailed_db.close()
+        self.searched_db.close()
+        self.temp_dir.cleanup()
+
+    def test_circuit_open(self):
+        self.api.circuit_open = True
+        response = self.client.get(self.API_PATH, params={"applicant_id": self.refnr})
+        self.assertEqual(503, response.status_code)
+        self.assertEqual("30", response.headers["Retry-After"])
+
+        self.api.circuit_open = False
+        self.get("MISS")
+        self.policy.max_age = 0
+        self.api.circuit_open = True
+        self.get("STALE")
+
+    def test_outdated_response_cache(self):
+        server = start_fake_api()
+        self.addCleanup(stop_fake_api, server)
+        self.api = local_api_class(AsyncApplicantApi, server)(
+            rate_limiter=AdaptiveRateLimiter(rate=1000, burst=1000),
+            circuit_breaker=CircuitBreaker(),
+            response_cache=HttpResponseCache(":memory:"),
+        )
+        updated_detail: Dict = {**self.detail, "aktualisierungsdatum": "2031-01-01 10:00:00"}
+        server.responses = [
+            (200, self.detail, {"ETag": '"v1"'}),
+            (200, updated_detail, {"ETag": '"v2"'}),
+        ]
+        self.get("MISS")
+        self.searched_applicant["aktualisierungsdatum"] = "2031-01-01 10:00:00"
+        self.searched_db.upsert(BewerberUebersicht(**self.searched_applicant))
+
+        # The response cache still holds the outdated details, they are revalidated
+        self.assertEqual(datetime(2031, 1, 1, 10), self.get("MISS").aktualisierungsdatum)
+        self.assertEqual('"v1"', server.request_headers[1].get("If-None-Match"))
+        self.assertEqual(
+            datetime(2031, 1, 1, 10),
+            self.detailed_db.get_by_refnr(self.refnr).aktualisierungsdatum,
+        )
+        self.get("HIT")
+        self.assertEqual(2, len(server.requests))
+
+    def get(self, expected_cache: Text) -> BewerberDetail:
+        response = self.client.get(self.API_PATH, params={"applicant_id": self.refnr})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(expected_cache, response.headers["X-Cache"])
+        self.assertEqual(response.json().keys(), BewerberDetail.model_fields.keys())
+        return BewerberDetail(**response.json())
+
+    def test_write_through(self):
+        first: BewerberDetail = self.get("MISS")
+        self.assertEqual(first, self.detailed_db.get_by_refnr(self.refnr))
+        self.assertEqual(first, self.get("HIT"))
+        self.assertEqual([self.refnr], self.api.requests)
+
+    def test_max_age(self):
+        self.get("MISS")
+        self.detailed_db.update(
+            lambda doc: doc["refnr"] == self.refnr,
+            {STORED_AT_FIELD: time.time() - 120},
+        )
+        self.get("MISS")
+        self.assertEqual(2, len(self.api.requests))
+
+    def test_later_update_in_search_results(self):
+        self.get("MISS")
+        self.searched_db.upsert(BewerberUebersicht(**self.searched_applicant))
+        self.get("HIT")
+        self.searched_applicant["aktualisierungsdatum"] = "2031-01-01 10:00:00"
+        self.searched_db.upsert(BewerberUebersicht(**self.searched_applicant))
+        self.get("MISS")
+        self.assertEqual(2, len(self.api.requests))
+
+
 if __name__ == "__main__":
     unittest.main()
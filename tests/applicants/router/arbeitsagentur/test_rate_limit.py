@@ -0,0 +1,49 @@
+from typing import Text
+import unittest
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.dependencies import get_applicant_api
+from src.applicants.router.arbeitsagentur import router
+from src.applicants.service.arbeitsagentur import AsyncApplicantApi
+from src.applicants.service.circuit_breaker import CircuitBreaker
+from src.applicants.service.rate_limiter import AdaptiveRateLimiter
+from src.start import app
+
+
+class TestRateLimit(unittest.TestCase):
+    API_PATH: Text = "/applicants/arbeitsagentur/rate_limit"
+
+    def setUp(self):
+        self.api = AsyncApplicantApi(
+            rate_limiter=AdaptiveRateLimiter(rate=2, burst=2),
+            circuit_breaker=CircuitBreaker(),
+        )
+        app.dependency_overrides[get_applicant_api] = lambda: self.api
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def test_route_is_in_arbeitsagentur_router(self):
+        self.assertIn(self.API_PATH, [route.path for route in router.routes])
+
+    def test_statistics(self):
+        rate_limiter: AdaptiveRateLimiter = self.api.rate_limiter
+        rate_limiter.release(rate_limiter.acquire(), 429, 5)
+        response = self.client.get(self.API_PATH)
+        self.assertEqual(200, response.status_code)
+        statistics = response.json()
+        self.assertEqual(1, statistics["throttled"])
+        self.assertEqual(1, statistics["retryAfters"])
+        self.assertEqual(0, statistics["inFlight"])
+        self.assertEqual(self.api.rate_limiter.statistics(), statistics)
+
+
+if __name__ == "__main__":
+    unittest.main()
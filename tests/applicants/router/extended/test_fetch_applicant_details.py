@@ -0,0 +1,115 @@
+import asyncio
+import random
+from typing import Any, Dict, List, Text
+import unittest
+from pathlib import Path
+from fastapi.testclient import TestClient
+import httpx
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.dependencies import get_applicant_api, get_detailed_applicants_db
+from src.applicants.schemas.extended.response import FetchDetailedApplicantsResponse
+from src.applicants.service.circuit_breaker import CircuitOpenError
+from src.start import app
+from tests.utils.applicants import generate_applicant_detail_dict
+
+
+class FakeApplicantApi:
+    def __init__(self, responses: Dict[Text, Any], circuit_opens_after: int = -1):
+        self.responses: Dict[Text, Any] = responses
+        self.running: int = 0
+        self.max_running: int = 0
+        self.circuit_opens_after: int = circuit_opens_after
+        self.calls: int = 0
+
+    async def get_applicant(self, applicant_id: Text) -> Dict:
+        self.calls += 1
+        if self.calls > self.circuit_opens_after >= 0:
+            raise CircuitOpenError(30)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.running -= 1
+        response: Any = self.responses[applicant_id]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class FakeApplicantsDb:
+    def __init__(self):
+        self.writes: List[List[Any]] = []
+
+    def upsert_many(self, docs: List[Any]) -> None:
+        self.writes.append(list(docs))
+
+
+class TestFetchApplicantDetails(unittest.TestCase):
+    API_PATH: Text = "/applicants/fetch/details"
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.details: Dict[Text, Dict] = {
+            f"id-{idx}": generate_applicant_detail_dict(rng, idx) for idx in range(30)
+        }
+        self.db = FakeApplicantsDb()
+        app.dependency_overrides[get_detailed_applicants_db] = lambda: self.db
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def fetch(self, api: FakeApplicantApi, applicant_ids: List[Text]):
+        app.dependency_overrides[get_applicant_api] = lambda: api
+        response = self.client.post(self.API_PATH, json={"applicantIds": applicant_ids})
+        self.assertEqual(200, response.status_code)
+        return FetchDetailedApplicantsResponse(**response.json())
+
+    def test_all_fetched(self):
+        api = FakeApplicantApi(self.details)
+        response = self.fetch(api, list(self.details.keys()))
+        self.assertEqual(
+            [detail["refnr"] for detail in self.details.values()],
+            response.applicantRefnrs,
+        )
+        self.assertEqual([], response.failures)
+        self.assertEqual(1, len(self.db.writes))
+        self.assertEqual(30, len(self.db.writes[0]))
+        self.assertGreater(api.max_running, 1)
+
+    def test_failures(self):
+        responses: Dict[Text, Any] = {
+            "id-0": self.details["id-0"],
+            "unknown": {"messages": [{"text": "Not found"}]},
+            "empty": {},
+            "timeout": httpx.ReadTimeout("timed out"),
+            "id-1": self.details["id-1"],
+        }
+        response = self.fetch(FakeApplicantApi(responses), list(responses.keys()))
+        self.assertEqual(2, response.count)
+        self.assertEqual(
+            [self.details["id-0"]["refnr"], self.details["id-1"]["refnr"]],
+            response.applicantRefnrs,
+        )
+        self.assertEqual(
+            ["unknown", "empty", "timeout"],
+            [failure.applicantId for failure in response.failures],
+        )
+        self.assertIn("Not found", response.failures[0].error)
+        self.assertIn("ReadTimeout", response.failures[2].error)
+        self.assertEqual(1, len(self.db.writes))
+
+    def test_circuit_opens(self):
+        api = FakeApplicantApi(self.details, circuit_opens_after=12)
+        response = self.fetch(api, list(self.details.keys()))
+        self.assertEqual(12, response.count)
+        self.assertEqual(18, len(response.failures))
+        self.assertIn("CircuitOpenError", response.failures[0].error)
+        self.assertEqual(1, len(self.db.writes))
+        self.assertEqual(12, len(self.db.writes[0]))
@@ -13,7 +13,7 @@ sys.path.append(str(PROJECT_PATH))
 print("PROJECT_PATH", PROJECT_PATH)
 
 from src.applicants.schemas.extended.response import FetchApplicantsResponse
-from src.applicants.service.extended.db import SearchedApplicantsDb
+from src.applicants.service.extended.stores import create_searched_applicants_db
 from src.applicants.schemas.arbeitsagentur.enums import (
     ContractType,
     Disability,
@@ -183,7 +183,7 @@ class TestFetchApplicants(unittest.TestCase):
     def get_applicant_resume(
         self, applicant_refnr: Text
     ) -> Optional[BewerberUebersicht]:
-        db = SearchedApplicantsDb()
+        db = create_searched_applicants_db()
         applicant: Optional[BewerberUebersicht] = db.get_by_refnr(applicant_refnr)
         return applicant
 
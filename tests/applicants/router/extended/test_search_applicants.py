@@ -35,7 +35,7 @@ from tests.utils.values import (
     SEARCH_KEYWORDS,
     GRADUATION_YEARS,
 )
-from src.applicants.service.extended.db import SearchedApplicantsDb
+from src.applicants.service.extended.stores import create_searched_applicants_db
 
 
 class TestSearchApplicants(unittest.TestCase):
@@ -44,7 +44,7 @@ class TestSearchApplicants(unittest.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestSearchApplicants, self).__init__(*args, **kwargs)
         self.client = TestClient(app)
-        self.db = SearchedApplicantsDb()
+        self.db = create_searched_applicants_db()
 
     def _test_response_is_valid(
         self, response: httpx.Response
@@ -187,6 +187,24 @@ class TestSearchApplicants(unittest.TestCase):
 
             self.assertGreaterEqual(experience_years, min_work_experience_years)
 
+    @parameterized.expand(["2020-01-01", "2023-06-30", "2030-01-01"])
+    def test_parameter_available_from(self, available_from: Text):
+        params: Dict = {"availableFrom": available_from, "size": DEFAULT_PAGE_SIZE}
+        search_response: SearchApplicantsResponse = self.search_over_all_pages(params)
+        for applicant in search_response.applicants:
+            self.assertLessEqual(
+                applicant.verfuegbarkeitVon.isoformat(), available_from
+            )
+
+    @parameterized.expand(["2020-01-01", "2023-06-30", "2030-01-01"])
+    def test_parameter_updated_since(self, updated_since: Text):
+        params: Dict = {"updatedSince": updated_since, "size": DEFAULT_PAGE_SIZE}
+        search_response: SearchApplicantsResponse = self.search_over_all_pages(params)
+        for applicant in search_response.applicants:
+            self.assertGreaterEqual(
+                applicant.aktualisierungsdatum.date().isoformat(), updated_since
+            )
+
     # TODO: Write further tests
 
     def assertRegexInDeep(
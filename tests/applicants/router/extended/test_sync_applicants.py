@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+import random
+import tempfile
+from typing import Any, Dict, List, Optional, Text
+import unittest
+from pathlib import Path
+from fastapi.testclient import TestClient
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.dependencies import (
+    get_applicant_api,
+    get_searched_applicants_db,
+    get_sync_state_db,
+)
+from src.applicants.schemas.arbeitsagentur.request import SearchParameters
+from src.applicants.schemas.extended.response import SyncApplicantsResponse
+from src.applicants.service.extended.db import SearchedApplicantsDb
+from src.applicants.service.extended.sync import SyncStateDb
+from src.start import app
+from tests.utils.applicants import generate_applicant_dict
+
+PAGE_SIZE: int = 5
+
+
+class FakeApplicantApi:
+    """Lists the applicants by descending update date, like the API."""
+
+    def __init__(self, applicants: List[Dict[Text, Any]]):
+        self.applicants: List[Dict[Text, Any]] = applicants
+        self.pages: List[int] = []
+
+    async def search_applicants(
+        self, search_parameters: Optional[SearchParameters] = None, revalidate=False
+    ) -> Dict:
+        self.pages.append(search_parameters.page)
+        applicants: List[Dict[Text, Any]] = sorted(
+            self.applicants,
+            key=lambda applicant: applicant["aktualisierungsdatum"],
+            reverse=True,
+        )
+        start: int = (search_parameters.page - 1) * search_parameters.size
+        return {
+            "bewerber": applicants[start : start + search_parameters.size],
+            "maxErgebnisse": len(applicants),
+            "page": search_parameters.page,
+            "size": search_parameters.size,
+        }
+
+
+class TestSyncApplicants(unittest.TestCase):
+    API_PATH: Text = "/applicants/fetch/sync"
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = random.Random(0)
+        updated_at = datetime(2024, 1, 1, 10)
+        self.applicants: List[Dict[Text, Any]] = [
+            {
+                **generate_applicant_dict(rng, idx),
+                "aktualisierungsdatum": (updated_at - timedelta(days=idx)).isoformat(),
+            }
+            for idx in range(3 * PAGE_SIZE)
+        ]
+        self.api = FakeApplicantApi(self.applicants)
+        self.db = SearchedApplicantsDb(f"{self.temp_dir.name}/applicants.json")
+        self.sync_state_db = SyncStateDb(f"{self.temp_dir.name}/sync_state.json")
+        app.dependency_overrides = {
+            get_applicant_api: lambda: self.api,
+            get_searched_applicants_db: lambda: self.db,
+            get_sync_state_db: lambda: self.sync_state_db,
+        }
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.db.close()
+        self.sync_state_db.close()
+        self.temp_dir.cleanup()
+
+    def sync(self, **params) -> SyncApplicantsResponse:
+        self.api.pages = []
+        response = self.client.get(
+            self.API_PATH, params={"searchKeyword": "Lehrer", "size": PAGE_SIZE, **params}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            response.json().keys(), SyncApplicantsResponse.model_fields.keys()
+        )
+        return SyncApplicantsResponse(**response.json())
+
+    def test_first_sync(self):
+        response: SyncApplicantsResponse = self.sync()
+        self.assertEqual(
+            (15, 0, 0), (response.newCount, response.changedCount, response.unchangedCount)
+        )
+        self.assertEqual([1, 2, 3, 4], self.api.pages)
+        self.assertEqual(datetime(2024, 1, 1, 10), response.watermark)
+        self.assertEqual(15, len(self.db.get_all()))
+
+    def test_nothing_changed(self):
+        self.sync()
+        response: SyncApplicantsResponse = self.sync()
+        self.assertEqual([1], self.api.pages)
+        self.assertEqual(
+            (0, 0, 5), (response.newCount, response.changedCount, response.unchangedCount)
+        )
+        self.assertEqual([], response.applicantRefnrs)
+
+    def test_new_and_changed(self):
+        self.sync()
+        self.applicants[7]["aktualisierungsdatum"] = "2024-02-01T10:00:00"
+        self.applicants.append(
+            {
+                **generate_applicant_dict(random.Random(1), 100),
+                "aktualisierungsdatum": "2024-02-02T10:00:00",
+            }
+        )
+        response: SyncApplicantsResponse = self.sync()
+        self.assertEqual([1, 2], self.api.pages)
+        self.assertEqual(
+            (1, 1, 8), (response.newCount, response.changedCount, response.unchangedCount)
+        )
+        self.assertEqual(
+            [self.applicants[-1]["refnr"], self.applicants[7]["refnr"]],
+            response.applicantRefnrs,
+        )
+        self.assertEqual(datetime(2024, 2, 2, 10), response.watermark)
+
+    def test_known_applicants_above_watermark(self):
+        # Stored by another fetch, but newer than the last sync of this search
+        self.sync(pages_count=1)
+        for applicant in self.applicants[5:]:
+            applicant["aktualisierungsdatum"] = "2024-03-01T10:00:00"
+        self.sync(searchKeyword="Manager")
+        response: SyncApplicantsResponse = self.sync()
+        # Page 3 is the first one reaching the watermark of the previous sync
+        self.assertEqual([1, 2, 3], self.api.pages)
+        self.assertEqual(15, response.unchangedCount)
+
+    def test_saved_searches_are_separate(self):
+        self.sync()
+        self.sync(searchKeyword="Manager")
+        self.assertEqual([1, 2, 3, 4], self.api.pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
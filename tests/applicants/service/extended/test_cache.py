@@ -0,0 +1,97 @@
+from typing import List
+import unittest
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.enums import WorkingTime
+from src.applicants.schemas.extended.request import (
+    ExtendedDetailedSearchParameters,
+    ExtendedSearchParameters,
+)
+from src.applicants.service.extended.cache import SearchResultCache, search_cache_key
+
+
+class TestSearchCacheKey(unittest.TestCase):
+    @parameterized.expand(
+        [
+            (
+                ExtendedSearchParameters(keywords=["Lehrer", "Manager"]),
+                ExtendedSearchParameters(keywords=["Manager", "Lehrer", "Lehrer"]),
+            ),
+            (ExtendedSearchParameters(keywords=[]), ExtendedSearchParameters()),
+            (
+                ExtendedSearchParameters(working_time=WorkingTime.UNDEFINED),
+                ExtendedSearchParameters(),
+            ),
+            (
+                ExtendedDetailedSearchParameters(skills=["SAP", "Python"], languages=[]),
+                ExtendedDetailedSearchParameters(skills=["Python", "SAP"]),
+            ),
+        ]
+    )
+    def test_same_key(self, first, second):
+        self.assertEqual(search_cache_key(first), search_cache_key(second))
+
+    @parameterized.expand(
+        [
+            (
+                ExtendedSearchParameters(keywords=["Lehrer"]),
+                ExtendedSearchParameters(keywords=["lehrer"]),
+            ),
+            (
+                ExtendedSearchParameters(min_work_experience_years=5),
+                ExtendedDetailedSearchParameters(min_work_experience_years=5),
+            ),
+        ]
+    )
+    def test_different_key(self, first, second):
+        self.assertNotEqual(search_cache_key(first), search_cache_key(second))
+
+
+class TestSearchResultCache(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = SearchResultCache(2)
+        key = search_cache_key(ExtendedSearchParameters(keywords=["Lehrer"]))
+        self.assertIsNone(cache.get(key, 0))
+        cache.put(key, 0, ["1", "2"])
+        self.assertEqual(["1", "2"], cache.get(key, 0))
+        self.assertEqual(
+            {"hits": 1, "misses": 1, "size": 1, "maxSize": 2}, cache.statistics()
+        )
+
+    def test_outdated_version_is_dropped(self):
+        cache = SearchResultCache(2)
+        key = search_cache_key(ExtendedSearchParameters(keywords=["Lehrer"]))
+        cache.put(key, 0, ["1"])
+        self.assertIsNone(cache.get(key, 1))
+        self.assertEqual(0, cache.statistics()["size"])
+
+    def test_least_recently_used_is_evicted(self):
+        cache = SearchResultCache(2)
+        keys: List = [
+            search_cache_key(ExtendedSearchParameters(keywords=[keyword]))
+            for keyword in ["a", "b", "c"]
+        ]
+        cache.put(keys[0], 0, ["a"])
+        cache.put(keys[1], 0, ["b"])
+        cache.get(keys[0], 0)
+        cache.put(keys[2], 0, ["c"])
+        self.assertEqual(["a"], cache.get(keys[0], 0))
+        self.assertIsNone(cache.get(keys[1], 0))
+        self.assertEqual(["c"], cache.get(keys[2], 0))
+
+    def test_disabled(self):
+        cache = SearchResultCache(0)
+        key = search_cache_key(ExtendedSearchParameters(keywords=["Lehrer"]))
+        cache.put(key, 0, ["1"])
+        self.assertIsNone(cache.get(key, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import random
+import re
+from typing import Any, Callable, Dict, List, Text
+import unittest
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.enums import WorkingTime
+from src.applicants.schemas.extended.request import (
+    ExtendedDetailedSearchParameters,
+    ExtendedSearchParameters,
+)
+from src.applicants.service.extended.compiler import (
+    compile_detailed_search_query,
+    compile_search_query,
+)
+from src.applicants.service.extended.query import (
+    build_detailed_search_query,
+    build_search_query,
+)
+from tests.utils.applicants import (
+    generate_applicant_detail_dict,
+    generate_applicant_dict,
+)
+from tests.utils.values import (
+    EXPERIENCE_YEARS,
+    GRADUATION_YEARS,
+    LOCATIONS,
+    SEARCH_KEYWORDS,
+)
+
+
+APPLICANTS_COUNT: int = 500
+
+
+def safe_match(query: Callable[[Dict], bool], doc: Dict[Text, Any]) -> bool:
+    # Some TinyDB queries raise on incomplete documents, which counts as no match
+    try:
+        return bool(query(doc))
+    except Exception:
+        return False
+
+
+class TestCompileSearchQuery(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCompileSearchQuery, self).__init__(*args, **kwargs)
+        rng = random.Random(42)
+        self.applicants: List[Dict[Text, Any]] = [
+            generate_applicant_dict(rng, idx) for idx in range(APPLICANTS_COUNT)
+        ]
+
+    def assertSameMatches(self, search_parameters: ExtendedSearchParameters):
+        query = build_search_query(search_parameters)
+        compiled_query = compile_search_query(search_parameters)
+        for applicant in self.applicants:
+            self.assertEqual(
+                safe_match(query, applicant),
+                compiled_query(applicant),
+                f"{compiled_query} differs for {applicant}",
+            )
+
+    def test_no_parameters(self):
+        self.assertIsNone(compile_search_query(ExtendedSearchParameters()))
+
+    @parameterized.expand(SEARCH_KEYWORDS)
+    def test_keyword(self, keyword: Text):
+        search_parameters = ExtendedSearchParameters(keywords=[keyword])
+        query = build_search_query(search_parameters)
+        compiled_query = compile_search_query(search_parameters)
+        for applicant in self.applicants:
+            # The compiled query also searches the list of professions, which the
+            # TinyDB query silently skipped
+            in_berufe: bool = any(
+                re.match(keyword, beruf, re.IGNORECASE) for beruf in applicant["berufe"]
+            )
+            self.assertEqual(
+                safe_match(query, applicant) or in_berufe, compiled_query(applicant)
+            )
+
+    @parameterized.expand(GRADUATION_YEARS)
+    def test_max_graduation_year(self, max_graduation_year: int):
+        self.assertSameMatches(
+            ExtendedSearchParameters(max_graduation_year=max_graduation_year)
+        )
+
+    @parameterized.expand(EXPERIENCE_YEARS)
+    def test_min_work_experience_years(self, min_work_experience_years: int):
+        self.assertSameMatches(
+            ExtendedSearchParameters(min_work_experience_years=min_work_experience_years)
+        )
+
+    @parameterized.expand(["Informatik", "pflege", "Lehr.*"])
+    def test_career_field(self, career_field: Text):
+        self.assertSameMatches(ExtendedSearchParameters(career_field=career_field))
+
+    @parameterized.expand(
+        [
+            working_time.name
+            for working_time in WorkingTime
+            if working_time != WorkingTime.UNDEFINED
+        ]
+    )
+    def test_working_time(self, working_time: Text):
+        self.assertSameMatches(
+            ExtendedSearchParameters(working_time=WorkingTime[working_time])
+        )
+
+    @parameterized.expand(LOCATIONS + ["bay", "1234"])
+    def test_location(self, location: Text):
+        self.assertSameMatches(ExtendedSearchParameters(location_keyword=location))
+
+    def test_multiple_parameters(self):
+        self.assertSameMatches(
+            ExtendedSearchParameters(
+                max_graduation_year=2010,
+                min_work_experience_years=5,
+                career_field="Informatik",
+                working_time=WorkingTime.FULL_TIME,
+                location_keyword="München",
+            )
+        )
+
+
+class TestCompileDetailedSearchQuery(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCompileDetailedSearchQuery, self).__init__(*args, **kwargs)
+        rng = random.Random(42)
+        self.applicants: List[Dict[Text, Any]] = [
+            generate_applicant_detail_dict(rng, idx) for idx in range(APPLICANTS_COUNT)
+        ]
+
+    def assertSameMatches(self, search_parameters: ExtendedDetailedSearchParameters):
+        query = build_detailed_search_query(search_parameters)
+        compiled_query = compile_detailed_search_query(search_parameters)
+        for applicant in self.applicants:
+            self.assertEqual(
+                safe_match(query, applicant),
+                compiled_query(applicant),
+                f"{compiled_query} differs for {applicant}",
+            )
+
+    def test_no_parameters(self):
+        self.assertIsNone(
+            compile_detailed_search_query(ExtendedDetailedSearchParameters())
+        )
+
+    @parameterized.expand(SEARCH_KEYWORDS)
+    def test_job_title(self, job_title: Text):
+        self.assertSameMatches(ExtendedDetailedSearchParameters(job_title=job_title))
+
+    @parameterized.expand(LOCATIONS)
+    def test_location(self, location: Text):
+        self.assertSameMatches(ExtendedDetailedSearchParameters(location=location))
+
+    @parameterized.expand([0, 1, 3, 10])
+    def test_min_avg_job_position_years(self, years: int):
+        self.assertSameMatches(
+            ExtendedDetailedSearchParameters(min_avg_job_position_years=years)
+        )
+
+    @parameterized.expand(EXPERIENCE_YEARS)
+    def test_min_work_experience_years(self, years: int):
+        self.assertSameMatches(
+            ExtendedDetailedSearchParameters(min_work_experience_years=years)
+        )
+
+    @parameterized.expand([0, 1, 5, 20])
+    def test_max_sabbatical_time_years(self, years: int):
+        self.assertSameMatches(
+            ExtendedDetailedSearchParameters(max_sabbatical_time_years=years)
+        )
+
+    @parameterized.expand(["Universität", "schul", "München"])
+    def test_education_keyword(self, education_keyword: Text):
+        self.assertSameMatches(
+            ExtendedDetailedSearchParameters(education_keyword=education_keyword)
+        )
+
+    @parameterized.expand(["Python", "SAP", "java"])
+    def test_skill(self, skill: Text):
+        self.assertSameMatches(ExtendedDetailedSearchParameters(skills=[skill]))
+
+    @parameterized.expand([[["Englisch"]], [["Deutsch", "Spanisch"]]])
+    def test_languages(self, languages: List[Text]):
+        self.assertSameMatches(ExtendedDetailedSearchParameters(languages=languages))
+
+
+if __name__ == "__main__":
+    unittest.main()
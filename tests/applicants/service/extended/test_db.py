@@ -0,0 +1,647 @@
+from datetime import date
+import os
+import random
+import tempfile
+import time
+from typing import List, Optional, Text, Type
+import unittest
+from unittest import mock
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberDetail,
+    BewerberUebersicht,
+)
+from src.applicants.schemas.extended.request import (
+    ExtendedDetailedSearchParameters,
+    ExtendedSearchParameters,
+)
+from src.applicants.service.extended.compiler import (
+    CompiledQuery,
+    compile_detailed_search_query,
+    compile_search_query,
+)
+from src.applicants.service.extended.db import (
+    ApplicantsDb,
+    DetailedApplicantsDb,
+    ReadCacheMiddleware,
+    SearchedApplicantsDb,
+)
+from src.applicants.service.extended.index import ApplicantIndex, RangeIndex
+from src.applicants.service.extended.sqlite_db import (
+    SqliteDetailedApplicantsDb,
+    SqliteSearchedApplicantsDb,
+)
+from tests.utils.applicants import (
+    generate_applicant_detail_dict,
+    generate_applicant_dict,
+)
+from tests.utils.values import EXPERIENCE_YEARS, GRADUATION_YEARS, SEARCH_KEYWORDS
+
+
+APPLICANTS_COUNT: int = 200
+
+DB_CLASSES: List[Type[ApplicantsDb]] = [SearchedApplicantsDb, SqliteSearchedApplicantsDb]
+DETAILED_DB_CLASSES: List[Type[ApplicantsDb]] = [
+    DetailedApplicantsDb,
+    SqliteDetailedApplicantsDb,
+]
+
+KEYWORDS: List[Text] = SEARCH_KEYWORDS + [
+    "ingen",
+    "software",
+    "Lehrer/in",
+    "Lehrer in",
+    "Informatik",
+    "10000-0000001",
+    "Manager|Lehrer",
+    "Lehr.*",
+    "Unbekannt",
+]
+
+
+class ApplicantsDbTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        rng = random.Random(42)
+        self.applicants: List[BewerberUebersicht] = [
+            BewerberUebersicht(**generate_applicant_dict(rng, idx))
+            for idx in range(APPLICANTS_COUNT)
+        ]
+        self.applicant_details: List[BewerberDetail] = [
+            BewerberDetail(**generate_applicant_detail_dict(rng, idx))
+            for idx in range(APPLICANTS_COUNT)
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_db(self, db_class: Type[ApplicantsDb]) -> ApplicantsDb:
+        db: ApplicantsDb = db_class(Path(self.temp_dir.name) / db_class.__name__)
+        self.addCleanup(db.close)
+        return db
+
+    def assertSameAsScan(self, db: ApplicantsDb, query: CompiledQuery):
+        expected: List[Text] = [
+            applicant.refnr
+            for applicant in db.get_all()
+            if query(db._serialize_object_(applicant))
+        ]
+        self.assertEqual(expected, [applicant.refnr for applicant in db.get(query)])
+
+
+class TestApplicantsDbBackend(unittest.TestCase):
+    def test_missing_primitive_fails_on_instantiation(self):
+        class MissingDeleteApplicantsDb(ApplicantsDb[BewerberUebersicht]):
+            model = BewerberUebersicht
+
+            def contains(self, refnr: Text) -> bool:
+                return False
+
+            def close(self) -> None:
+                pass
+
+            def _iter_docs_(self):
+                return iter([])
+
+            def _read_docs_(self, refnrs):
+                return []
+
+            def _write_docs_(self, docs):
+                return list(docs.values())
+
+            def _delete_docs_(self, refnrs):
+                pass
+
+        with self.assertRaises(TypeError):
+            MissingDeleteApplicantsDb()
+
+    def test_index_missing_method_fails_on_instantiation(self):
+        class AddOnlyIndex(ApplicantIndex):
+            def add(self, refnr, doc, derived_fields) -> None:
+                pass
+
+        with self.assertRaises(TypeError):
+            AddOnlyIndex()
+
+
+class TestRefnrIndex(ApplicantsDbTestCase):
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_get_by_refnr(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+
+        for applicant in random.Random(1).sample(self.applicants, 20):
+            self.assertTrue(db.contains(applicant.refnr))
+            self.assertEqual(applicant, db.get_by_refnr(applicant.refnr))
+        self.assertFalse(db.contains("10000-0000000000-S"))
+        self.assertIsNone(db.get_by_refnr("10000-0000000000-S"))
+        self.assertEqual(
+            [self.applicants[5], self.applicants[2]],
+            db.get_by_refnrs(
+                [self.applicants[5].refnr, "10000-0000000000-S", self.applicants[2].refnr]
+            ),
+        )
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_index_follows_writes(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.insert(self.applicants[0])
+        db.upsert_many(self.applicants[1:10])
+
+        query: CompiledQuery = compile_search_query(ExtendedSearchParameters())
+        db.remove(lambda doc: doc["refnr"] == self.applicants[3].refnr)
+        self.assertFalse(db.contains(self.applicants[3].refnr))
+        self.assertIsNone(db.get_by_refnr(self.applicants[3].refnr))
+        self.assertEqual(self.applicants[4], db.get_by_refnr(self.applicants[4].refnr))
+
+        db.remove_all()
+        self.assertIsNone(db.get_by_refnr(self.applicants[4].refnr))
+        self.assertEqual([], db.get(query))
+        db.upsert(self.applicants[4])
+        self.assertEqual(self.applicants[4], db.get_by_refnr(self.applicants[4].refnr))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_index_is_rebuilt_on_open(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        db.close()
+
+        db = self.create_db(db_class)
+        for applicant in self.applicants[::20]:
+            self.assertEqual(applicant, db.get_by_refnr(applicant.refnr))
+
+
+class TestReadCacheMiddleware(ApplicantsDbTestCase):
+    def test_reads_are_served_from_memory(self):
+        db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        db.upsert_many(self.applicants[:10])
+        storage: ReadCacheMiddleware = db.db.storage
+
+        with mock.patch.object(storage.storage, "read") as read:
+            for applicant in self.applicants[:10]:
+                self.assertEqual(applicant, db.get_by_refnr(applicant.refnr))
+            self.assertEqual(self.applicants[:10], db.get_all())
+        read.assert_not_called()
+
+    def test_writes_go_through_to_the_file(self):
+        db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        db.upsert(self.applicants[0])
+        db.upsert(self.applicants[1])
+        self.assertFalse(db.is_stale())
+
+        other_db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        self.assertEqual(self.applicants[:2], other_db.get_all())
+
+    def test_batch_writes_the_file_once(self):
+        db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        db.upsert(self.applicants[0])
+        storage: ReadCacheMiddleware = db.db.storage
+
+        with mock.patch.object(
+            storage.storage, "write", wraps=storage.storage.write
+        ) as write:
+            with storage.batch():
+                db.upsert(self.applicants[1])
+                db.upsert(self.applicants[2])
+                self.assertEqual(0, write.call_count)
+                self.assertEqual(
+                    self.applicants[2], db.get_by_refnr(self.applicants[2].refnr)
+                )
+        self.assertEqual(1, write.call_count)
+        other_db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        self.assertEqual(self.applicants[:3], other_db.get_all())
+
+    def test_is_stale_after_write_by_someone_else(self):
+        db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        db.upsert(self.applicants[0])
+        other_db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        other_db.upsert(self.applicants[1])
+        path: Path = Path(self.temp_dir.name) / SearchedApplicantsDb.__name__
+        # The mtime of both writes may fall into the same clock tick
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertTrue(db.is_stale())
+        self.assertFalse(self.create_db(SearchedApplicantsDb).is_stale())
+
+
+class TestUpsertMany(ApplicantsDbTestCase):
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_replaces_existing_refnrs(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants[:10])
+        changed: List[BewerberUebersicht] = [
+            applicant.model_copy(update={"hatEmail": not applicant.hatEmail})
+            for applicant in self.applicants[5:10]
+        ]
+
+        db.upsert_many(changed + self.applicants[10:15])
+        self.assertEqual(
+            self.applicants[:5] + changed + self.applicants[10:15], db.get_all()
+        )
+        for original, applicant in zip(self.applicants[5:10], changed):
+            self.assertNotEqual(original, db.get_by_refnr(applicant.refnr))
+            self.assertEqual(applicant, db.get_by_refnr(applicant.refnr))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_last_duplicate_in_batch_wins(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        changed: BewerberUebersicht = self.applicants[0].model_copy(
+            update={"hatEmail": not self.applicants[0].hatEmail}
+        )
+
+        db.upsert_many([self.applicants[0], self.applicants[1], changed])
+        self.assertEqual([changed, self.applicants[1]], db.get_all())
+
+    def test_tinydb_writes_file_once_per_batch(self):
+        db: SearchedApplicantsDb = self.create_db(SearchedApplicantsDb)
+        db.upsert_many(self.applicants[:10])
+        storage: ReadCacheMiddleware = db.db.storage
+
+        with mock.patch.object(
+            storage.storage, "write", wraps=storage.storage.write
+        ) as write:
+            db.upsert_many(self.applicants[5:50])
+        self.assertEqual(1, write.call_count)
+        self.assertEqual(self.applicants[:50], db.get_all())
+
+    def test_sqlite_writes_once_per_batch(self):
+        db: SqliteSearchedApplicantsDb = self.create_db(SqliteSearchedApplicantsDb)
+        db.upsert_many(self.applicants[:10])
+
+        with mock.patch.object(
+            db, "_transaction_", wraps=db._transaction_
+        ) as transaction:
+            db.upsert_many(self.applicants[5:50])
+        self.assertEqual(1, transaction.call_count)
+        self.assertEqual(self.applicants[:50], db.get_all())
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_empty_batch_does_not_write(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        version: int = db.version
+
+        db.upsert_many([])
+        self.assertEqual(version, db.version)
+        self.assertEqual([], db.get_all())
+
+
+class TestKeywordIndex(ApplicantsDbTestCase):
+    def assertSameKeywordMatches(self, db: ApplicantsDb, keywords: List[Text]):
+        self.assertSameAsScan(
+            db, compile_search_query(ExtendedSearchParameters(keywords=keywords))
+        )
+
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, keyword)
+            for db_class in DB_CLASSES
+            for keyword in KEYWORDS
+        ]
+    )
+    def test_keyword(self, _, db_class: Type[ApplicantsDb], keyword: Text):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        self.assertSameKeywordMatches(db, [keyword])
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_multiple_keywords(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        self.assertSameKeywordMatches(db, ["Ingenieur", "Informatik"])
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_index_follows_writes(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+
+        renamed: BewerberUebersicht = self.applicants[0].model_copy(
+            update={
+                "berufe": ["Astronaut/in"],
+                "freierTitelStellengesuch": None,
+                "letzteTaetigkeit": None,
+            }
+        )
+        db.upsert(renamed)
+        self.assertSameKeywordMatches(db, ["Astronaut"])
+        self.assertSameKeywordMatches(db, [self.applicants[0].berufe[0]])
+
+        query = compile_search_query(ExtendedSearchParameters(keywords=["Astronaut"]))
+        db.remove(query)
+        self.assertEqual([], db.get(query))
+        self.assertFalse(db.contains(renamed.refnr))
+
+        db.remove_all()
+        self.assertEqual(
+            [], db.get(compile_search_query(ExtendedSearchParameters(keywords=["Lehrer"])))
+        )
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_index_is_rebuilt_on_open(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        db.close()
+
+        db = self.create_db(db_class)
+        self.assertSameKeywordMatches(db, ["Manager"])
+
+
+class TestDerivedFields(ApplicantsDbTestCase):
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, max_graduation_year, min_work_experience_years)
+            for db_class in DB_CLASSES
+            for max_graduation_year in GRADUATION_YEARS
+            for min_work_experience_years in EXPERIENCE_YEARS
+        ]
+    )
+    def test_search(
+        self,
+        _,
+        db_class: Type[ApplicantsDb],
+        max_graduation_year: int,
+        min_work_experience_years: int,
+    ):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        self.assertSameAsScan(
+            db,
+            compile_search_query(
+                ExtendedSearchParameters(
+                    keywords=["Lehrer"],
+                    max_graduation_year=max_graduation_year,
+                    min_work_experience_years=min_work_experience_years,
+                )
+            ),
+        )
+
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, years)
+            for db_class in DETAILED_DB_CLASSES
+            for years in [0, 1, 5, 20]
+        ]
+    )
+    def test_detailed_search(self, _, db_class: Type[ApplicantsDb], years: int):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicant_details)
+        for search_parameters in [
+            ExtendedDetailedSearchParameters(min_avg_job_position_years=years),
+            ExtendedDetailedSearchParameters(min_work_experience_years=years),
+            ExtendedDetailedSearchParameters(max_sabbatical_time_years=years),
+        ]:
+            self.assertSameAsScan(db, compile_detailed_search_query(search_parameters))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_derived_fields_follow_writes(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        query: CompiledQuery = compile_search_query(
+            ExtendedSearchParameters(max_graduation_year=1900)
+        )
+        self.assertEqual([], db.get(query))
+
+        db.upsert(
+            self.applicants[0].model_copy(
+                update={"ausbildungen": [{"jahr": 1899, "art": "Studium"}]}
+            )
+        )
+        self.assertEqual(
+            [self.applicants[0].refnr], [applicant.refnr for applicant in db.get(query)]
+        )
+
+
+class TestRangeIndexes(ApplicantsDbTestCase):
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, search_parameters)
+            for db_class in DB_CLASSES
+            for search_parameters in [
+                ExtendedSearchParameters(max_graduation_year=2000),
+                ExtendedSearchParameters(
+                    max_graduation_year=2000, min_work_experience_years=5
+                ),
+                ExtendedSearchParameters(available_from=date(2022, 1, 1)),
+                ExtendedSearchParameters(published_since=date(2023, 1, 1)),
+                ExtendedSearchParameters(
+                    keywords=["Manager"],
+                    updated_since=date(2022, 6, 15),
+                    available_from=date(2024, 1, 1),
+                ),
+                ExtendedSearchParameters(updated_since=date(2030, 1, 1)),
+            ]
+        ]
+    )
+    def test_search(
+        self,
+        _,
+        db_class: Type[ApplicantsDb],
+        search_parameters: ExtendedSearchParameters,
+    ):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        self.assertSameAsScan(db, compile_search_query(search_parameters))
+
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, search_parameters)
+            for db_class in DETAILED_DB_CLASSES
+            for search_parameters in [
+                ExtendedDetailedSearchParameters(
+                    min_avg_job_position_years=3, min_work_experience_years=5
+                ),
+                ExtendedDetailedSearchParameters(
+                    available_from=date(2022, 1, 1), updated_since=date(2022, 1, 1)
+                ),
+            ]
+        ]
+    )
+    def test_detailed_search(
+        self,
+        _,
+        db_class: Type[ApplicantsDb],
+        search_parameters: ExtendedDetailedSearchParameters,
+    ):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicant_details)
+        self.assertSameAsScan(db, compile_detailed_search_query(search_parameters))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_indexes_follow_writes(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        query: CompiledQuery = compile_search_query(
+            ExtendedSearchParameters(updated_since=date(2030, 1, 1))
+        )
+        self.assertEqual([], db.get(query))
+
+        db.upsert(
+            self.applicants[1].model_copy(
+                update={"aktualisierungsdatum": "2030-02-01T08:00:00"}
+            )
+        )
+        self.assertEqual(
+            [self.applicants[1].refnr], [applicant.refnr for applicant in db.get(query)]
+        )
+
+        db.remove(query)
+        self.assertEqual([], db.get(query))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_indexes_are_rebuilt_on_open(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        written: List[RangeIndex] = [
+            index for index in db.indexes if isinstance(index, RangeIndex)
+        ]
+        db.close()
+
+        db = self.create_db(db_class)
+        opened: List[RangeIndex] = [
+            index for index in db.indexes if isinstance(index, RangeIndex)
+        ]
+        self.assertEqual(len(written), len(opened))
+        for written_index, opened_index in zip(written, opened):
+            self.assertEqual(written_index.entries, opened_index.entries)
+            self.assertEqual(written_index.values, opened_index.values)
+        self.assertSameAsScan(
+            db,
+            compile_search_query(
+                ExtendedSearchParameters(
+                    max_graduation_year=2000, updated_since=date(2022, 6, 15)
+                )
+            ),
+        )
+
+        db.upsert(
+            self.applicants[1].model_copy(
+                update={"aktualisierungsdatum": "2030-02-01T08:00:00"}
+            )
+        )
+        self.assertEqual(
+            [self.applicants[1].refnr],
+            [
+                applicant.refnr
+                for applicant in db.get(
+                    compile_search_query(
+                        ExtendedSearchParameters(updated_since=date(2030, 1, 1))
+                    )
+                )
+            ],
+        )
+
+
+class TestApplicantCursor(ApplicantsDbTestCase):
+    @parameterized.expand(
+        [
+            (db_class.__name__, db_class, search_parameters)
+            for db_class in DB_CLASSES
+            for search_parameters in [
+                None,
+                ExtendedSearchParameters(keywords=["Lehrer"]),
+                ExtendedSearchParameters(max_graduation_year=2000),
+                ExtendedSearchParameters(career_field="Informatik"),
+            ]
+        ]
+    )
+    def test_pages(
+        self,
+        _,
+        db_class: Type[ApplicantsDb],
+        search_parameters: Optional[ExtendedSearchParameters],
+    ):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+        query: Optional[CompiledQuery] = (
+            None if search_parameters is None else compile_search_query(search_parameters)
+        )
+        expected: List[Text] = [
+            applicant.refnr
+            for applicant in (db.get_all() if query is None else db.get(query))
+        ]
+
+        cursor = db.find(query)
+        self.assertEqual(len(expected), len(cursor))
+        self.assertEqual(expected, [applicant.refnr for applicant in cursor])
+        pages: List[Text] = []
+        for page in range(1, len(expected) // 7 + 2):
+            pages.extend([applicant.refnr for applicant in cursor.page(page, 7)])
+        self.assertEqual(expected, pages)
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_only_page_is_materialized(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants)
+
+        with mock.patch.object(
+            db, "_unserealize_object_", wraps=db._unserealize_object_
+        ) as unserialize:
+            cursor = db.find(compile_search_query(ExtendedSearchParameters(keywords=["L"])))
+            self.assertGreater(len(cursor), 10)
+            self.assertEqual(10, len(cursor.page(2, 10)))
+        self.assertEqual(10, unserialize.call_count)
+
+
+class TestSearchCache(ApplicantsDbTestCase):
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_writes_invalidate_results(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        db.upsert_many(self.applicants[:100])
+        search_parameters = ExtendedSearchParameters(keywords=["Lehrer"])
+
+        first: List[Text] = db.find(compile_search_query(search_parameters)).refnrs
+        self.assertEqual(first, db.find(compile_search_query(search_parameters)).refnrs)
+        self.assertEqual(1, db.search_cache.statistics()["hits"])
+
+        db.upsert_many(self.applicants[100:])
+        refnrs: List[Text] = db.find(compile_search_query(search_parameters)).refnrs
+        self.assertEqual(
+            [applicant.refnr for applicant in db.get(compile_search_query(search_parameters))],
+            refnrs,
+        )
+        self.assertGreater(len(refnrs), len(first))
+
+        db.remove(compile_search_query(ExtendedSearchParameters(keywords=["Lehrer"])))
+        self.assertEqual(0, len(db.find(compile_search_query(search_parameters))))
+        self.assertEqual(
+            {"hits": 1, "misses": 3},
+            {
+                name: value
+                for name, value in db.search_cache.statistics().items()
+                if name in ["hits", "misses"]
+            },
+        )
+
+
+class TestStoredAt(ApplicantsDbTestCase):
+    @parameterized.expand(
+        [(db_class.__name__, db_class) for db_class in DB_CLASSES + DETAILED_DB_CLASSES]
+    )
+    def test_writes_record_stored_at(self, _, db_class: Type[ApplicantsDb]):
+        db: ApplicantsDb = self.create_db(db_class)
+        applicants = (
+            self.applicant_details if db_class in DETAILED_DB_CLASSES else self.applicants
+        )
+        self.assertEqual((None, None), db.get_with_stored_at(applicants[0].refnr))
+
+        before: float = time.time()
+        db.upsert_many(applicants[:2])
+        applicant, stored_at = db.get_with_stored_at(applicants[0].refnr)
+        self.assertEqual(applicants[0], applicant)
+        self.assertGreaterEqual(stored_at, before)
+
+        db.upsert(applicants[0])
+        self.assertGreaterEqual(db.get_with_stored_at(applicants[0].refnr)[1], stored_at)
+        self.assertEqual(applicants[:2], db.get_by_refnrs([a.refnr for a in applicants[:2]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
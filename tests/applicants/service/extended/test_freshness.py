@@ -0,0 +1,83 @@
+from datetime import datetime
+import random
+import time
+from typing import List
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.schemas import (
+    BewerberDetail,
+    BewerberUebersicht,
+)
+from src.applicants.service.extended.freshness import DetailFreshnessPolicy
+from tests.utils.applicants import (
+    generate_applicant_detail_dict,
+    generate_applicant_dict,
+)
+
+
+class TestDetailFreshnessPolicy(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.policy = DetailFreshnessPolicy(max_age=60)
+        self.detail = BewerberDetail(**generate_applicant_detail_dict(rng, 0))
+        self.searched_applicant = BewerberUebersicht(
+            **{**generate_applicant_dict(rng, 0), "refnr": self.detail.refnr}
+        )
+
+    def test_max_age(self):
+        self.assertTrue(self.policy.is_fresh(self.detail, time.time() - 30))
+        self.assertFalse(self.policy.is_fresh(self.detail, time.time() - 90))
+        self.assertFalse(self.policy.is_fresh(self.detail, None))
+        self.assertFalse(self.policy.is_fresh(None, time.time()))
+
+    def test_disabled(self):
+        self.assertFalse(DetailFreshnessPolicy(max_age=0).is_fresh(self.detail, time.time()))
+
+    def test_later_update(self):
+        stored_at: float = time.time()
+        updated: datetime = self.detail.aktualisierungsdatum
+        self.assertTrue(self.policy.is_fresh(self.detail, stored_at, updated))
+        self.assertFalse(
+            self.policy.is_fresh(
+                self.detail, stored_at, updated.replace(year=updated.year + 1)
+            )
+        )
+
+    def test_latest_update(self):
+        refnr = self.detail.refnr
+        self.assertIsNone(self.policy.latest_update(refnr))
+        self.assertEqual(
+            self.searched_applicant.aktualisierungsdatum,
+            self.policy.latest_update(refnr, self.searched_applicant),
+        )
+        later: datetime = self.searched_applicant.aktualisierungsdatum.replace(
+            year=2030
+        )
+        self.policy.see(
+            [self.searched_applicant.model_copy(update={"aktualisierungsdatum": later})]
+        )
+        self.assertEqual(later, self.policy.latest_update(refnr))
+        self.assertEqual(later, self.policy.latest_update(refnr, self.searched_applicant))
+
+    def test_max_updates(self):
+        rng = random.Random(1)
+        applicants: List[BewerberUebersicht] = [
+            BewerberUebersicht(**generate_applicant_dict(rng, idx)) for idx in range(5)
+        ]
+        self.policy.max_updates = 3
+        self.policy.see(applicants)
+        self.assertEqual(
+            [applicant.refnr for applicant in applicants[2:]],
+            list(self.policy.updates.keys()),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+import random
+import tempfile
+from typing import List
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[4]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.schemas import BewerberUebersicht
+from src.applicants.schemas.extended.request import FetchParameters
+from src.applicants.service.extended.db import SearchedApplicantsDb
+from src.applicants.service.extended.sync import (
+    SyncState,
+    SyncStateDb,
+    SyncStatus,
+    compare_with_stored,
+    latest_update,
+    saved_search_key,
+)
+from tests.utils.applicants import generate_applicant_dict
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        rng = random.Random(0)
+        self.applicants: List[BewerberUebersicht] = [
+            BewerberUebersicht(**generate_applicant_dict(rng, idx)) for idx in range(3)
+        ]
+
+    def test_saved_search_key(self):
+        self.assertEqual(
+            saved_search_key(FetchParameters(searchKeyword="Lehrer")),
+            saved_search_key(
+                FetchParameters(searchKeyword="Lehrer", pages_count=5, size=100)
+            ),
+        )
+        self.assertNotEqual(
+            saved_search_key(FetchParameters(searchKeyword="Lehrer")),
+            saved_search_key(FetchParameters(searchKeyword="Manager")),
+        )
+
+    def test_compare_with_stored(self):
+        db = SearchedApplicantsDb(f"{self.temp_dir.name}/applicants.json")
+        self.addCleanup(db.close)
+        db.upsert_many(self.applicants[:2])
+        changed: BewerberUebersicht = self.applicants[1].model_copy(
+            update={"aktualisierungsdatum": datetime(2030, 1, 1)}
+        )
+        self.assertEqual(
+            [SyncStatus.UNCHANGED, SyncStatus.CHANGED, SyncStatus.NEW],
+            compare_with_stored(db, [self.applicants[0], changed, self.applicants[2]]),
+        )
+
+    def test_latest_update(self):
+        dates: List[datetime] = [
+            applicant.aktualisierungsdatum for applicant in self.applicants
+        ]
+        self.assertIsNone(latest_update(None, []))
+        self.assertEqual(max(dates), latest_update(None, self.applicants))
+        self.assertEqual(
+            datetime(2031, 1, 1), latest_update(datetime(2031, 1, 1), self.applicants)
+        )
+
+    def test_sync_state_db(self):
+        path: Path = Path(self.temp_dir.name) / "db" / "sync_state.json"
+        sync_state_db = SyncStateDb(path)
+        self.assertIsNone(sync_state_db.get("search"))
+        state = SyncState(
+            watermark=datetime(2024, 5, 1, 10), synced_at=datetime.now(timezone.utc)
+        )
+        sync_state_db.put("search", state)
+        sync_state_db.put("search", state._replace(watermark=None))
+        sync_state_db.close()
+
+        sync_state_db = SyncStateDb(path)
+        self.addCleanup(sync_state_db.close)
+        self.assertEqual(state._replace(watermark=None), sync_state_db.get("search"))
+        self.assertEqual(1, len(sync_state_db.db))
+
+
+if __name__ == "__main__":
+    unittest.main()
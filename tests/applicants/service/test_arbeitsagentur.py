@@ -0,0 +1,309 @@
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+from typing import Dict, List, Text, Tuple
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.arbeitsagentur import (
+    ApplicantApi,
+    AsyncApplicantApi,
+    create_session,
+)
+from src.applicants.service.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from src.applicants.service.http_cache import HttpResponseCache
+from src.applicants.service.rate_limiter import AdaptiveRateLimiter
+
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.request_headers.append(dict(self.headers))
+        response = self.server.responses.pop(0) if self.server.responses else (200, {})
+        status, body = response[:2]
+        headers: Dict[Text, Text] = response[2] if len(response) > 2 else {}
+        content: bytes = json.dumps(body).encode("utf-8") if status != 304 else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_api() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApiHandler)
+    server.connections = 0
+    server.requests = []
+    server.request_headers = []
+    server.responses: List[Tuple[int, Dict]] = []
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    ).start()
+    return server
+
+
+def stop_fake_api(server: ThreadingHTTPServer) -> None:
+    server.shutdown()
+    server.server_close()
+
+
+def local_api_class(api_class, server: ThreadingHTTPServer):
+    base_url: Text = f"http://127.0.0.1:{server.server_port}"
+
+    class LocalApi(api_class):
+        api_search_url = f"{base_url}/bewerber"
+        api_detail_url = f"{base_url}/bewerberdetails"
+
+    return LocalApi
+
+
+class TestApplicantApi(unittest.TestCase):
+    def setUp(self):
+        self.server = start_fake_api()
+        self.api = local_api_class(ApplicantApi, self.server)(
+            create_session(max_retries=2, backoff_factor=0, backoff_jitter=0),
+            rate_limiter=AdaptiveRateLimiter(rate=1000, burst=1000),
+            circuit_breaker=CircuitBreaker(min_calls=4, open_duration=60),
+            max_retries=2,
+            backoff_factor=0,
+            backoff_jitter=0,
+        )
+
+    def tearDown(self):
+        self.api.close()
+        stop_fake_api(self.server)
+
+    def test_keep_alive(self):
+        for applicant_id in ["1", "2", "3"]:
+            self.server.responses.append((200, {"refnr": applicant_id}))
+            self.assertEqual({"refnr": applicant_id}, self.api.get_applicant(applicant_id))
+        self.assertEqual(1, self.server.connections)
+
+    def test_retry(self):
+        self.server.responses = [(503, {}), (429, {}), (200, {"bewerber": []})]
+        self.assertEqual({"bewerber": []}, self.api.search_applicants())
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_retries_exhausted(self):
+        self.server.responses = [(503, {"messages": [str(i)]}) for i in range(4)]
+        self.assertEqual({"messages": ["2"]}, self.api.get_applicant("1"))
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_no_retry_on_client_error(self):
+        self.server.responses = [(404, {"messages": ["not found"]})]
+        self.assertEqual({"messages": ["not found"]}, self.api.get_applicant("1"))
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_retry_after(self):
+        self.server.responses = [(503, {}, {"Retry-After": "0"}), (200, {"refnr": "1"})]
+        self.assertEqual({"refnr": "1"}, self.api.get_applicant("1"))
+        self.assertEqual(2, len(self.server.requests))
+
+    def test_no_retry_after_long_retry_after(self):
+        self.server.responses = [
+            (503, {"messages": ["unavailable"]}, {"Retry-After": "3600"}),
+            (200, {"refnr": "1"}),
+        ]
+        self.assertEqual({"messages": ["unavailable"]}, self.api.get_applicant("1"))
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_retry_delay(self):
+        self.api.max_retry_delay = 10
+        self.assertEqual(5, self.api.get_retry_delay(0, 429, 5))
+        self.assertEqual(10, self.api.get_retry_delay(0, 429, 10))
+        self.assertIsNone(self.api.get_retry_delay(0, 429, 11))
+        self.assertIsNone(self.api.get_retry_delay(0, 404, 5))
+        self.assertIsNone(self.api.get_retry_delay(2, 429, 5))
+        self.api.backoff_factor = 8
+        self.assertEqual(8, self.api.get_retry_delay(0, 503, None))
+        self.assertEqual(10, self.api.get_retry_delay(1, 503, None))
+
+    def test_circuit_breaker(self):
+        self.server.responses = [(500, {}) for _ in range(4)]
+        self.api.get_applicant("1")
+        with self.assertRaises(CircuitOpenError):
+            self.api.get_applicant("2")
+        self.assertEqual(CircuitState.OPEN, self.api.circuit_breaker.state)
+        self.assertEqual(4, len(self.server.requests))
+
+
+class TestAsyncApplicantApi(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server = start_fake_api()
+        self.api = local_api_class(AsyncApplicantApi, self.server)(
+            rate_limiter=AdaptiveRateLimiter(rate=1000, burst=1000),
+            circuit_breaker=CircuitBreaker(min_calls=4, open_duration=60),
+            max_retries=2,
+            backoff_factor=0,
+            backoff_jitter=0,
+        )
+
+    async def asyncTearDown(self):
+        await self.api.aclose()
+        stop_fake_api(self.server)
+
+    async def test_keep_alive(self):
+        for applicant_id in ["1", "2", "3"]:
+            self.server.responses.append((200, {"refnr": applicant_id}))
+            self.assertEqual(
+                {"refnr": applicant_id}, await self.api.get_applicant(applicant_id)
+            )
+        self.assertEqual(1, self.server.connections)
+
+    async def test_aclose_closes_clients_of_all_loops(self):
+        other_loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=other_loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(other_loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(other_loop.call_soon_threadsafe, other_loop.stop)
+
+        self.server.responses = [(200, {"refnr": "1"}), (200, {"refnr": "2"})]
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        self.assertEqual(
+            {"refnr": "2"},
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self.api.get_applicant("2"), other_loop)
+            ),
+        )
+        clients = list(self.api.loop_clients.values())
+        self.assertEqual(2, len(clients))
+
+        await self.api.aclose()
+        self.assertEqual(0, len(self.api.loop_clients))
+        for client in clients:
+            self.assertTrue(client.is_closed)
+
+    async def test_clients_of_closed_loops_are_dropped(self):
+        self.server.responses = [(200, {"refnr": "1"}), (200, {"refnr": "2"})]
+        thread = threading.Thread(
+            target=asyncio.run, args=(self.api.get_applicant("1"),)
+        )
+        thread.start()
+        thread.join()
+        self.assertEqual(1, len(self.api.loop_clients))
+
+        self.assertEqual({"refnr": "2"}, await self.api.get_applicant("2"))
+        self.assertEqual(
+            [asyncio.get_running_loop()], list(self.api.loop_clients.keys())
+        )
+
+    async def test_search_params(self):
+        self.server.responses = [(200, {"bewerber": []})]
+        self.assertEqual({"bewerber": []}, await self.api.search_applicants())
+        self.assertEqual(["/bewerber"], self.server.requests)
+
+    async def test_retry(self):
+        self.server.responses = [(503, {}), (429, {}), (200, {"bewerber": []})]
+        self.assertEqual({"bewerber": []}, await self.api.search_applicants())
+        self.assertEqual(3, len(self.server.requests))
+
+    async def test_retries_exhausted(self):
+        self.server.responses = [(503, {"messages": [str(i)]}) for i in range(4)]
+        self.assertEqual({"messages": ["2"]}, await self.api.get_applicant("1"))
+        self.assertEqual(3, len(self.server.requests))
+
+    async def test_rate_limiter(self):
+        self.server.responses = [(429, {}), (200, {"refnr": "1"}), (200, {"refnr": "2"})]
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        self.assertEqual({"refnr": "2"}, await self.api.get_applicant("2"))
+        statistics = self.api.rate_limiter.statistics()
+        self.assertEqual(3, statistics["requests"])
+        self.assertEqual(1, statistics["throttled"])
+        self.assertEqual(0, statistics["inFlight"])
+
+    async def test_response_cache(self):
+        self.api.response_cache = HttpResponseCache(":memory:")
+        self.server.responses = [(200, {"refnr": "1"}), (404, {"messages": ["x"]})]
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        self.assertEqual({"messages": ["x"]}, await self.api.get_applicant("2"))
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual(1, self.api.response_cache.statistics()["hits"])
+
+    async def test_response_cache_revalidation(self):
+        self.api.response_cache = HttpResponseCache(":memory:")
+        # The entries expire right away, so every request revalidates them
+        self.api.detail_ttl = 0.001
+        self.server.responses = [
+            (200, {"refnr": "1"}, {"ETag": '"v1"'}),
+            (304, {}),
+            (200, {"refnr": "1", "changed": True}, {"ETag": '"v2"'}),
+        ]
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        await asyncio.sleep(0.01)
+        self.assertEqual({"refnr": "1"}, await self.api.get_applicant("1"))
+        self.assertEqual('"v1"', self.server.request_headers[1].get("If-None-Match"))
+        self.assertEqual(1, self.api.response_cache.statistics()["revalidations"])
+        await asyncio.sleep(0.01)
+        self.assertEqual(
+            {"refnr": "1", "changed": True}, await self.api.get_applicant("1")
+        )
+        self.assertEqual(3, len(self.server.requests))
+
+    async def test_revalidate(self):
+        self.api.response_cache = HttpResponseCache(":memory:")
+        self.server.responses = [
+            (200, {"bewerber": []}, {"ETag": '"v1"'}),
+            (304, {}),
+        ]
+        self.assertEqual({"bewerber": []}, await self.api.search_applicants())
+        self.assertEqual({"bewerber": []}, await self.api.search_applicants())
+        self.assertEqual(
+            {"bewerber": []}, await self.api.search_applicants(revalidate=True)
+        )
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual('"v1"', self.server.request_headers[1].get("If-None-Match"))
+
+    async def test_no_retry_after_long_retry_after(self):
+        self.server.responses = [
+            (429, {"messages": ["throttled"]}, {"Retry-After": "3600"}),
+            (200, {"refnr": "1"}),
+        ]
+        self.assertEqual({"messages": ["throttled"]}, await self.api.get_applicant("1"))
+        self.assertEqual(1, len(self.server.requests))
+
+    async def test_no_retry_on_client_error(self):
+        self.server.responses = [(404, {"messages": ["not found"]})]
+        self.assertEqual({"messages": ["not found"]}, await self.api.get_applicant("1"))
+        self.assertEqual(1, len(self.server.requests))
+
+    async def test_single_flight(self):
+        results = await asyncio.gather(
+            *[self.api.get_applicant(applicant_id) for applicant_id in "1112"]
+        )
+        self.assertEqual([{}] * 4, results)
+        self.assertEqual(
+            ["/bewerberdetails/1", "/bewerberdetails/2"], sorted(self.server.requests)
+        )
+        self.assertEqual(2, self.api.single_flight.coalesced)
+
+    async def test_circuit_breaker(self):
+        self.server.responses = [(503, {}) for _ in range(4)]
+        await self.api.get_applicant("1")
+        with self.assertRaises(CircuitOpenError):
+            await self.api.get_applicant("2")
+        self.assertEqual(4, len(self.server.requests))
+        self.assertEqual(1, self.api.circuit_breaker.statistics()["rejectedCalls"])
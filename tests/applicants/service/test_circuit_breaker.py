@@ -0,0 +1,138 @@
+from typing import Optional
+import unittest
+from unittest import mock
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.now: float = 1000
+        patcher = mock.patch(
+            "src.applicants.service.circuit_breaker.time.monotonic",
+            side_effect=lambda: self.now,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.circuit_breaker = CircuitBreaker(
+            window=60,
+            min_calls=4,
+            error_rate=0.5,
+            slow_call_duration=10,
+            slow_call_rate=0.75,
+            open_duration=30,
+            half_open_calls=2,
+        )
+
+    def call(self, failed: Optional[bool] = False, duration: float = 1) -> None:
+        started_at: float = self.circuit_breaker.before_call()
+        self.now += duration
+        self.circuit_breaker.record(started_at, failed)
+
+    def open(self) -> None:
+        for _ in range(4):
+            self.call(True)
+        self.assertEqual(CircuitState.OPEN, self.circuit_breaker.state)
+
+    @parameterized.expand(
+        [
+            ("errors", [True, False, True, False], True),
+            ("few_errors", [True, False, False, False], False),
+            ("too_few_calls", [True, True, True], False),
+        ]
+    )
+    def test_error_rate(self, _, failures, opens: bool):
+        for failed in failures:
+            self.call(failed)
+        self.assertEqual(
+            CircuitState.OPEN if opens else CircuitState.CLOSED,
+            self.circuit_breaker.state,
+        )
+
+    def test_slow_calls(self):
+        for duration in [20, 20, 1]:
+            self.call(duration=duration)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.state)
+        self.call(duration=20)
+        self.assertEqual(CircuitState.OPEN, self.circuit_breaker.state)
+
+    def test_window(self):
+        for _ in range(3):
+            self.call(True)
+        self.now += 120
+        self.call(True)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.state)
+        self.assertEqual(1, self.circuit_breaker.statistics()["failedCalls"])
+
+    def test_open_fails_fast(self):
+        self.open()
+        self.now += 10
+        with self.assertRaises(CircuitOpenError) as context:
+            self.circuit_breaker.before_call()
+        self.assertAlmostEqual(20, context.exception.retry_after)
+        self.assertEqual(1, self.circuit_breaker.statistics()["rejectedCalls"])
+
+    def test_current_state(self):
+        self.open()
+        self.now += 29
+        self.assertEqual(CircuitState.OPEN, self.circuit_breaker.current_state())
+        self.now += 1
+        self.assertEqual(CircuitState.HALF_OPEN, self.circuit_breaker.current_state())
+        self.assertEqual("half_open", self.circuit_breaker.statistics()["state"])
+        self.call(False)
+        self.call(False)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.current_state())
+
+    def test_half_open_closes(self):
+        self.open()
+        self.now += 30
+        first: float = self.circuit_breaker.before_call()
+        second: float = self.circuit_breaker.before_call()
+        self.assertEqual(CircuitState.HALF_OPEN, self.circuit_breaker.state)
+        with self.assertRaises(CircuitOpenError):
+            self.circuit_breaker.before_call()
+        self.circuit_breaker.record(first, False)
+        self.circuit_breaker.record(second, False)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.state)
+        self.call(True)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.state)
+
+    def test_half_open_reopens(self):
+        self.open()
+        self.now += 30
+        self.call(False)
+        self.call(True)
+        self.assertEqual(CircuitState.OPEN, self.circuit_breaker.state)
+        self.assertEqual(2, self.circuit_breaker.statistics()["openings"])
+
+    def test_cancelled_trial_call(self):
+        self.open()
+        self.now += 30
+        self.call(None)
+        self.call(False)
+        self.call(False)
+        self.assertEqual(CircuitState.CLOSED, self.circuit_breaker.state)
+
+    def test_calls_started_before_opening_are_ignored(self):
+        started_at: float = self.circuit_breaker.before_call()
+        self.open()
+        self.now += 30
+        self.circuit_breaker.before_call()
+        self.circuit_breaker.record(started_at, True)
+        self.assertEqual(CircuitState.HALF_OPEN, self.circuit_breaker.state)
+
+
+if __name__ == "__main__":
+    unittest.main()
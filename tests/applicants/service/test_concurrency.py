@@ -0,0 +1,76 @@
+import asyncio
+from contextlib import aclosing
+from typing import Awaitable, Callable, List
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.concurrency import gather_in_order
+
+
+class TestGatherInOrder(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.running: int = 0
+        self.max_running: int = 0
+        self.started: List[int] = []
+        self.cancelled: List[int] = []
+
+    def call(self, value: int, delay: float) -> Callable[[], Awaitable[int]]:
+        async def run() -> int:
+            self.started.append(value)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.cancelled.append(value)
+                raise
+            finally:
+                self.running -= 1
+            if value < 0:
+                raise ValueError(value)
+            return value
+
+        return run
+
+    async def test_order(self):
+        calls = [self.call(value, 0.01 * (5 - value)) for value in range(5)]
+        results: List[int] = [result async for result in gather_in_order(calls, 5)]
+        self.assertEqual([0, 1, 2, 3, 4], results)
+        self.assertEqual(5, self.max_running)
+
+    async def test_concurrency(self):
+        calls = [self.call(value, 0.01) for value in range(10)]
+        results: List[int] = [result async for result in gather_in_order(calls, 3)]
+        self.assertEqual(list(range(10)), results)
+        self.assertEqual(3, self.max_running)
+        self.assertEqual(list(range(10)), self.started)
+
+    async def test_cancel_on_break(self):
+        calls = [self.call(value, 0.01 if value < 2 else 1) for value in range(6)]
+        results: List[int] = []
+        pages = gather_in_order(calls, 4)
+        async with aclosing(pages):
+            async for result in pages:
+                results.append(result)
+                if result == 1:
+                    break
+        self.assertEqual([0, 1], results)
+        self.assertIn(2, self.cancelled)
+        self.assertEqual(sorted(set(self.started) - {0, 1}), sorted(self.cancelled))
+        self.assertEqual(0, self.running)
+
+    async def test_cancel_on_error(self):
+        calls = [self.call(-1, 0.01)] + [self.call(value, 1) for value in range(1, 4)]
+        with self.assertRaises(ValueError):
+            async with aclosing(gather_in_order(calls, 2)) as pages:
+                async for _ in pages:
+                    pass
+        self.assertIn(1, self.cancelled)
+        self.assertEqual(sorted(set(self.started) - {-1}), sorted(self.cancelled))
+        self.assertEqual(0, self.running)
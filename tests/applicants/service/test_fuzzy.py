@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor
+import random
+from typing import List, Set, Text
+import unittest
+from unittest import mock
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.fuzzy import (
+    SymmetricDeleteIndex,
+    levenshtein,
+    vocabulary,
+)
+from src.applicants.service import knowledge_base as knowledge_base_module
+from src.applicants.service.knowledge_base import CompetencesDb, LocationDb
+
+
+class TestLevenshtein(unittest.TestCase):
+    @parameterized.expand(
+        [
+            ("", "", 0),
+            ("abc", "abc", 0),
+            ("kitten", "sitting", 3),
+            ("münchen", "muenchen", 2),
+            ("projektmanagement", "projektmanagment", 1),
+        ]
+    )
+    def test_distance(self, first: Text, second: Text, distance: int):
+        self.assertEqual(distance, levenshtein(first, second, 5))
+        self.assertEqual(distance, levenshtein(second, first, 5))
+
+    def test_bounded(self):
+        self.assertEqual(2, levenshtein("kitten", "sitting", 1))
+        self.assertEqual(2, levenshtein("a", "abcdef", 1))
+
+
+class TestSymmetricDeleteIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = SymmetricDeleteIndex(vocabulary(CompetencesDb().get_all()))
+
+    def test_lookup_finds_all_close_words(self):
+        rng = random.Random(0)
+        words: List[Text] = list(self.index.word_counts.keys())
+        for _ in range(100):
+            characters: List[Text] = list(rng.choice(words))
+            for _ in range(rng.randint(1, 2)):
+                position: int = rng.randrange(len(characters))
+                operation: float = rng.random()
+                if operation < 0.33:
+                    characters.insert(position, "x")
+                elif operation < 0.66 and len(characters) > 1:
+                    del characters[position]
+                else:
+                    characters[position] = "q"
+            misspelled: Text = "".join(characters)
+
+            expected: Set[Text] = {
+                word for word in words if levenshtein(misspelled, word, 2) <= 2
+            }
+            self.assertEqual(
+                expected, {word for word, _ in self.index.lookup(misspelled, 2)}
+            )
+
+    @parameterized.expand(
+        [
+            ("projektmanagment", "projektmanagement"),
+            ("programmirsprache", "programmiersprache"),
+            ("projektmanagement", "projektmanagement"),
+            ("abc", "abc"),
+            ("xyzxyzxyz", "xyzxyzxyz"),
+        ]
+    )
+    def test_correct_word(self, word: Text, correction: Text):
+        self.assertEqual(correction, self.index.correct_word(word))
+
+    def test_umlaut_transliteration(self):
+        index = SymmetricDeleteIndex(vocabulary(LocationDb().get_all()))
+        self.assertEqual("münchen", index.correct_word("muenchen"))
+        self.assertEqual(
+            "stellen in münchen und köln",
+            index.correct_text("Stellen in Muenchen und Koeln"),
+        )
+
+
+class TestKnowledgeBaseFuzzy(unittest.TestCase):
+    def test_get_fuzzy(self):
+        knowledge_base = CompetencesDb()
+        text: Text = "Erfahrung im Projektmanagment"
+        self.assertNotIn(
+            "Projektmanagement",
+            knowledge_base.get(lambda item: item.lower() in text.lower()),
+        )
+        self.assertIn("Projektmanagement", knowledge_base.get_fuzzy(text))
+
+    def test_get_fuzzy_contains_exact_matches(self):
+        knowledge_base = LocationDb()
+        text: Text = "Stellen in Berlin und Muenchen"
+        exact: List[Text] = knowledge_base.get(
+            lambda item: item.lower() in text.lower()
+        )
+        fuzzy: List[Text] = knowledge_base.get_fuzzy(text)
+        self.assertTrue(set(exact) < set(fuzzy))
+        self.assertIn("München", fuzzy)
+
+    def test_index_is_built_once_by_concurrent_lookups(self):
+        knowledge_base = CompetencesDb()
+        text: Text = "Erfahrung im Projektmanagment"
+        with mock.patch.object(
+            knowledge_base_module,
+            "SymmetricDeleteIndex",
+            wraps=knowledge_base_module.SymmetricDeleteIndex,
+        ) as index_class, ThreadPoolExecutor(4) as executor:
+            results: List[List[Text]] = list(
+                executor.map(knowledge_base.get_fuzzy, [text] * 8)
+            )
+        self.assertEqual(1, index_class.call_count)
+        for result in results:
+            self.assertIn("Projektmanagement", result)
+
+
+if __name__ == "__main__":
+    unittest.main()
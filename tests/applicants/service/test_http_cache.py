@@ -0,0 +1,76 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.http_cache import HttpResponseCache, response_cache_key
+
+
+class TestResponseCacheKey(unittest.TestCase):
+    def test_normalized(self):
+        self.assertEqual(
+            response_cache_key("https://api/bewerber", {"was": "Koch", "page": 1}),
+            response_cache_key(
+                "https://api/bewerber", {"page": "1", "wo": None, "was": "Koch"}
+            ),
+        )
+        self.assertEqual("https://api/bewerber", response_cache_key("https://api/bewerber", {}))
+        self.assertNotEqual(
+            response_cache_key("https://api/bewerber", {"page": 1}),
+            response_cache_key("https://api/bewerber", {"page": 2}),
+        )
+
+
+class TestHttpResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path: Path = Path(self.directory.name) / "cache" / "responses.db"
+        self.cache = HttpResponseCache(self.path, max_entries=3)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_ttl(self):
+        self.cache.put("fresh", b'{"a": 1}', ttl=60, etag='"1"')
+        self.cache.put("stale", b'{"b": 2}', ttl=0.001, last_modified="yesterday")
+        self.cache.put("uncached", b"{}", ttl=0)
+        time.sleep(0.01)
+
+        fresh = self.cache.get("fresh")
+        self.assertTrue(fresh.is_fresh())
+        self.assertEqual({"a": 1}, fresh.json())
+        self.assertEqual({"If-None-Match": '"1"'}, fresh.validators())
+
+        stale = self.cache.get("stale")
+        self.assertFalse(stale.is_fresh())
+        self.assertEqual({"If-Modified-Since": "yesterday"}, stale.validators())
+        self.cache.refresh("stale", 60)
+        self.assertTrue(self.cache.get("stale").is_fresh())
+
+        self.assertIsNone(self.cache.get("uncached"))
+
+    def test_lru_eviction(self):
+        self.cache.eviction_interval = 1
+        for key in ["a", "b", "c"]:
+            self.cache.put(key, b"{}", ttl=60)
+            time.sleep(0.002)
+        self.cache.get("a")
+        time.sleep(0.002)
+        self.cache.put("d", b"{}", ttl=60)
+        self.assertIsNone(self.cache.get("b"))
+        for key in ["a", "c", "d"]:
+            self.assertIsNotNone(self.cache.get(key))
+        self.assertEqual(3, self.cache.statistics()["size"])
+
+    def test_shared_file(self):
+        self.cache.put("a", b'{"a": 1}', ttl=60)
+        other_cache = HttpResponseCache(self.path, max_entries=3)
+        self.assertEqual({"a": 1}, other_cache.get("a").json())
+        other_cache.close()
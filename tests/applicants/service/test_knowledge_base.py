@@ -0,0 +1,47 @@
+from typing import List, Text
+import unittest
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.knowledge_base import KNOWLEDGE_BASES, KnowledgeBaseDb
+
+
+PREFIXES: List[List[Text]] = [
+    [category, prefix]
+    for category in KNOWLEDGE_BASES.keys()
+    for prefix in ["", "a", "B", "ber", "Mü", "helfer/in - ", "englisch (", "zzz"]
+]
+
+
+class TestAutocomplete(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.knowledge_bases = {
+            category: knowledge_base_class()
+            for category, knowledge_base_class in KNOWLEDGE_BASES.items()
+        }
+
+    @parameterized.expand(PREFIXES)
+    def test_same_as_scan(self, category: Text, prefix: Text):
+        knowledge_base: KnowledgeBaseDb = self.knowledge_bases[category]
+        expected: List[Text] = sorted(
+            set(
+                item
+                for item in knowledge_base.get_all()
+                if item.casefold().startswith(prefix.casefold())
+            ),
+            key=lambda item: (item.casefold(), item),
+        )
+        self.assertEqual(expected[:10], knowledge_base.autocomplete(prefix))
+        self.assertEqual(expected, knowledge_base.autocomplete(prefix, len(expected) + 1))
+
+    def test_limit(self):
+        knowledge_base: KnowledgeBaseDb = self.knowledge_bases["location"]
+        self.assertEqual(3, len(knowledge_base.autocomplete("", 3)))
+        self.assertEqual([], knowledge_base.autocomplete("m", 0))
@@ -0,0 +1,101 @@
+import threading
+from typing import Dict, List, Text
+import unittest
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.extended.query import build_knowledge_search_query
+from src.applicants.service.knowledge_base import KnowledgeBaseDb
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    KnowledgeMatcherPool,
+    create_knowledge_matcher,
+)
+
+
+JOB_DESCRIPTIONS: List[Text] = [
+    "",
+    "Helfer/in - Reinigung",
+    "Wir suchen eine Fachkraft für Lagerlogistik in BERLIN mit Fahrerlaubnis B.",
+    "Softwareentwickler (m/w/d) in München, sehr gute Englisch- und Deutschkenntnisse, "
+    "Erfahrung mit Kundenberatung, -betreuung und Projektmanagement",
+    "Pflegefachkraft für die Altenpflege in Köln, Hamburg oder Düsseldorf gesucht",
+]
+
+
+class StaticKnowledgeBaseDb(KnowledgeBaseDb):
+    def __init__(self, items: List[Text]):
+        self.db: List[Text] = items
+        self.fuzzy_index = None
+        self.fuzzy_lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        return False
+
+
+class TestKnowledgeMatcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher: KnowledgeMatcher = create_knowledge_matcher()
+
+    @parameterized.expand(JOB_DESCRIPTIONS)
+    def test_same_as_query(self, job_description: Text):
+        query = build_knowledge_search_query(job_description)
+        expected: Dict[Text, List[Text]] = {
+            category: knowledge_base.get(query)
+            for category, knowledge_base in self.matcher.knowledge_bases.items()
+        }
+        self.assertEqual(expected, self.matcher.match(job_description))
+
+    def test_overlapping_terms(self):
+        matcher = KnowledgeMatcher(
+            {
+                "first": StaticKnowledgeBaseDb(["he", "she", "his", "hers", "HE"]),
+                "second": StaticKnowledgeBaseDb(["her", "s", "x"]),
+            }
+        )
+        self.assertEqual(
+            {"first": ["he", "she", "hers", "HE"], "second": ["her", "s"]},
+            matcher.match("usHErs"),
+        )
+
+    def test_fuzzy(self):
+        job_description: Text = "Projektmanagment und Programmirsprache in Muenchen"
+        exact: Dict[Text, List[Text]] = self.matcher.match(job_description)
+        fuzzy: Dict[Text, List[Text]] = self.matcher.match(job_description, fuzzy=True)
+        self.assertNotIn("München", exact["location"])
+        self.assertIn("München", fuzzy["location"])
+        self.assertNotIn("Projektmanagement", exact["competences"])
+        self.assertIn("Projektmanagement", fuzzy["competences"])
+        for category, terms in exact.items():
+            self.assertTrue(set(terms) <= set(fuzzy[category]))
+
+    def test_empty_term(self):
+        matcher = KnowledgeMatcher({"first": StaticKnowledgeBaseDb(["", "a"])})
+        self.assertEqual({"first": [""]}, matcher.match("bcd"))
+
+
+class TestKnowledgeMatcherPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.matcher: KnowledgeMatcher = create_knowledge_matcher()
+
+    @parameterized.expand([(0, 1), (2, 1000), (2, 1)])
+    def test_same_as_matcher(self, processes: int, min_batch_size: int):
+        pool = KnowledgeMatcherPool(processes, min_batch_size, chunk_size=3)
+        self.addCleanup(pool.close)
+        texts: List[Text] = JOB_DESCRIPTIONS * 3
+        self.assertEqual(
+            [self.matcher.match(text) for text in texts],
+            pool.match_many(self.matcher, texts),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+from typing import Dict, List, Text
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.knowledge_base import KNOWLEDGE_BASES, KnowledgeBaseDb
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    build_knowledge_snapshot,
+)
+from src.applicants.service.knowledge_snapshot import (
+    KnowledgeSnapshot,
+    open_knowledge_snapshot,
+)
+
+
+KNOWLEDGE_BASE_DIRECTORY: Path = PROJECT_PATH / "data" / "knowledge_base"
+
+JOB_DESCRIPTIONS: List[Text] = [
+    "",
+    "Helfer/in - Reinigung",
+    "Wir suchen eine Fachkraft für Lagerlogistik in BERLIN mit Fahrerlaubnis B.",
+    "Softwareentwickler (m/w/d) in Muenchen, sehr gute Englisch- und Deutschkenntnisse, "
+    "Erfahrung mit Kundenberatung, -betreuung und Projektmanagment",
+]
+
+
+class TestKnowledgeSnapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.knowledge_base_directory: Path = Path(cls.directory.name) / "knowledge_base"
+        shutil.copytree(KNOWLEDGE_BASE_DIRECTORY, cls.knowledge_base_directory)
+        cls.snapshot_path: Path = Path(cls.directory.name) / "knowledge_base.snapshot"
+        build_knowledge_snapshot(cls.snapshot_path, cls.knowledge_base_directory)
+
+        cls.knowledge_bases: Dict[Text, KnowledgeBaseDb] = {
+            category: knowledge_base_class(
+                cls.knowledge_base_directory / f"{category}.json"
+            )
+            for category, knowledge_base_class in KNOWLEDGE_BASES.items()
+        }
+        cls.snapshot: KnowledgeSnapshot = cls.open_snapshot()
+        cls.snapshot_knowledge_bases: Dict[Text, KnowledgeBaseDb] = {
+            category: knowledge_base_class(
+                cls.knowledge_base_directory / f"{category}.json", cls.snapshot
+            )
+            for category, knowledge_base_class in KNOWLEDGE_BASES.items()
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    @classmethod
+    def open_snapshot(cls):
+        return open_knowledge_snapshot(cls.snapshot_path, cls.knowledge_base_directory)
+
+    @parameterized.expand(KNOWLEDGE_BASES.keys())
+    def test_knowledge_base(self, category: Text):
+        knowledge_base: KnowledgeBaseDb = self.knowledge_bases[category]
+        snapshot_knowledge_base: KnowledgeBaseDb = self.snapshot_knowledge_bases[category]
+        self.assertEqual(knowledge_base.get_all(), snapshot_knowledge_base.get_all())
+        for prefix in ["", "a", "Mü", "helfer/in - "]:
+            self.assertEqual(
+                knowledge_base.autocomplete(prefix, 50),
+                snapshot_knowledge_base.autocomplete(prefix, 50),
+            )
+
+    @parameterized.expand([[job_description] for job_description in JOB_DESCRIPTIONS])
+    def test_matcher(self, job_description: Text):
+        matcher = KnowledgeMatcher(self.knowledge_bases)
+        snapshot_matcher = KnowledgeMatcher(self.snapshot_knowledge_bases, self.snapshot)
+        self.assertEqual(
+            matcher.match(job_description), snapshot_matcher.match(job_description)
+        )
+        self.assertEqual(
+            matcher.match(job_description, fuzzy=True),
+            snapshot_matcher.match(job_description, fuzzy=True),
+        )
+
+    def test_stale(self):
+        self.assertIsNotNone(self.open_snapshot())
+        source: Path = self.knowledge_base_directory / "skills.json"
+        content: bytes = source.read_bytes()
+        try:
+            source.write_bytes(content.replace(b"[", b"[\n", 1))
+            self.assertIsNone(self.open_snapshot())
+        finally:
+            source.write_bytes(content)
+        self.assertIsNotNone(self.open_snapshot())
+
+    def test_invalid(self):
+        self.assertIsNone(
+            open_knowledge_snapshot(
+                Path(self.directory.name) / "missing.snapshot",
+                self.knowledge_base_directory,
+            )
+        )
+        invalid_path: Path = Path(self.directory.name) / "invalid.snapshot"
+        invalid_path.write_bytes(b"not a snapshot")
+        self.assertIsNone(
+            open_knowledge_snapshot(invalid_path, self.knowledge_base_directory)
+        )
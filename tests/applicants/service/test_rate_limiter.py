@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from typing import List
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.rate_limiter import AdaptiveRateLimiter
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    def test_rate(self):
+        limiter = AdaptiveRateLimiter(rate=50, burst=5, concurrency=100, rate_increase=0)
+        start: float = time.monotonic()
+        for _ in range(15):
+            limiter.release(limiter.acquire())
+        # The burst is free, the 10 other requests wait 1 / rate each
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual(15, limiter.statistics()["requests"])
+
+    def test_concurrency(self):
+        limiter = AdaptiveRateLimiter(rate=1000, burst=1000, concurrency=3)
+        in_flight: List[int] = []
+
+        def request():
+            acquired_at: float = limiter.acquire()
+            in_flight.append(limiter.statistics()["inFlight"])
+            time.sleep(0.02)
+            limiter.release(acquired_at)
+
+        threads = [threading.Thread(target=request) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(3, max(in_flight))
+        self.assertEqual(0, limiter.statistics()["inFlight"])
+
+    def test_additive_increase(self):
+        limiter = AdaptiveRateLimiter(
+            rate=10, burst=1000, concurrency=2, max_concurrency=4, max_rate=11
+        )
+        for _ in range(100):
+            limiter.release(limiter.acquire(), 200)
+        statistics = limiter.statistics()
+        self.assertEqual(11, statistics["rate"])
+        self.assertEqual(4, statistics["concurrency"])
+
+    def test_multiplicative_decrease(self):
+        limiter = AdaptiveRateLimiter(rate=8, burst=1000, concurrency=8)
+        slots: List[float] = [limiter.acquire() for _ in range(4)]
+        # A burst of throttled requests sent at the same time cuts the limits once
+        for acquired_at in slots:
+            limiter.release(acquired_at, 429)
+        statistics = limiter.statistics()
+        self.assertEqual(4, statistics["rate"])
+        self.assertEqual(4, statistics["concurrency"])
+        self.assertEqual(4, statistics["throttled"])
+
+        limiter.release(limiter.acquire(), 503)
+        self.assertEqual(2, limiter.statistics()["rate"])
+        self.assertEqual(2, limiter.statistics()["concurrency"])
+
+    def test_bounds(self):
+        limiter = AdaptiveRateLimiter(
+            rate=1, burst=1000, min_rate=0.5, concurrency=1, min_concurrency=1
+        )
+        for _ in range(3):
+            limiter.release(limiter.acquire(), 429)
+        self.assertEqual(0.5, limiter.statistics()["rate"])
+        self.assertEqual(1, limiter.statistics()["concurrency"])
+
+    def test_errors_do_not_adapt(self):
+        limiter = AdaptiveRateLimiter(rate=8, burst=1000, concurrency=8)
+        limiter.release(limiter.acquire())
+        limiter.release(limiter.acquire(), 404)
+        limiter.release(limiter.acquire(), 500)
+        self.assertEqual(8, limiter.statistics()["rate"])
+        self.assertEqual(0, limiter.statistics()["inFlight"])
+
+    def test_retry_after(self):
+        limiter = AdaptiveRateLimiter(rate=1000, burst=1000)
+        limiter.release(limiter.acquire(), 429, retry_after=0.2)
+        start: float = time.monotonic()
+        asyncio.run(limiter.acquire_async())
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertEqual(1, limiter.statistics()["retryAfters"])
@@ -0,0 +1,204 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import tempfile
+import threading
+from functools import partial
+from typing import List, Text, Type
+import unittest
+from unittest import mock
+from pathlib import Path
+from parameterized import parameterized
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.schemas.arbeitsagentur.schemas import BewerberUebersicht
+from src.applicants.service.extended.db import ApplicantsDb, SearchedApplicantsDb
+from src.applicants.service.extended.sqlite_db import SqliteSearchedApplicantsDb
+from src.applicants.service import knowledge_snapshot, registry
+from src.applicants.service.knowledge_base import KNOWLEDGE_BASES
+from src.applicants.service.knowledge_matcher import (
+    KnowledgeMatcher,
+    build_knowledge_snapshot,
+)
+from src.applicants.service.knowledge_snapshot import KnowledgeSnapshotHandle
+from src.applicants.service.registry import (
+    KNOWLEDGE_MATCHER,
+    KNOWLEDGE_SNAPSHOT,
+    StoreRegistry,
+    knowledge_base_store_name,
+)
+from tests.utils.applicants import generate_applicant_dict
+
+
+DB_CLASSES: List[Type[ApplicantsDb]] = [SearchedApplicantsDb, SqliteSearchedApplicantsDb]
+
+
+class FakeStore:
+    def __init__(self, name: Text):
+        self.name = name
+        self.stale = False
+
+    def is_stale(self) -> bool:
+        return self.stale
+
+
+class TestStoreRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.registry = StoreRegistry()
+        self.addCleanup(self.registry.close_all)
+        rng = random.Random(42)
+        self.applicants: List[BewerberUebersicht] = [
+            BewerberUebersicht(**generate_applicant_dict(rng, idx)) for idx in range(3)
+        ]
+
+    def register_db(self, db_class: Type[ApplicantsDb]) -> Path:
+        path: Path = Path(self.temp_dir.name) / db_class.__name__
+        self.registry.register("applicants", lambda: db_class(path))
+        return path
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_store_is_shared(self, _, db_class: Type[ApplicantsDb]):
+        self.register_db(db_class)
+        db: ApplicantsDb = self.registry.get("applicants")
+        db.upsert(self.applicants[0])
+
+        self.assertIs(db, self.registry.get("applicants"))
+        self.assertIs(db, self.registry.get("applicants"))
+
+    @parameterized.expand([(db_class.__name__, db_class) for db_class in DB_CLASSES])
+    def test_store_is_reloaded_when_changed_by_someone_else(
+        self, _, db_class: Type[ApplicantsDb]
+    ):
+        path: Path = self.register_db(db_class)
+        db: ApplicantsDb = self.registry.get("applicants")
+        db.upsert(self.applicants[0])
+        self.assertIs(db, self.registry.get("applicants"))
+
+        other_db: ApplicantsDb = db_class(path)
+        other_db.upsert(self.applicants[1])
+        other_db.close()
+        if db_class is SearchedApplicantsDb:
+            # The mtime of both writes may fall into the same clock tick
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        reloaded_db: ApplicantsDb = self.registry.get("applicants")
+        self.assertIsNot(db, reloaded_db)
+        self.assertTrue(reloaded_db.contains(self.applicants[1].refnr))
+        self.assertIs(reloaded_db, self.registry.get("applicants"))
+        db.close()
+
+    def test_store_is_created_once_by_concurrent_requests(self):
+        created: List[FakeStore] = []
+        release = threading.Event()
+
+        def create() -> FakeStore:
+            release.wait(1)
+            created.append(FakeStore("slow"))
+            return created[-1]
+
+        self.registry.register("slow", create)
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(self.registry.get, "slow") for _ in range(4)]
+            release.set()
+            stores: List[FakeStore] = [future.result() for future in futures]
+
+        self.assertEqual(1, len(created))
+        self.assertEqual(created * 4, stores)
+
+    def test_rebuilding_a_store_does_not_block_other_stores(self):
+        calls: List[Text] = []
+        rebuilding = threading.Event()
+        release = threading.Event()
+
+        def create_slow() -> FakeStore:
+            calls.append("slow")
+            if len(calls) > 1:
+                rebuilding.set()
+                release.wait(5)
+            return FakeStore("slow")
+
+        self.registry.register("slow", create_slow)
+        self.registry.register("fast", lambda: FakeStore("fast"))
+        self.registry.get("slow").stale = True
+        with ThreadPoolExecutor(1) as executor:
+            future = executor.submit(self.registry.get, "slow")
+            self.assertTrue(rebuilding.wait(1))
+            self.assertEqual("fast", self.registry.get("fast").name)
+            self.assertFalse(future.done())
+            release.set()
+            self.assertEqual("slow", future.result().name)
+
+
+class TestKnowledgeStores(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.snapshot_path: Path = Path(cls.temp_dir.name) / "knowledge_base.snapshot"
+        build_knowledge_snapshot(cls.snapshot_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def setUp(self):
+        # The factories get the stores they share from the module's registry
+        self.registry = StoreRegistry()
+        patcher = mock.patch.object(registry, "store_registry", self.registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.registry.register(
+            KNOWLEDGE_SNAPSHOT, partial(KnowledgeSnapshotHandle, self.snapshot_path)
+        )
+        for category in KNOWLEDGE_BASES.keys():
+            self.registry.register(
+                knowledge_base_store_name(category),
+                partial(registry.create_shared_knowledge_base, category),
+            )
+        self.registry.register(KNOWLEDGE_MATCHER, registry.create_shared_knowledge_matcher)
+
+    def test_snapshot_is_opened_once(self):
+        with mock.patch.object(
+            knowledge_snapshot,
+            "sources_checksum",
+            wraps=knowledge_snapshot.sources_checksum,
+        ) as sources_checksum:
+            self.registry.open_all()
+        self.assertEqual(1, sources_checksum.call_count)
+
+        snapshot_handle: KnowledgeSnapshotHandle = self.registry.get(KNOWLEDGE_SNAPSHOT)
+        self.assertIsNotNone(snapshot_handle.snapshot)
+
+    def test_matcher_shares_the_knowledge_bases(self):
+        matcher: KnowledgeMatcher = self.registry.get(KNOWLEDGE_MATCHER)
+        for category in KNOWLEDGE_BASES.keys():
+            self.assertIs(
+                self.registry.get(knowledge_base_store_name(category)),
+                matcher.knowledge_bases[category],
+            )
+
+    def test_matcher_is_reloaded_with_the_knowledge_bases(self):
+        matcher: KnowledgeMatcher = self.registry.get(KNOWLEDGE_MATCHER)
+        skills_path: Path = matcher.knowledge_bases["skills"].path
+        stat = skills_path.stat()
+        try:
+            os.utime(skills_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            reloaded_matcher: KnowledgeMatcher = self.registry.get(KNOWLEDGE_MATCHER)
+            self.assertIsNot(matcher, reloaded_matcher)
+            self.assertIs(
+                self.registry.get(knowledge_base_store_name("skills")),
+                reloaded_matcher.knowledge_bases["skills"],
+            )
+        finally:
+            os.utime(skills_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+if __name__ == "__main__":
+    unittest.main()
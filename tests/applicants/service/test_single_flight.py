@@ -0,0 +1,136 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import List, Text
+import unittest
+from pathlib import Path
+
+
+PROJECT_PATH: Path = Path(__file__).parents[3]
+import sys
+
+sys.path.append(str(PROJECT_PATH))
+
+from src.applicants.service.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.calls: List[Text] = []
+        self.release = threading.Event()
+
+    def call(self, key: Text):
+        def run() -> Text:
+            self.calls.append(key)
+            self.release.wait(1)
+            if key == "error":
+                raise ValueError(key)
+            return key.upper()
+
+        return run
+
+    def run_concurrently(self, keys: List[Text]) -> List:
+        with ThreadPoolExecutor(len(keys)) as executor:
+            futures = [
+                executor.submit(self.single_flight.run, key, self.call(key))
+                for key in keys
+            ]
+            while len(self.calls) + self.single_flight.coalesced < len(keys):
+                threading.Event().wait(0.001)
+            self.release.set()
+            return [future.exception() or future.result() for future in futures]
+
+    def test_coalesce(self):
+        self.assertEqual(["A", "A", "A", "B"], self.run_concurrently(["a", "a", "a", "b"]))
+        self.assertEqual(["a", "b"], sorted(self.calls))
+        self.assertEqual(2, self.single_flight.coalesced)
+        self.assertEqual({}, self.single_flight.calls)
+
+    def test_exception(self):
+        errors = self.run_concurrently(["error", "error"])
+        self.assertEqual(1, len(self.calls))
+        for error in errors:
+            self.assertIsInstance(error, ValueError)
+
+    def test_sequential_calls(self):
+        self.release.set()
+        self.assertEqual("A", self.single_flight.run("a", self.call("a")))
+        self.assertEqual("A", self.single_flight.run("a", self.call("a")))
+        self.assertEqual(["a", "a"], self.calls)
+        self.assertEqual(0, self.single_flight.coalesced)
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.single_flight = AsyncSingleFlight()
+        self.calls: List[Text] = []
+
+    def call(self, key: Text):
+        async def run() -> Text:
+            self.calls.append(key)
+            await asyncio.sleep(0.01)
+            if key == "error":
+                raise ValueError(key)
+            return key.upper()
+
+        return run
+
+    async def test_coalesce(self):
+        results = await asyncio.gather(
+            *[self.single_flight.run(key, self.call(key)) for key in ["a", "a", "b"]]
+        )
+        self.assertEqual(["A", "A", "B"], results)
+        self.assertEqual(["a", "b"], self.calls)
+        self.assertEqual(1, self.single_flight.coalesced)
+        self.assertEqual({}, self.single_flight.calls)
+
+    async def test_exception(self):
+        results = await asyncio.gather(
+            *[self.single_flight.run("error", self.call("error")) for _ in range(2)],
+            return_exceptions=True,
+        )
+        self.assertEqual(1, len(self.calls))
+        for result in results:
+            self.assertIsInstance(result, ValueError)
+
+    async def test_cancelled_caller(self):
+        first = asyncio.create_task(self.single_flight.run("a", self.call("a")))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(self.single_flight.run("a", self.call("a")))
+        await asyncio.sleep(0)
+        first.cancel()
+        self.assertEqual("A", await second)
+        self.assertEqual(["a"], self.calls)
+
+    async def test_all_callers_cancelled(self):
+        cancelled: List[Text] = []
+
+        async def call() -> Text:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append("a")
+                raise
+            return "A"
+
+        callers = [
+            asyncio.create_task(self.single_flight.run("a", call)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        callers[0].cancel()
+        await asyncio.sleep(0)
+        self.assertEqual([], cancelled)
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        self.assertEqual(["a"], cancelled)
+        self.assertEqual({}, self.single_flight.calls)
+        self.assertEqual({}, self.single_flight.waiters)
+
+        # A new caller starts a new call instead of joining the cancelled one
+        self.assertEqual("A", await self.single_flight.run("a", self.call("a")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Text, Tuple
+
+from src.applicants.schemas.arbeitsagentur.enums import WorkingTime
+from src.applicants.schemas.extended.request import (
+    ExtendedDetailedSearchParameters,
+    ExtendedSearchParameters,
+)
+from src.applicants.service.extended.compiler import (
+    CompiledQuery,
+    DerivedFields,
+    compile_detailed_search_query,
+    compile_search_query,
+    derive_fields,
+)
+from src.applicants.service.extended.query import (
+    build_detailed_search_query,
+    build_search_query,
+)
+from src.applicants.service.registry import DETAILED_APPLICANTS_DB, SEARCHED_APPLICANTS_DB, store_registry
+from tests.utils.applicants import generate_applicant_detail_dict, generate_applicant_dict
+
+
+SEARCH_PARAMETERS: List[ExtendedSearchParameters] = [
+    ExtendedSearchParameters(keywords=["Ingenieur"]),
+    ExtendedSearchParameters(keywords=["Manager", "München"], location_keyword="München"),
+    ExtendedSearchParameters(max_graduation_year=2000, min_work_experience_years=5),
+    ExtendedSearchParameters(career_field="Informatik", working_time=WorkingTime.FULL_TIME),
+]
+
+DETAILED_SEARCH_PARAMETERS: List[ExtendedDetailedSearchParameters] = [
+    ExtendedDetailedSearchParameters(job_title="Softwareentwickler", location="Berlin"),
+    ExtendedDetailedSearchParameters(min_avg_job_position_years=2, min_work_experience_years=5),
+    ExtendedDetailedSearchParameters(max_sabbatical_time_years=1),
+    ExtendedDetailedSearchParameters(education_keyword="Universität", skills=["Python"], languages=["Englisch"]),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser("Compare the TinyDB queries with the compiled queries of the extended search")
+
+    parser.add_argument("--synthetic", type=int, help="Benchmark on this many generated applicants instead of the local DB", default=None)
+    parser.add_argument("--repeat", type=int, help="Number of runs per query", default=3)
+
+    return parser.parse_args()
+
+
+def safe_match(query: Callable[[Dict], Any], doc: Dict) -> bool:
+    # Some TinyDB queries raise on incomplete documents, which counts as no match
+    try:
+        return bool(query(doc))
+    except Exception:
+        return False
+
+
+def time_query(query: Callable[[Dict], Any], docs: List[Dict], repeat: int) -> Tuple[float, int]:
+    best_time: float = float("inf")
+    matches_count: int = 0
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        matches_count = sum(1 for doc in docs if safe_match(query, doc))
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, matches_count
+
+
+def time_precomputed_query(query: CompiledQuery, docs: List[Dict], derived_fields: List[DerivedFields], repeat: int) -> Tuple[float, int]:
+    # Like the stores, with the derived fields computed once at ingest time
+    best_time: float = float("inf")
+    matches_count: int = 0
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        matches_count = sum(
+            1 for doc, fields in zip(docs, derived_fields) if query.matches_derived(fields) and query.matches_doc(doc)
+        )
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time, matches_count
+
+
+def benchmark(name: Text, build: Callable, compile: Callable, parameters_list: List, docs: List[Dict], repeat: int):
+    print(f"{name} over {len(docs)} applicants")
+    derived_fields: List[DerivedFields] = [derive_fields(doc) for doc in docs]
+    for search_parameters in parameters_list:
+        tinydb_time, tinydb_count = time_query(build(search_parameters), docs, repeat)
+        compiled_time, compiled_count = time_query(compile(search_parameters), docs, repeat)
+        precomputed_time, precomputed_count = time_precomputed_query(compile(search_parameters), docs, derived_fields, repeat)
+        print(f"  {compile(search_parameters)}")
+        print(
+            f"    TinyDB query: {tinydb_time * 1000:.1f} ms ({tinydb_count} matches), "
+            f"compiled query: {compiled_time * 1000:.1f} ms ({compiled_count} matches), "
+            f"with derived fields: {precomputed_time * 1000:.1f} ms ({precomputed_count} matches), "
+            f"speedup: {tinydb_time / precomputed_time:.1f}x"
+        )
+
+
+def main():
+    args = parse_args()
+
+    if args.synthetic is not None:
+        rng = random.Random(0)
+        docs: List[Dict] = [generate_applicant_dict(rng, idx) for idx in range(args.synthetic)]
+        detailed_docs: List[Dict] = [generate_applicant_detail_dict(rng, idx) for idx in range(args.synthetic)]
+    else:
+        docs = list(store_registry.get(SEARCHED_APPLICANTS_DB)._iter_docs_())
+        detailed_docs = list(store_registry.get(DETAILED_APPLICANTS_DB)._iter_docs_())
+
+    benchmark("Search", build_search_query, compile_search_query, SEARCH_PARAMETERS, docs, args.repeat)
+    benchmark("Detailed search", build_detailed_search_query, compile_detailed_search_query, DETAILED_SEARCH_PARAMETERS, detailed_docs, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,8 @@ sys.path.append(str(PROJECT_PATH))
 
 print("PROJECT_PATH", PROJECT_PATH)
 
+from src.applicants.dependencies import get_api_circuit_breaker
+from src.applicants.service.circuit_breaker import CircuitBreaker
 from src.start import app
 
 
@@ -29,6 +31,32 @@ class TestHealthCheck(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content.decode(), "OK")
 
+    def test_readiness_circuit_open(self):
+        circuit_breaker = CircuitBreaker(min_calls=1)
+        circuit_breaker.record(circuit_breaker.before_call(), True)
+        app.dependency_overrides[get_api_circuit_breaker] = lambda: circuit_breaker
+        try:
+            response = self.client.get("/health/readiness")
+        finally:
+            app.dependency_overrides = {}
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.content.decode(), "OK\nArbeitsagentur API circuit: open"
+        )
+
+    def test_readiness_circuit_recovering(self):
+        circuit_breaker = CircuitBreaker(min_calls=1, open_duration=0)
+        circuit_breaker.record(circuit_breaker.before_call(), True)
+        app.dependency_overrides[get_api_circuit_breaker] = lambda: circuit_breaker
+        try:
+            response = self.client.get("/health/readiness")
+        finally:
+            app.dependency_overrides = {}
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.content.decode(), "OK\nArbeitsagentur API circuit: half_open"
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,124 @@
+import random
+from typing import Any, Dict, List, Optional, Text
+
+from tests.utils.values import LOCATIONS, SEARCH_KEYWORDS
+
+
+CAREER_FIELDS: List[Text] = [
+    "Informatik",
+    "Maschinenbau",
+    "Pflege",
+    "Vertrieb",
+    "Lehramt",
+]
+EDUCATIONS: List[Text] = ["Ausbildung", "Studium", "Meister", "Abitur"]
+WORKING_TIMES: List[Text] = ["Vollzeit", "Teilzeit", "Minijob", "Heim-/Telearbeit"]
+SKILLS: List[Text] = ["Python", "Java", "Teamfähigkeit", "SAP", "Buchhaltung"]
+LANGUAGES: List[Text] = ["Deutsch", "Englisch", "Französisch", "Spanisch"]
+
+
+def random_time_period(rng: random.Random) -> Text:
+    return f"P{rng.randint(0, 30)}Y{rng.randint(0, 11)}M{rng.randint(0, 29)}D"
+
+
+def random_date(rng: random.Random, min_year: int = 1980) -> Text:
+    return f"{rng.randint(min_year, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def maybe(rng: random.Random, value: Any, probability: float = 0.8) -> Optional[Any]:
+    return value if rng.random() < probability else None
+
+
+def generate_applicant_dict(rng: random.Random, idx: int) -> Dict[Text, Any]:
+    """Generates a stored BewerberUebersicht document with random content."""
+    keyword: Text = rng.choice(SEARCH_KEYWORDS)
+    return {
+        "refnr": f"10000-{idx:08d}-S",
+        "verfuegbarkeitVon": random_date(rng, 2020),
+        "aktualisierungsdatum": f"{random_date(rng, 2020)} 10:00:00",
+        "veroeffentlichungsdatum": random_date(rng, 2020),
+        "stellenart": "Arbeit",
+        "arbeitszeitModelle": rng.sample(WORKING_TIMES, rng.randint(0, 2)),
+        "berufe": [f"{keyword}/in"],
+        "erfahrung": maybe(
+            rng,
+            {
+                "berufsfeldErfahrung": [
+                    {"berufsfeld": rng.choice(CAREER_FIELDS), "erfahrung": random_time_period(rng)}
+                    for _ in range(rng.randint(0, 3))
+                ],
+                "gesamterfahrung": maybe(rng, random_time_period(rng)),
+            },
+        ),
+        "ausbildungen": maybe(
+            rng,
+            [
+                {"jahr": rng.randint(1975, 2024), "art": rng.choice(EDUCATIONS)}
+                for _ in range(rng.randint(1, 3))
+            ],
+        ),
+        "freierTitelStellengesuch": maybe(rng, f"{keyword} in {rng.choice(LOCATIONS)}"),
+        "letzteTaetigkeit": maybe(
+            rng, {"jahr": rng.randint(2000, 2024), "bezeichnung": rng.choice(SEARCH_KEYWORDS), "aktuell": False}
+        ),
+        "hatEmail": False,
+        "hatTelefon": False,
+        "hatAdresse": False,
+        "lokation": {
+            "ort": maybe(rng, rng.choice(LOCATIONS)),
+            "plz": maybe(rng, f"{rng.randint(10000, 99999)}"),
+            "umkreis": None,
+            "region": maybe(rng, "Bayern"),
+            "land": "Deutschland",
+        },
+        "mehrereArbeitsorte": False,
+    }
+
+
+def generate_lebenslauf_element(rng: random.Random) -> Dict[Text, Any]:
+    return {
+        "von": maybe(rng, random_date(rng), 0.95),
+        "bis": maybe(rng, random_date(rng), 0.9),
+        "ort": rng.choice(LOCATIONS),
+        "land": "Deutschland",
+        "lebenslaufart": rng.choice(["Berufserfahrung", "Schulbildung", "Ausbildung"]),
+        "berufsbezeichnung": rng.choice(SEARCH_KEYWORDS),
+        "beschreibung": maybe(rng, f"Arbeit als {rng.choice(SEARCH_KEYWORDS)}"),
+        "istAbgeschlossen": None,
+        "lebenslaufartenKategorie": None,
+        "nameArtEinrichtung": maybe(rng, rng.choice(["Universität", "Berufsschule"])),
+        "schulAbschluss": None,
+        "schulart": None,
+    }
+
+
+def generate_applicant_detail_dict(rng: random.Random, idx: int) -> Dict[Text, Any]:
+    """Generates a stored BewerberDetail document with random content."""
+    applicant: Dict[Text, Any] = generate_applicant_dict(rng, idx)
+    for key in ["letzteTaetigkeit", "hatEmail", "hatTelefon", "hatAdresse", "lokation", "mehrereArbeitsorte"]:
+        del applicant[key]
+    applicant.update(
+        {
+            "sucheNurSchwerbehinderung": False,
+            "entfernungMaxKriterium": "UNBEGRENZT",
+            "vertragsdauer": "UNBEFRISTET",
+            "lokationen": [{"ort": rng.choice(LOCATIONS)} for _ in range(rng.randint(0, 2))],
+            "werdegang": maybe(rng, [generate_lebenslauf_element(rng) for _ in range(rng.randint(1, 4))]),
+            "bildung": maybe(rng, [generate_lebenslauf_element(rng) for _ in range(rng.randint(1, 2))]),
+            "sprachkenntnisse": {
+                "Expertenkenntnisse": rng.sample(LANGUAGES, rng.randint(0, 1)),
+                "ErweiterteKenntnisse": maybe(rng, rng.sample(LANGUAGES, rng.randint(0, 2))),
+                "Grundkenntnisse": None,
+            },
+            "kenntnisse": maybe(
+                rng,
+                {
+                    "Expertenkenntnisse": rng.sample(SKILLS, rng.randint(0, 2)),
+                    "ErweiterteKenntnisse": None,
+                    "Grundkenntnisse": rng.sample(SKILLS, rng.randint(0, 2)),
+                },
+            ),
+            "softskills": maybe(rng, rng.sample(SKILLS, rng.randint(0, 2))),
+        }
+    )
+    return applicant